@@ -2,8 +2,13 @@ import math
 import sys
 import pygame
 
+from frame_budget import FULL, SKIP, FrameScheduler
+from phase_timer import from_env as phase_timer
+from renderer import DirtyRectRenderer, init_video
+from telemetry import from_env as telemetry
+
 # Initialize Pygame
-pygame.init()
+init_video()
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
@@ -16,15 +21,13 @@ WHITE = (255, 255, 255)
 BALL_COLOR = (200, 50, 50)
 HEX_COLOR = (50, 150, 200)
 
-# Clock for controlling the frame rate
-clock = pygame.time.Clock()
-
 # ---------------------------
 # Simulation parameters
 # ---------------------------
-dt = 1 / 60  # seconds per frame
+PHYSICS_HZ = 240  # physics steps per second, independent of the frame rate
+dt = 1 / PHYSICS_HZ  # seconds per physics step
 gravity = pygame.Vector2(0, 500)  # pixels per second^2 (downwards)
-air_friction = 0.999  # slight damping on the ball's velocity each frame
+air_friction = 0.999  # slight damping on the ball's velocity every 1/60 s
 
 # Collision parameters
 restitution = 0.9      # bounciness (1.0 is perfectly elastic)
@@ -137,41 +140,77 @@ def process_collisions(ball_pos, ball_vel, hex_vertices):
 # ---------------------------
 # Main loop
 # ---------------------------
+# Cached ball and hexagon sprites; only the regions that change are redrawn.
+renderer = DirtyRectRenderer(screen, hex_center, hex_radius, ball_radius, HEX_COLOR, BALL_COLOR,
+                             BLACK, hex_width=4, num_sides=num_sides)
+
+# Per-phase timing, enabled with PHASE_TIMING (see phase_timer.py).
+timer = phase_timer("3o-mini")
+# Live overlay, enabled with TELEMETRY (see telemetry.py).
+hud = telemetry("3o-mini", gravity.y, step_hz=PHYSICS_HZ, floor_y=HEIGHT, velocity=ball_vel)
+
+# Physics never drops steps; under load, frames are degraded or skipped
+# instead (see frame_budget.py)
+frames = FrameScheduler(PHYSICS_HZ, 60)
+loop = frames.loop
+prev_ball_pos = pygame.Vector2(ball_pos)
+prev_hex_angle = hex_angle
 running = True
+timer.start()
 while running:
     # Handle events.
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-
-    # Update hexagon rotation.
-    hex_angle += hex_angular_velocity * dt
-
-    # Update ball physics.
-    # Apply gravity.
-    ball_vel += gravity * dt
-    # Apply a little air friction.
-    ball_vel *= air_friction
-    # Update ball position.
-    ball_pos += ball_vel * dt
-
-    # Get the current hexagon vertices (rotated).
-    hex_vertices = get_rotated_hex_vertices(hex_center, hex_angle)
-
-    # Process collisions with the hexagon walls.
-    ball_pos, ball_vel = process_collisions(ball_pos, ball_vel, hex_vertices)
-
-    # Draw everything.
-    screen.fill(BLACK)
-
-    # Draw the hexagon.
-    pygame.draw.polygon(screen, HEX_COLOR, [(v.x, v.y) for v in hex_vertices], 4)
-
-    # Draw the ball.
-    pygame.draw.circle(screen, BALL_COLOR, (int(ball_pos.x), int(ball_pos.y)), ball_radius)
-
-    pygame.display.flip()
-    clock.tick(60)
-
+        elif event.type == pygame.VIDEOEXPOSE:
+            renderer.invalidate()
+    timer.lap("events")
+
+    # Run as many fixed physics steps as the elapsed time covers.
+    for _ in range(loop.advance()):
+        prev_ball_pos = pygame.Vector2(ball_pos)
+        prev_hex_angle = hex_angle
+
+        # Update hexagon rotation.
+        hex_angle += hex_angular_velocity * dt
+
+        # Update ball physics.
+        # Apply gravity.
+        ball_vel += gravity * dt
+        # Apply a little air friction.
+        ball_vel *= air_friction ** (dt * 60)
+        # Update ball position.
+        ball_pos += ball_vel * dt
+        timer.lap("integrate")
+
+        # Get the current hexagon vertices (rotated).
+        hex_vertices = get_rotated_hex_vertices(hex_center, hex_angle)
+
+        # Process collisions with the hexagon walls.
+        ball_pos, ball_vel = process_collisions(ball_pos, ball_vel, hex_vertices)
+        timer.lap("collide")
+        hud.step(ball_pos.x, ball_pos.y, ball_vel.x, ball_vel.y)
+
+    quality = frames.plan()
+    if quality != SKIP:
+        # Interpolate between the last two physics states for drawing.
+        alpha = loop.alpha
+        draw_pos = prev_ball_pos.lerp(ball_pos, alpha)
+        draw_angle = prev_hex_angle + (hex_angle - prev_hex_angle) * alpha
+
+        # Draw the hexagon and the ball, updating only the changed regions.
+        dirty = renderer.draw(draw_angle, draw_pos.x, draw_pos.y, outline=quality == FULL)
+        if quality == FULL:
+            dirty += hud.draw(screen)
+        timer.lap("draw")
+        pygame.display.update(dirty)
+        timer.lap("display")
+    hud.frame()
+    frames.wait()
+    timer.lap("wait")
+
+timer.report()
+hud.report()
+frames.report("3o-mini")
 pygame.quit()
-sys.exit()
+sys.exit()
\ No newline at end of file
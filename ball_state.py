@@ -0,0 +1,262 @@
+"""
+Shared ball-state containers.
+
+The scripts each kept their ball differently: a dict with string keys
+(kimi), a plain class with a per-instance __dict__ (deepseek), module
+globals (gemini) and pygame Vector2 pairs (3o-mini). Two forms replace the
+ad-hoc ones:
+
+- BallState: one ball in __slots__. No per-instance dict, so it is under
+  half a dict's size, and attribute access is a slot descriptor
+  instead of a hash lookup.
+- BallArray: n balls in one contiguous (4, n) float64 buffer. x, y, vx and
+  vy are row views into it, so vectorized updates write the buffer in place
+  and nothing is copied to hand the state to NumPy, pygame.surfarray or a
+  file.
+
+The benchmark measures memory per ball and the cost of one
+gravity/drag/move update for each representation.
+
+Usage:
+    python ball_state.py --balls 100000
+"""
+import gc
+import time
+
+# engines.py imports this module, so the heavier imports happen where they
+# are used (NumPy in BallArray, pygame and the profiling modules in the
+# benchmark): a worker that only steps the physics starts without them (see
+# startup.py).
+
+
+class BallState:
+    """One ball's position, velocity and radius."""
+
+    __slots__ = ("x", "y", "vx", "vy", "radius")
+
+    def __init__(self, x=0.0, y=0.0, vx=0.0, vy=0.0, radius=0.0):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.radius = radius
+
+    def __repr__(self):
+        return (f"BallState(x={self.x!r}, y={self.y!r}, vx={self.vx!r}, vy={self.vy!r}, "
+                f"radius={self.radius!r})")
+
+
+class BallArray:
+    """n balls in one (4, n) float64 buffer; x, y, vx, vy are views into it."""
+
+    def __init__(self, n, data=None):
+        if data is None:
+            import numpy as np
+            data = np.zeros((4, n))
+        self.data = data
+        self.x, self.y, self.vx, self.vy = self.data
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __getitem__(self, index):
+        """A ball as a view of its 4 values, or a BallArray view for a slice."""
+        if isinstance(index, slice):
+            return BallArray(0, self.data[:, index])
+        return self.data[:, index]
+
+    @property
+    def positions(self):
+        """(n, 2) view of the positions."""
+        return self.data[:2].T
+
+    @property
+    def velocities(self):
+        """(n, 2) view of the velocities."""
+        return self.data[2:].T
+
+    def get(self, i):
+        """Copy of ball i as a BallState."""
+        return BallState(float(self.x[i]), float(self.y[i]), float(self.vx[i]),
+                         float(self.vy[i]))
+
+    def set(self, i, ball):
+        self.data[:, i] = (ball.x, ball.y, ball.vx, ball.vy)
+
+
+# ---------------------------
+# The representations they replace, for the benchmark
+# ---------------------------
+class PlainBall:
+    """deepseek.py's Ball: a class with a per-instance __dict__."""
+
+    def __init__(self, x, y, radius):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.vx = 0.0
+        self.vy = 0.0
+
+
+def make_dict(i):
+    return {'x': float(i), 'y': 1.0, 'vx': 2.0, 'vy': 3.0}
+
+
+def make_plain(i):
+    ball = PlainBall(float(i), 1.0, 10.0)
+    ball.vx, ball.vy = 2.0, 3.0
+    return ball
+
+
+def make_slots(i):
+    return BallState(float(i), 1.0, 2.0, 3.0, 10.0)
+
+
+def make_vectors(i):
+    from pygame.math import Vector2
+    return (Vector2(float(i), 1.0), Vector2(2.0, 3.0))
+
+
+def update_dict(ball, g, drag, dt):
+    ball['vy'] += g * dt
+    ball['vx'] *= drag
+    ball['vy'] *= drag
+    ball['x'] += ball['vx'] * dt
+    ball['y'] += ball['vy'] * dt
+
+
+def update_attrs(ball, g, drag, dt):
+    ball.vy += g * dt
+    ball.vx *= drag
+    ball.vy *= drag
+    ball.x += ball.vx * dt
+    ball.y += ball.vy * dt
+
+
+def update_vectors(ball, g, drag, dt):
+    pos, vel = ball
+    vel += type(vel)(0, g) * dt
+    vel *= drag
+    pos += vel * dt
+
+
+def update_array(balls, g, drag, dt):
+    balls.vy += g * dt
+    balls.vx *= drag
+    balls.vy *= drag
+    balls.x += balls.vx * dt
+    balls.y += balls.vy * dt
+
+
+FORMS = {
+    "dict (kimi)": (make_dict, update_dict),
+    "class (deepseek)": (make_plain, update_attrs),
+    "Vector2 (3o-mini)": (make_vectors, update_vectors),
+    "BallState": (make_slots, update_attrs),
+}
+
+
+# gemini.py's ball lives in module globals, updated by top-level code with
+# no function call; time that against a BallState updated the same way.
+MODULE_UPDATES = {
+    "globals (gemini)": compile("""
+for _ in range(count):
+    ball_vy += g * dt
+    ball_vx *= drag
+    ball_vy *= drag
+    ball_x += ball_vx * dt
+    ball_y += ball_vy * dt
+""", "<module>", "exec"),
+    "BallState": compile("""
+for _ in range(count):
+    ball.vy += g * dt
+    ball.vx *= drag
+    ball.vy *= drag
+    ball.x += ball.vx * dt
+    ball.y += ball.vy * dt
+""", "<module>", "exec"),
+}
+
+
+def ns_per_module_update(code, count, g, drag, dt, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        namespace = dict(count=count, g=g, drag=drag, dt=dt, ball_x=0.0, ball_y=1.0,
+                         ball_vx=2.0, ball_vy=3.0, ball=BallState(0.0, 1.0, 2.0, 3.0))
+        start = time.perf_counter_ns()
+        exec(code, namespace)
+        best = min(best, (time.perf_counter_ns() - start) / count)
+    return best
+
+
+def bytes_per_ball(make, n):
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    try:
+        balls = [make(i) for i in range(n)]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Leave out the list holding them: 8 bytes a ball in every form.
+    return current / n - 8, balls
+
+
+def ns_per_update(update, balls, args, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for ball in balls:
+            update(ball, *args)
+        best = min(best, (time.perf_counter_ns() - start) / len(balls))
+    return best
+
+
+def main():
+    import argparse
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description="Memory and access cost of ball-state forms")
+    parser.add_argument("--balls", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.balls
+    step = (500.0, 0.999, 1 / 60)
+    # Do the forms' lazy imports (pygame, NumPy) before anything is measured.
+    for make, _ in FORMS.values():
+        make(0)
+    BallArray(1)
+
+    print("top-level code:")
+    for name, code in MODULE_UPDATES.items():
+        print(f"  {name:18s} {'':10s} {ns_per_module_update(code, n, *step):10.1f}")
+    print("one update function call per ball:")
+    print(f"  {'form':18s} {'bytes/ball':>10s} {'ns/update':>10s}")
+    for name, (make, update) in FORMS.items():
+        size, balls = bytes_per_ball(make, n)
+        print(f"  {name:18s} {size:10.1f} {ns_per_update(update, balls, step):10.1f}")
+        del balls
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        array = BallArray(n)
+        size = tracemalloc.get_traced_memory()[0] / n
+    finally:
+        tracemalloc.stop()
+    per_ball = ns_per_update(update_array, [array], step) / n
+    print(f"  {'BallArray (bulk)':18s} {size:10.1f} {per_ball:10.2f}")
+    # One ball at a time through the views: NumPy scalar access, the slow way.
+    rows = [array[i] for i in range(min(n, 10000))]
+
+    def update_row(row, g, drag, dt):
+        row[3] += g * dt
+        row[2] *= drag
+        row[3] *= drag
+        row[0] += row[2] * dt
+        row[1] += row[3] * dt
+    print(f"  {'BallArray (per ball)':18s} {'':10s} "
+          f"{ns_per_update(update_row, rows, step):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
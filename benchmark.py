@@ -0,0 +1,131 @@
+"""
+Headless cross-model throughput benchmark.
+
+Steps every model's physics (see engines.py) for a fixed number of steps from
+the same initial conditions, with no window and no frame limiter, and prints
+one table with steps/second, per-step latency percentiles and peak memory.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --steps 20000 --models 3o-mini deepseek kimi
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from engines import DT, ENGINES, make_engine
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def time_steps(engine, steps, dt=DT):
+    """Step the engine and return the list of per-step latencies in nanoseconds."""
+    timings = [0] * steps
+    step = engine.step
+    clock = time.perf_counter_ns
+    for i in range(steps):
+        t0 = clock()
+        step(dt)
+        timings[i] = clock() - t0
+    return timings
+
+
+def peak_memory(name, steps, dt=DT):
+    """Peak Python heap (bytes) used to build the engine and run `steps` steps."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        engine = make_engine(name)
+        step = engine.step
+        for _ in range(steps):
+            step(dt)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark_model(name, steps, warmup=200, mem_steps=2000, dt=DT):
+    """Return a result dict for one model."""
+    engine = make_engine(name)
+    time_steps(engine, warmup, dt)
+
+    engine = make_engine(name)
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        timings = time_steps(engine, steps, dt)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    timings.sort()
+
+    x, y, vx, vy, angle = engine.state()
+    return {
+        "model": name,
+        "steps": steps,
+        "steps_per_sec": steps / elapsed if elapsed > 0 else float("inf"),
+        "p50_us": percentile(timings, 50) / 1000,
+        "p95_us": percentile(timings, 95) / 1000,
+        "p99_us": percentile(timings, 99) / 1000,
+        "max_us": timings[-1] / 1000 if timings else 0.0,
+        "peak_kib": peak_memory(name, min(steps, mem_steps), dt) / 1024,
+        "final_pos": (x, y),
+    }
+
+
+def format_table(results):
+    header = ("model", "steps/s", "p50 us", "p95 us", "p99 us", "max us", "peak KiB",
+              "final x", "final y")
+    rows = [header]
+    for r in results:
+        rows.append((
+            r["model"],
+            f"{r['steps_per_sec']:,.0f}",
+            f"{r['p50_us']:.2f}",
+            f"{r['p95_us']:.2f}",
+            f"{r['p99_us']:.2f}",
+            f"{r['max_us']:.1f}",
+            f"{r['peak_kib']:.1f}",
+            f"{r['final_pos'][0]:.1f}",
+            f"{r['final_pos'][1]:.1f}",
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = []
+    for n, row in enumerate(rows):
+        cells = [row[0].ljust(widths[0])] + [c.rjust(w) for c, w in zip(row[1:], widths[1:])]
+        lines.append("  ".join(cells))
+        if n == 0:
+            lines.append("  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, default=10000, help="physics steps per model")
+    parser.add_argument("--models", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--mem-steps", type=int, default=2000,
+                        help="steps traced with tracemalloc for the peak-memory column")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.models:
+        try:
+            results.append(benchmark_model(name, args.steps, mem_steps=args.mem_steps))
+        except ImportError as exc:
+            print(f"skipping {name}: {exc}")
+    print(f"{args.steps} steps at dt = 1/{round(1 / DT)} s, no window, no frame limiter\n")
+    print(format_table(results))
+    print("\npeak KiB is Python heap only (tracemalloc); pymunk's C allocations are not counted.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,701 @@
+"""
+Fit the hand-written engines' wall parameters to gpt_4o's pymunk scene.
+
+gpt_4o.py describes its walls with pymunk materials (elasticity 0.9 and
+friction 0.5 on the segments, 0.8 and 0.4 on the ball), the other scripts
+with their own restitution and tangential-friction factors, and the two sets
+of numbers are not comparable. This tool records reference trajectories
+from the pymunk scene and searches each script's constants for the values
+whose trajectories come closest:
+
+    3o-mini.py       restitution, wall_friction
+    deepseek.py      RESTITUTION, FRICTION
+    o3_Mini_High.py  RESTITUTION, FRICTION_COEFF
+    kimi.py          restitution
+    o1.py            BOUNCE_FRICTION
+    gemini.py        friction (the factor applied after every bounce)
+
+Everything else is set to the pymunk scene: its gravity, spin, ball radius
+and hexagon, no air drag. pymunk's segments are 5 px thick, so the other
+engines get a hexagon with the same contact surface (apothem 5 px smaller).
+
+Trajectories diverge quickly once bounces differ, so the reference is cut
+into short segments and every segment is replayed from the reference state
+at its start; the error of a parameter set is the RMS distance between the
+replayed and the reference ball positions over all segments.
+
+The search is a cross-entropy method: each iteration samples a population
+of parameter sets, keeps the best eighth and resamples around it. A whole
+population is one batch: every (parameter set, segment) pair is a lane of a
+NumPy port of the engine's step (VectorEngine for 3o-mini, the ports below
+for the others), so an iteration costs a few hundred array steps instead of
+population x segments scalar runs. The fitted values are then checked on
+the real engines from engines.py, on the training segments (which must
+reproduce the batched error) and on launches held out of the fit. A fit
+that does not lower the held-out error is not kept: the script's own
+values are reported (and written with --out) instead. A fitted value on
+the edge of its search range is flagged "at bound": the best value may lie
+outside the range the constant can physically take, so the model is
+missing something the pymunk scene does rather than merely mistuned.
+
+Two things the fit shows about the models rather than the parameters:
+gpt_4o turns its kinematic hexagon by setting the body angle, so pymunk's
+walls push the ball out but carry no surface velocity, and engines that add
+omega x r at the contact (3o-mini, o3_Mini_High) fit with a much lower
+restitution to shed that energy again. deepseek's normal points from the
+center to the edge midpoint, i.e. outwards, so its ball leaves the
+container whatever its constants are; the "escaped" column counts the
+segments where that happens.
+
+Usage:
+    python calibration.py
+    python calibration.py --models deepseek o3_Mini_High --population 256 --out fitted.json
+"""
+import argparse
+import inspect
+import json
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from engines import ENGINES, FPS, HEIGHT, WIDTH
+from vector_engine import VectorEngine, random_balls
+
+# gpt_4o.py's scene (engines.Gpt4o defaults).
+GRAVITY = 980.0
+OMEGA = 0.05 * FPS  # rotation_speed is radians per frame
+HEX_RADIUS = 200
+BALL_RADIUS = 20
+WALL_RADIUS = 5  # pymunk.Segment radius
+# The ball meets the segments WALL_RADIUS inside the polygon; a hexagon with
+# an apothem that much smaller has the same contact surface.
+CONTACT_RADIUS = HEX_RADIUS - WALL_RADIUS / math.cos(math.pi / 6)
+CENTER = (WIDTH // 2, HEIGHT // 2)
+
+Param = namedtuple("Param", "name constant low high")
+
+
+# ---------------------------
+# Reference
+# ---------------------------
+def record_reference(launches, seconds, dt):
+    """
+    gpt_4o's states for each (pos, vel) launch: a (launches, steps + 1, 5)
+    array of (x, y, vx, vy, angle), the launch itself first.
+    """
+    steps = int(round(seconds / dt))
+    traces = np.empty((len(launches), steps + 1, 5))
+    for k, (pos, vel) in enumerate(launches):
+        engine = ENGINES["gpt_4o"]()
+        engine.reset(tuple(pos), tuple(vel))
+        traces[k, 0] = engine.state()
+        for i in range(1, steps + 1):
+            engine.step(dt)
+            traces[k, i] = engine.state()
+    return traces
+
+
+def launches(n, seed):
+    """n random launches inside the contact hexagon's inscribed circle."""
+    pos, vel = random_balls(n, CONTACT_RADIUS, BALL_RADIUS, speed=250.0, seed=seed,
+                            center=CENTER)
+    return list(zip(pos, vel))
+
+
+def segments(traces, horizon):
+    """
+    Cut the traces into segments of `horizon` steps. Returns the start
+    states (S, 5), angle reduced to [0, 2 pi), and the reference positions
+    after each step (horizon, S, 2).
+
+    pymunk's walls are moved by setting the body angle, so at speed the
+    ball can tunnel out of the container; segments from the moment a
+    trace leaves the hexagon on are dropped.
+    """
+    starts, targets = [], []
+    for trace in traces:
+        outside = np.hypot(trace[:, 0] - CENTER[0], trace[:, 1] - CENTER[1]) > HEX_RADIUS
+        end = np.argmax(outside) if outside.any() else len(trace)
+        for first in range(0, end - horizon, horizon):
+            starts.append(trace[first])
+            targets.append(trace[first + 1:first + 1 + horizon, :2])
+    starts = np.array(starts)
+    starts[:, 4] %= 2 * math.pi
+    return starts, np.array(targets).transpose(1, 0, 2)
+
+
+# ---------------------------
+# Batched ports
+# ---------------------------
+class Lanes:
+    """
+    One ball per lane, each with its own parameters and container angle.
+    Subclasses port one engine's step over arrays, split into integrate(dt)
+    and collide(x, y, vx, vy, angle, values), the engine's edge loop for the
+    lanes near an edge, which returns their (x, y, vx, vy); `scene` holds
+    the engine's constructor arguments for the pymunk scene, in the engine's
+    own units.
+    """
+
+    name = None
+    params = ()
+    scene = {}
+    per_frame = False
+    angle_attr = None
+    # Lanes closer to the center than this cannot reach an edge.
+    inner = CONTACT_RADIUS * math.cos(math.pi / 6) - BALL_RADIUS - 1e-6
+
+    def __init__(self, values, x, y, vx, vy, angle):
+        self.values = values
+        scale = 1 / FPS if self.per_frame else 1.0
+        self.x = x.copy()
+        self.y = y.copy()
+        self.vx = vx * scale
+        self.vy = vy * scale
+        self.angle = self.engine_angle(angle)
+
+    @staticmethod
+    def engine_angle(angle):
+        """Container angle in the engine's units, from radians."""
+        return angle
+
+    @classmethod
+    def set_angle(cls, engine, angle):
+        """Turn a scalar engine's container to `angle` radians."""
+        setattr(engine, cls.angle_attr, float(cls.engine_angle(angle)))
+
+    def step(self, dt):
+        self.integrate(dt)
+        dx = self.x - CENTER[0]
+        dy = self.y - CENTER[1]
+        idx = np.flatnonzero(dx * dx + dy * dy >= self.inner**2)
+        if idx.size == 0:
+            return
+        values = {name: value[idx] for name, value in self.values.items()}
+        x, y, vx, vy = self.collide(self.x[idx], self.y[idx], self.vx[idx], self.vy[idx],
+                                    self.angle[idx], values)
+        self.x[idx] = x
+        self.y[idx] = y
+        self.vx[idx] = vx
+        self.vy[idx] = vy
+
+
+class ThreeOMiniLanes(Lanes):
+    name = "3o-mini"
+    params = (Param("restitution", "restitution", 0.0, 1.0),
+              Param("wall_friction", "wall_friction", 0.0, 1.0))
+    scene = dict(hex_angular_velocity=OMEGA, gravity=GRAVITY, air_friction=1.0,
+                 ball_radius=BALL_RADIUS, hex_radius=CONTACT_RADIUS)
+    angle_attr = "hex_angle"
+
+    def __init__(self, values, x, y, vx, vy, angle):
+        self.engine = VectorEngine(len(x), hex_center=CENTER, **values, **self.scene)
+        self.engine.reset(np.column_stack((x, y)), np.column_stack((vx, vy)))
+        self.engine.hex_angle = angle.copy()
+        self.x = self.engine.x
+        self.y = self.engine.y
+
+    def step(self, dt):
+        self.engine.step(dt)
+
+
+class DeepseekLanes(Lanes):
+    name = "deepseek"
+    params = (Param("restitution", "RESTITUTION", 0.0, 1.0),
+              Param("friction", "FRICTION", 0.0, 1.0))
+    scene = dict(angular_velocity=OMEGA, gravity=GRAVITY, air_friction=0.0,
+                 ball_radius=BALL_RADIUS, hex_radius=CONTACT_RADIUS)
+
+    @classmethod
+    def set_angle(cls, engine, angle):
+        engine.hexagon.rotation_angle = float(angle)
+
+    def integrate(self, dt):
+        scene = self.scene
+        self.angle = self.angle + scene["angular_velocity"] * dt
+        drag = 1 - scene["air_friction"] * dt
+        self.vx = self.vx * drag
+        self.vy = (self.vy + scene["gravity"] * dt) * drag
+        self.x = self.x + self.vx * dt
+        self.y = self.y + self.vy * dt
+
+    def collide(self, x, y, vx, vy, angle, values):
+        scene = self.scene
+        omega = scene["angular_velocity"]
+        radius = scene["hex_radius"]
+        r = scene["ball_radius"]
+        e = values["restitution"]
+        f = values["friction"]
+        cx, cy = CENTER
+        vertices = [(cx + radius * np.cos(angle + math.radians(60 * i)),
+                     cy + radius * np.sin(angle + math.radians(60 * i))) for i in range(6)]
+        for i in range(6):
+            ax, ay = vertices[i]
+            bx, by = vertices[(i + 1) % 6]
+            abx = bx - ax
+            aby = by - ay
+            t = ((x - ax) * abx + (y - ay) * aby) / (abx**2 + aby**2 + 1e-8)
+            t = np.clip(t, 0.0, 1.0)
+            px = ax + t * abx
+            py = ay + t * aby
+            distance = np.hypot(x - px, y - py)
+
+            nx = (ax + bx) / 2 - cx
+            ny = (ay + by) / 2 - cy
+            norm = np.hypot(nx, ny)
+            nx = nx / norm
+            ny = ny / norm
+            wall_vx = -omega * (py - cy)
+            wall_vy = omega * (px - cx)
+            rel_vx = vx - wall_vx
+            rel_vy = vy - wall_vy
+            dot = rel_vx * nx + rel_vy * ny
+            hit = (distance < r) & (dot < 0)
+            if not hit.any():
+                continue
+
+            penetration = r - distance
+            x = np.where(hit, x + nx * penetration, x)
+            y = np.where(hit, y + ny * penetration, y)
+            normal_v = -e * dot
+            tangent_vx = (rel_vx - dot * nx) * (1 - f)
+            tangent_vy = (rel_vy - dot * ny) * (1 - f)
+            vx = np.where(hit, wall_vx + normal_v * nx + tangent_vx, vx)
+            vy = np.where(hit, wall_vy + normal_v * ny + tangent_vy, vy)
+        return x, y, vx, vy
+
+
+class O3MiniHighLanes(Lanes):
+    name = "o3_Mini_High"
+    params = (Param("restitution", "RESTITUTION", 0.0, 1.0),
+              Param("friction_coeff", "FRICTION_COEFF", 0.0, 1.0))
+    scene = dict(hex_ang_vel=OMEGA / FPS, gravity=GRAVITY / FPS**2, air_friction=1.0,
+                 ball_radius=BALL_RADIUS, hex_radius=CONTACT_RADIUS)
+    per_frame = True
+    angle_attr = "hex_rotation"
+
+    def integrate(self, dt):
+        frames = dt * FPS
+        scene = self.scene
+        self.angle = self.angle + scene["hex_ang_vel"] * frames
+        damping = scene["air_friction"] ** frames
+        self.vx = self.vx * damping
+        self.vy = (self.vy + scene["gravity"] * frames) * damping
+        self.x = self.x + self.vx * frames
+        self.y = self.y + self.vy * frames
+
+    def collide(self, x, y, vx, vy, angle, values):
+        scene = self.scene
+        omega = scene["hex_ang_vel"]
+        radius = scene["hex_radius"]
+        r = scene["ball_radius"]
+        e = values["restitution"]
+        keep = 1 - values["friction_coeff"]
+        cx, cy = CENTER
+        vertices = [(cx + radius * np.cos(angle + i * (2 * math.pi / 6)),
+                     cy + radius * np.sin(angle + i * (2 * math.pi / 6))) for i in range(6)]
+
+        # Each pass resolves the first edge a lane touches; lanes that
+        # touched nothing in a pass are done, as in resolve_collisions.
+        active = np.ones(len(x), dtype=bool)
+        for _ in range(5):
+            pending = active.copy()
+            for i in range(6):
+                ax, ay = vertices[i]
+                bx, by = vertices[(i + 1) % 6]
+                abx = bx - ax
+                aby = by - ay
+                t = ((x - ax) * abx + (y - ay) * aby) / (abx * abx + aby * aby)
+                t = np.clip(t, 0.0, 1.0)
+                qx = ax + abx * t
+                qy = ay + aby * t
+                dist = np.sqrt((x - qx) ** 2 + (y - qy) ** 2)
+                hit = pending & (dist < r)
+                if not hit.any():
+                    continue
+
+                mx = cx - (ax + bx) / 2
+                my = cy - (ay + by) / 2
+                mid = np.sqrt(mx * mx + my * my)
+                to_a = np.sqrt((x - ax) ** 2 + (y - ay) ** 2)
+                to_b = np.sqrt((x - bx) ** 2 + (y - by) ** 2)
+                near_a = to_a < to_b
+                near = np.where(near_a, to_a, to_b)
+                near_x = np.where(near_a, x - ax, x - bx)
+                near_y = np.where(near_a, y - ay, y - by)
+                safe = np.where(near > 0, near, 1.0)
+                on_edge = (t > 0.01) & (t < 0.99)
+                nx = np.where(on_edge, mx / mid, np.where(near > 0, near_x / safe, 1.0))
+                ny = np.where(on_edge, my / mid, np.where(near > 0, near_y / safe, 0.0))
+
+                penetration = r - dist
+                wall_vx = omega * -(qy - cy)
+                wall_vy = omega * (qx - cx)
+                rel_vx = vx - wall_vx
+                rel_vy = vy - wall_vy
+                dot = rel_vx * nx + rel_vy * ny
+                normal_x = dot * nx
+                normal_y = dot * ny
+                new_vx = wall_vx + (-e * normal_x + keep * (rel_vx - normal_x))
+                new_vy = wall_vy + (-e * normal_y + keep * (rel_vy - normal_y))
+                x = np.where(hit, x + nx * penetration, x)
+                y = np.where(hit, y + ny * penetration, y)
+                vx = np.where(hit, new_vx, vx)
+                vy = np.where(hit, new_vy, vy)
+                pending &= ~hit
+            active &= ~pending
+            if not active.any():
+                break
+        return x, y, vx, vy
+
+
+class KimiLanes(Lanes):
+    name = "kimi"
+    params = (Param("restitution", "restitution", 0.0, 1.0),)
+    scene = dict(gravity=GRAVITY / FPS**2, friction=1.0, angular_speed=math.degrees(OMEGA) / FPS,
+                 ball_radius=BALL_RADIUS, hex_size=CONTACT_RADIUS)
+    per_frame = True
+    angle_attr = "angle"
+
+    @staticmethod
+    def engine_angle(angle):
+        return np.degrees(angle) % 360
+
+    def integrate(self, dt):
+        frames = dt * FPS
+        scene = self.scene
+        self.angle = (self.angle + scene["angular_speed"] * frames) % 360
+        damping = scene["friction"] ** frames
+        self.vx = self.vx * damping
+        self.vy = (self.vy + scene["gravity"] * frames) * damping
+        self.x = self.x + self.vx * frames
+        self.y = self.y + self.vy * frames
+
+    def collide(self, x, y, vx, vy, angle, values):
+        scene = self.scene
+        r = scene["ball_radius"]
+        size = scene["hex_size"]
+        e = values["restitution"]
+        cx, cy = CENTER
+        theta = np.radians(angle)
+        cos_t = np.cos(theta)
+        sin_t = np.sin(theta)
+        points = []
+        for i in range(6):
+            ox = size * math.cos(math.radians(60 * i))
+            oy = size * math.sin(math.radians(60 * i))
+            points.append((cx + (ox * cos_t - oy * sin_t), cy + (ox * sin_t + oy * cos_t)))
+        for i in range(6):
+            ax, ay = points[i]
+            bx, by = points[(i + 1) % 6]
+            dx = bx - ax
+            dy = by - ay
+            dot = (x - ax) * dx + (y - ay) * dy
+            len_sq = dx * dx + dy * dy
+            t = np.where(dot > 0, np.minimum(dot / len_sq, 1), 0.0)
+            distance = np.hypot(x - (ax + dx * t), y - (ay + dy * t))
+            hit = distance < r
+            if not hit.any():
+                continue
+
+            length = np.sqrt(len_sq)
+            nx = -dy / length
+            ny = dx / length
+            dot_v = vx * nx + vy * ny
+            penetration = r - distance
+            vx = np.where(hit, vx - 2 * dot_v * nx * e, vx)
+            vy = np.where(hit, vy - 2 * dot_v * ny * e, vy)
+            x = np.where(hit, x + nx * penetration, x)
+            y = np.where(hit, y + ny * penetration, y)
+        return x, y, vx, vy
+
+
+class O1Lanes(Lanes):
+    name = "o1"
+    params = (Param("bounce_friction", "BOUNCE_FRICTION", 0.0, 1.0),)
+    scene = dict(gravity=GRAVITY / FPS**2, air_friction=1.0,
+                 rotation_speed=math.degrees(OMEGA) / FPS, hex_radius=CONTACT_RADIUS,
+                 ball_radius=BALL_RADIUS)
+    per_frame = True
+    angle_attr = "rotation_angle"
+
+    @staticmethod
+    def engine_angle(angle):
+        # o1's vertices sit at 60 * i - 30 degrees, pymunk's at 60 * i.
+        return (np.degrees(angle) + 30) % 360
+
+    def integrate(self, dt):
+        frames = dt * FPS
+        scene = self.scene
+        damping = scene["air_friction"] ** frames
+        self.vx = self.vx * damping
+        self.vy = (self.vy + scene["gravity"] * frames) * damping
+        self.x = self.x + self.vx * frames
+        self.y = self.y + self.vy * frames
+        angle = self.angle + scene["rotation_speed"] * frames
+        self.angle = np.where(angle >= 360, angle - 360, angle)
+
+    def collide(self, x, y, vx, vy, angle, values):
+        scene = self.scene
+        radius = scene["hex_radius"]
+        r = scene["ball_radius"]
+        bounce = values["bounce_friction"]
+        cx, cy = CENTER
+        theta = np.radians(angle)
+        cos_t = np.cos(theta)
+        sin_t = np.sin(theta)
+        vertices = []
+        for i in range(6):
+            lx = radius * math.cos(math.radians(60 * i - 30))
+            ly = radius * math.sin(math.radians(60 * i - 30))
+            dx = (lx + cx) - cx
+            dy = (ly + cy) - cy
+            vertices.append((dx * cos_t - dy * sin_t + cx, dx * sin_t + dy * cos_t + cy))
+        for i in range(6):
+            p1x, p1y = vertices[i]
+            p2x, p2y = vertices[(i + 1) % 6]
+            line_dx = p2x - p1x
+            line_dy = p2y - p1y
+            to_x = x - p1x
+            to_y = y - p1y
+            normal_length = np.hypot(line_dy, -line_dx)
+            dist = (to_x * line_dy + to_y * -line_dx) / normal_length
+            t = (to_x * line_dx + to_y * line_dy) / np.hypot(line_dx, line_dy) ** 2
+            hit = (t >= 0) & (t <= 1) & (np.abs(dist) < r) & (dist > 0)
+            if not hit.any():
+                continue
+
+            overlap = r - np.abs(dist)
+            nx = line_dy / normal_length
+            ny = -line_dx / normal_length
+            v_dot_n = vx * nx + vy * ny
+            x = np.where(hit, x - nx * overlap, x)
+            y = np.where(hit, y - ny * overlap, y)
+            vx = np.where(hit, (vx - 2 * v_dot_n * nx) * bounce, vx)
+            vy = np.where(hit, (vy - 2 * v_dot_n * ny) * bounce, vy)
+        return x, y, vx, vy
+
+
+class GeminiLanes(Lanes):
+    """gemini's screen clamping is left out: the scene's hexagon lies well inside the screen."""
+
+    name = "gemini"
+    params = (Param("friction", "friction", 0.0, 1.0),)
+    scene = dict(rotation_speed=math.degrees(OMEGA) / FPS, gravity=GRAVITY / FPS**2,
+                 ball_radius=BALL_RADIUS, hexagon_radius=CONTACT_RADIUS)
+    per_frame = True
+    angle_attr = "rotation_angle"
+
+    @staticmethod
+    def engine_angle(angle):
+        return np.degrees(angle)
+
+    def step(self, dt):
+        super().step(dt)
+        # gemini turns the container after the collision test.
+        self.angle = self.angle + self.scene["rotation_speed"] * dt * FPS
+
+    def integrate(self, dt):
+        frames = dt * FPS
+        self.x = self.x + self.vx * frames
+        self.y = self.y + self.vy * frames
+        self.vy = self.vy + self.scene["gravity"] * frames
+
+    def collide(self, x, y, vx, vy, angle, values):
+        scene = self.scene
+        radius = scene["hexagon_radius"]
+        r = scene["ball_radius"]
+        friction = values["friction"]
+        cx, cy = CENTER
+        # Only the first edge hit is resolved (the original breaks out).
+        pending = np.ones(len(x), dtype=bool)
+        for i in range(6):
+            a1 = np.radians(angle + i * 60.0)
+            a2 = np.radians(angle + (i + 1) * 60.0)
+            x1 = cx + radius * np.cos(a1)
+            y1 = cy + radius * np.sin(a1)
+            x2 = cx + radius * np.cos(a2)
+            y2 = cy + radius * np.sin(a2)
+            dx = x2 - x1
+            dy = y2 - y1
+            t = ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)
+            distance = np.sqrt((x - (x1 + t * dx)) ** 2 + (y - (y1 + t * dy)) ** 2)
+            hit = pending & (t >= 0) & (t <= 1) & (distance <= r)
+            if not hit.any():
+                continue
+
+            norm_length = np.sqrt(dy * dy + dx * dx)
+            nx = -dy / norm_length
+            ny = dx / norm_length
+            dot = vx * nx + vy * ny
+            push = r - distance + 1
+            x = np.where(hit, x + nx * push, x)
+            y = np.where(hit, y + ny * push, y)
+            vx = np.where(hit, (vx - 2 * dot * nx) * friction, vx)
+            vy = np.where(hit, (vy - 2 * dot * ny) * friction, vy)
+            pending &= ~hit
+        return x, y, vx, vy
+
+
+MODELS = {cls.name: cls for cls in (ThreeOMiniLanes, DeepseekLanes, O3MiniHighLanes,
+                                    KimiLanes, O1Lanes, GeminiLanes)}
+
+
+# ---------------------------
+# Fit
+# ---------------------------
+def defaults(model):
+    """The engine's (and so the script's) own values for the fitted parameters."""
+    signature = inspect.signature(ENGINES[model.name])
+    return np.array([signature.parameters[p.name].default for p in model.params])
+
+
+def evaluate(model, candidates, starts, targets, dt):
+    """
+    RMS position error (px) of each parameter set in `candidates` (K, P)
+    over all segments, simulated as one batch of K * S lanes.
+    """
+    k, s = len(candidates), len(starts)
+    values = {p.name: np.repeat(candidates[:, j], s) for j, p in enumerate(model.params)}
+    x, y, vx, vy, angle = (np.tile(starts[:, c], k) for c in range(5))
+    lanes = model(values, x, y, vx, vy, angle)
+    error = np.zeros((k, s))
+    for target in targets:
+        lanes.step(dt)
+        error += (lanes.x.reshape(k, s) - target[:, 0]) ** 2
+        error += (lanes.y.reshape(k, s) - target[:, 1]) ** 2
+    return np.sqrt(error.sum(axis=1) / (len(targets) * s))
+
+
+def fit(model, starts, targets, dt, population=128, iterations=8, elite=0.125, seed=0):
+    """
+    Cross-entropy search over the model's parameter box. The first batch
+    is uniform over the box, with the script's defaults as its first
+    member; later ones are normal around the previous elite. Returns
+    (best values, best error, default error, evaluations).
+    """
+    rng = np.random.default_rng(seed)
+    low = np.array([p.low for p in model.params])
+    high = np.array([p.high for p in model.params])
+    keep = max(2, int(population * elite))
+    best, best_error, default_error = None, math.inf, None
+    mean = std = None
+    for iteration in range(iterations):
+        if iteration == 0:
+            candidates = rng.uniform(low, high, (population, len(low)))
+            candidates[0] = defaults(model)
+        else:
+            candidates = np.clip(rng.normal(mean, std, (population, len(low))), low, high)
+        error = evaluate(model, candidates, starts, targets, dt)
+        if iteration == 0:
+            default_error = error[0]
+        order = np.argsort(error)
+        if error[order[0]] < best_error:
+            best, best_error = candidates[order[0]].copy(), error[order[0]]
+        elite_set = candidates[order[:keep]]
+        mean = elite_set.mean(axis=0)
+        std = np.maximum(elite_set.std(axis=0), 1e-3 * (high - low))
+    return best, best_error, default_error, population * iterations
+
+
+def at_bound(param, value):
+    """Whether a fitted value sits on the edge of its search range."""
+    tolerance = 1e-3 * (param.high - param.low)
+    return value - param.low <= tolerance or param.high - value <= tolerance
+
+
+def scalar_error(model, values, starts, targets, dt):
+    """
+    evaluate() for one parameter set, run on the engines.py engine segment
+    by segment. Returns (RMS error, segments whose ball ended outside the
+    hexagon).
+    """
+    params = {p.name: float(v) for p, v in zip(model.params, values)}
+    total = 0.0
+    escaped = 0
+    for start, target in zip(starts, targets.transpose(1, 0, 2)):
+        x, y, vx, vy, angle = (float(v) for v in start)
+        engine = ENGINES[model.name](**model.scene, **params)
+        engine.reset((x, y), (vx, vy))
+        model.set_angle(engine, angle)
+        for tx, ty in target:
+            engine.step(dt)
+            bx, by = engine.state()[:2]
+            total += (bx - tx) ** 2 + (by - ty) ** 2
+        escaped += math.hypot(bx - CENTER[0], by - CENTER[1]) > HEX_RADIUS
+    return math.sqrt(total / targets.shape[0] / targets.shape[1]), escaped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the engines' wall parameters to gpt_4o")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=list(MODELS))
+    parser.add_argument("--launches", type=int, default=4, help="reference runs to fit")
+    parser.add_argument("--holdout", type=int, default=2, help="reference runs kept for checking")
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of each reference run")
+    parser.add_argument("--horizon", type=float, default=0.5, help="segment length, seconds")
+    parser.add_argument("--rate", type=int, default=240, help="physics steps per second")
+    parser.add_argument("--population", type=int, default=128)
+    parser.add_argument("--iterations", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the fitted constants as JSON")
+    args = parser.parse_args()
+
+    dt = 1 / args.rate
+    horizon = int(round(args.horizon * args.rate))
+    start = time.perf_counter()
+    train = segments(record_reference(launches(args.launches, args.seed), args.seconds, dt),
+                     horizon)
+    held = segments(record_reference(launches(args.holdout, args.seed + 1), args.seconds, dt),
+                    horizon)
+    print(f"reference: gpt_4o, {args.launches} + {args.holdout} held-out runs of "
+          f"{args.seconds:g} s at {args.rate} Hz, {len(train[0])} segments of "
+          f"{args.horizon:g} s to fit ({time.perf_counter() - start:.1f} s to record)")
+    header = (f"{'model':14s} {'constant':16s} {'default':>8s} {'fitted':>8s}   "
+              f"{'rms px: default':>15s} {'fitted':>7s} {'scalar':>7s} {'held-out':>15s}   "
+              f"{'escaped':>7s} {'evals':>5s} {'time':>7s} {'sequential':>10s}")
+    print(header + "  note")
+
+    fitted = {}
+    for name in args.models:
+        model = MODELS[name]
+        start = time.perf_counter()
+        values, error, default_error, evals = fit(model, *train, dt, args.population,
+                                                  args.iterations, seed=args.seed)
+        elapsed = time.perf_counter() - start
+
+        # The real engine must reproduce the batched error; its speed gives
+        # what the same number of evaluations would cost one run at a time.
+        start = time.perf_counter()
+        scalar, escaped = scalar_error(model, values, *train, dt)
+        sequential = (time.perf_counter() - start) * evals
+        held_default = scalar_error(model, defaults(model), *held, dt)[0]
+        held_fitted = scalar_error(model, values, *held, dt)[0]
+
+        # Only a fit that generalizes replaces the script's values.
+        kept = held_fitted < held_default
+        chosen = values if kept else defaults(model)
+        fitted[name] = {p.constant: round(float(v), 4) for p, v in zip(model.params, chosen)}
+        for j, (p, default, value) in enumerate(zip(model.params, defaults(model), values)):
+            row = f"{name if j == 0 else '':14s} {p.constant:16s} {default:8.3f} {value:8.3f}"
+            notes = []
+            if j == 0:
+                row += (f"   {default_error:15.1f} {error:7.1f} {scalar:7.1f} "
+                        f"{held_default:7.1f} ->{held_fitted:5.1f}   "
+                        f"{escaped:3d}/{len(train[0]):<3d} {evals:5d} {elapsed:6.1f}s "
+                        f"{sequential:9.0f}s")
+                if not kept:
+                    notes.append("held-out worse, default kept")
+            if at_bound(p, value):
+                notes.append("at bound")
+            print(row.ljust(len(header)) + "  " + ", ".join(notes) if notes else row)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(fitted, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Deterministic checkpoints of a headless run, and fast-forward to any step.
+
+Every engine steps with a fixed dt (deepseek and o1 no longer read the wall
+clock, see fixed_step.py), so a run is a pure function of its initial state
+and step count. A checkpoint captures everything the next step depends on:
+
+- the engine object itself, pickled whole: ball, container angle and every
+  constant, including gpt_4o's pymunk Space with its bodies, shapes and
+  cached contacts (pymunk supports pickle and copy);
+- the step counter and dt;
+- the state of the `random` and NumPy global generators, in case a model
+  draws from them.
+
+One piece of pymunk state is not pickled: each body's bias velocity, the
+position correction that a step's contacts leave for the next step to apply.
+It is exactly zero after a step in which no contact applied a bias impulse,
+so checkpoints of engines holding a pymunk Space are taken at the first such
+step at or after the requested one (in practice within a few dozen steps).
+
+Restoring a checkpoint and stepping on gives the same floats as never having
+stopped, so a glitch at step 5,000,000 is reached by loading the nearest
+earlier checkpoint instead of re-simulating from step 0.
+
+Checkpoints live in a directory, one file per step (`step_000005000000.ckpt`),
+written atomically so an interrupted run never leaves a torn file.
+
+Usage:
+    python checkpoint.py record --model gemini --steps 5000000 --every 100000 --dir ckpt
+    python checkpoint.py goto --dir ckpt --step 4999000 --record glitch.traj --frames 2000
+    python checkpoint.py verify --model gpt_4o --steps 20000 --every 2000
+"""
+import argparse
+import bisect
+import os
+import pickle
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from engines import DT, ENGINES, make_engine
+
+FORMAT_VERSION = 1
+# Steps to wait for a pymunk Space to settle before checkpointing anyway.
+MAX_SETTLE_STEPS = 10000
+
+
+def snapshot(engine, step, dt=DT):
+    """The full simulation state as bytes."""
+    return pickle.dumps({
+        "version": FORMAT_VERSION,
+        "engine": engine,
+        "step": step,
+        "dt": dt,
+        "random": random.getstate(),
+        "numpy_random": np.random.get_state(),
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def pymunk_spaces(engine):
+    """pymunk Space objects held directly by the engine."""
+    return [value for value in vars(engine).values()
+            if type(value).__module__.startswith("pymunk") and hasattr(value, "_get_arbiters")]
+
+
+def exact_snapshot(engine):
+    """
+    True if snapshot() captures everything the next step depends on, i.e.
+    no contact in the engine's pymunk spaces left a bias velocity behind.
+    """
+    for space in pymunk_spaces(engine):
+        for arbiter in space._get_arbiters():
+            for i in range(arbiter.count):
+                if arbiter.contacts[i].jBias != 0:
+                    return False
+    return True
+
+
+def settle(engine, step, dt=DT):
+    """Step until exact_snapshot(engine); returns the step reached."""
+    for _ in range(MAX_SETTLE_STEPS):
+        if exact_snapshot(engine):
+            return step
+        engine.step(dt)
+        step += 1
+    raise RuntimeError(f"{engine.name}: no exact checkpoint within {MAX_SETTLE_STEPS} steps")
+
+
+def restore(data):
+    """Rebuild (engine, step, dt) from snapshot() bytes and reseed the global generators."""
+    state = pickle.loads(data)
+    if state.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported checkpoint version {state.get('version')!r}")
+    random.setstate(state["random"])
+    np.random.set_state(state["numpy_random"])
+    return state["engine"], state["step"], state["dt"]
+
+
+class CheckpointStore:
+    """A directory of checkpoints, indexed by step."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, step):
+        return os.path.join(self.directory, f"step_{step:012d}.ckpt")
+
+    def steps(self):
+        """Sorted steps that have a checkpoint."""
+        return sorted(int(name[5:-5]) for name in os.listdir(self.directory)
+                      if name.startswith("step_") and name.endswith(".ckpt"))
+
+    def save(self, engine, step, dt=DT):
+        data = snapshot(engine, step, dt)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path(step))
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return len(data)
+
+    def load(self, step):
+        with open(self.path(step), "rb") as f:
+            return restore(f.read())
+
+    def latest_before(self, step):
+        """Largest checkpointed step <= `step`, or None."""
+        steps = self.steps()
+        i = bisect.bisect_right(steps, step)
+        return steps[i - 1] if i else None
+
+
+def run_with_checkpoints(engine, steps, store, every, dt=DT, start=0):
+    """
+    Step from `start` to `steps`, saving a checkpoint at `start`, at every
+    multiple of `every` and at the end (each moved to the next exact step,
+    see settle()). Returns the total bytes written.
+    """
+    step_fn = engine.step
+    step = settle(engine, start, dt)
+    written = store.save(engine, step, dt)
+    while step < steps:
+        target = min(steps, (step // every + 1) * every)
+        for _ in range(target - step):
+            step_fn(dt)
+        step = settle(engine, target, dt)
+        written += store.save(engine, step, dt)
+    return written
+
+
+def fast_forward(store, target):
+    """Engine at step `target`, from the nearest earlier checkpoint; returns (engine, dt, stepped)."""
+    base = store.latest_before(target)
+    if base is None:
+        raise ValueError(f"no checkpoint at or before step {target}")
+    engine, step, dt = store.load(base)
+    step_fn = engine.step
+    for _ in range(target - step):
+        step_fn(dt)
+    return engine, dt, target - step
+
+
+def verify(model, steps, every, dt=DT):
+    """
+    Run `steps` steps straight through, then replay each interval from its
+    checkpoint; returns (intervals checked, intervals that differ, mean
+    snapshot bytes, mean snapshot + restore seconds).
+    """
+    engine = make_engine(model)
+    reference = {}
+    blobs = {}
+    step = 0
+    while True:
+        step = settle(engine, step, dt)
+        reference[step] = engine.state()
+        blobs[step] = snapshot(engine, step, dt)
+        if step >= steps:
+            break
+        target = min(steps, (step // every + 1) * every)
+        for _ in range(target - step):
+            engine.step(dt)
+        step = target
+
+    marks = sorted(blobs)
+    mismatches = 0
+    elapsed = 0.0
+    for start, stop in zip(marks, marks[1:]):
+        t0 = time.perf_counter()
+        resumed, step, step_dt = restore(snapshot(*restore(blobs[start])))
+        elapsed += time.perf_counter() - t0
+        for _ in range(stop - step):
+            resumed.step(step_dt)
+        if resumed.state() != reference[stop]:
+            mismatches += 1
+    intervals = len(marks) - 1
+    size = sum(len(blob) for blob in blobs.values()) / len(blobs)
+    return intervals, mismatches, size, elapsed / max(1, intervals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint, restore and fast-forward runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="run a model and checkpoint it periodically")
+    record.add_argument("--model", choices=sorted(ENGINES), default="3o-mini")
+    record.add_argument("--steps", type=int, default=1000000)
+    record.add_argument("--every", type=int, default=100000)
+    record.add_argument("--dt", type=float, default=DT)
+    record.add_argument("--dir", default="checkpoints")
+    record.add_argument("--resume", action="store_true",
+                        help="continue from the latest checkpoint in --dir")
+
+    goto = commands.add_parser("goto", help="restore the state at any step")
+    goto.add_argument("--dir", default="checkpoints")
+    goto.add_argument("--step", type=int, required=True)
+    goto.add_argument("--record", help="record the following frames to a trajectory file")
+    goto.add_argument("--frames", type=int, default=600, help="steps recorded with --record")
+
+    check = commands.add_parser("verify", help="check that restored runs are bit-identical")
+    check.add_argument("--model", choices=sorted(ENGINES), nargs="+", default=sorted(ENGINES))
+    check.add_argument("--steps", type=int, default=20000)
+    check.add_argument("--every", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        store = CheckpointStore(args.dir)
+        engine, start, dt = make_engine(args.model), 0, args.dt
+        latest = store.latest_before(args.steps)
+        if args.resume and latest is not None:
+            engine, start, dt = store.load(latest)
+        t0 = time.perf_counter()
+        written = run_with_checkpoints(engine, args.steps, store, args.every, dt, start)
+        elapsed = time.perf_counter() - t0
+        steps = store.steps()
+        print(f"{engine.name}: steps {start:,d}..{steps[-1]:,d} in {elapsed:.1f} s "
+              f"({(steps[-1] - start) / max(elapsed, 1e-9):,.0f} steps/s), "
+              f"{len(steps)} checkpoints, {written / 1024:.1f} KiB written")
+
+    elif args.command == "goto":
+        store = CheckpointStore(args.dir)
+        t0 = time.perf_counter()
+        engine, dt, stepped = fast_forward(store, args.step)
+        elapsed = time.perf_counter() - t0
+        x, y, vx, vy, angle = engine.state()
+        print(f"{engine.name} at step {args.step:,d} (restored {args.step - stepped:,d}, "
+              f"stepped {stepped:,d}) in {elapsed * 1000:.1f} ms")
+        print(f"  pos ({x:.6f}, {y:.6f})  vel ({vx:.6f}, {vy:.6f})  angle {angle:.6f} rad")
+        if args.record:
+            from trajectory import record_engine
+            record_engine(engine, args.record, args.frames, dt)
+            print(f"  recorded {args.frames:,d} steps to {args.record} (python replay.py "
+                  f"{args.record})")
+
+    else:
+        print(f"{'model':14s} {'intervals':>9s} {'mismatch':>8s} {'bytes':>7s} "
+              f"{'save+load':>10s}")
+        for model in args.model:
+            intervals, mismatches, size, seconds = verify(model, args.steps, args.every)
+            print(f"{model:14s} {intervals:9d} {mismatches:8d} {size:7.0f} "
+                  f"{seconds * 1e6:8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
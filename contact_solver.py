@@ -0,0 +1,561 @@
+"""
+Batched contact solver with resting-contact sleeping for multiball.py's world.
+
+MultiBallWorld resolves walls the way o3_Mini_High does, retrying the first
+touching edge up to collision_iterations times, and ball pairs with
+impulse and separation passes every step for every ball, even in a pile
+that stopped moving long ago. ContactWorld replaces both with one solver:
+
+- one pass per step gathers every contact of the awake balls: each edge's
+  half-plane (a ball wedged in a corner has two wall contacts, solved
+  together) and each ball pair from the spatial hash. Pairs within `margin`
+  of touching are included as speculative contacts, which may close the gap
+  but not overlap;
+- sequential impulses: the contacts are split into batches in which no ball
+  appears twice, and the batches are solved in turn for `iterations` sweeps.
+  Each contact clamps its accumulated normal impulse to >= 0 and its friction
+  impulse to the Coulomb cone (`friction` times the normal impulse). The
+  contacts in a batch share no ball, so a batch is a few array operations
+  and gives the same result as visiting its contacts one by one;
+- warm starting: accumulated impulses are kept per contact (ball pair, or
+  ball and edge) and applied at the start of the next step, so a resting
+  pile starts from the last step's answer instead of from zero;
+- leftover overlap is removed after integration by moving positions only,
+  which adds no energy.
+
+A ball that touches something and moves slower than `sleep_speed` relative
+to the container for `sleep_time` seconds falls asleep. From then on it is
+carried rigidly with the container (a rotation of its position, with the
+wall's velocity omega x r) instead of being integrated, gathered and solved;
+awake balls see it as a static body moving with the walls. It wakes when:
+
+- an awake ball hits it faster than `bounce_threshold`;
+- a ball it rests on (one below it in a cached contact) moves faster than
+  `sleep_speed`, so its support is going away;
+- the container has turned far enough for gravity to leave the cone its
+  supports can push in. The cone is measured when the ball falls asleep:
+  the normals of its loaded contacts that push it upwards, each widened by
+  atan(friction); carried with the container they turn against gravity.
+  The allowed turn is clamped to [min_wake_angle, max_wake_angle], so a
+  ball held some other way (it did come to rest) still sleeps a little.
+
+A ball perched on a steep neighbour wakes soon, one nested in a pile or
+flat on a wall sleeps for a long turn, and the pile does not wake all at
+once as it did with a fixed angle for every ball.
+
+Sleeping only pays off while the container turns slowly compared with how
+fast a disturbed pile settles again. At 0.05 rad/s about 60 of 500 and 300
+of 2000 balls are awake at a time, a step costs 1.2-1.7x less than without
+sleeping, and the pile moves in avalanches rather than creeping (kinetic
+energy per ball 41 vs 89 at 500 balls, but 653 vs 299 at 2000). From about
+0.1 rad/s sleepers held in place while the pile should be sliding make
+each avalanche larger and the step slower than without sleeping, so above
+`max_sleep_spin` (0.05 rad/s) every ball stays awake. When every ball
+sleeps, a step costs one rotation of their positions (nothing at all in a
+still container).
+
+Usage:
+    python contact_solver.py --balls 500 2000
+    python contact_solver.py --balls 500 --spin 0.05 0.2 1.0
+"""
+import argparse
+import itertools
+import math
+import time
+
+import numpy as np
+
+from engines import DT, FPS
+from multiball import (MAX_SUBSTEPS, MultiBallWorld, color_batches, container_radius_for,
+                       lattice_balls, max_overlap)
+from spatial_hash import SpatialHash
+
+
+class ContactWorld(MultiBallWorld):
+    """MultiBallWorld with a sequential-impulse contact solver and sleeping balls."""
+
+    def __init__(self, n, friction=0.3, iterations=8, margin=None, slop=0.25, correction=0.8,
+                 bounce_threshold=60.0, sleep=True, sleep_speed=5.0, sleep_time=0.5,
+                 min_wake_angle=math.radians(2), max_wake_angle=math.radians(30),
+                 max_sleep_spin=0.05, **kwargs):
+        super().__init__(n, **kwargs)
+        self.friction = friction
+        self.iterations = iterations
+        self.margin = self.ball_radius if margin is None else margin
+        self.slop = slop
+        self.correction = correction
+        self.bounce_threshold = bounce_threshold
+        self.sleep = sleep
+        self.sleep_speed = sleep_speed
+        self.sleep_time = sleep_time
+        self.cone = math.atan(friction)
+        self.min_wake_angle = min_wake_angle
+        self.max_wake_angle = max_wake_angle
+        self.max_sleep_spin = max_sleep_spin
+
+        self.apothem = self.hex_radius * math.cos(math.pi / self.num_sides)
+        self._near_sq = max(0.0, self.apothem - self.ball_radius - self.margin) ** 2
+        # Cells wide enough for speculative pairs as well as touching ones.
+        self.grid = SpatialHash(2 * self.ball_radius + self.margin,
+                                (self.grid.x0, self.grid.y0,
+                                 self.grid.x0 + self.grid.cols * self.grid.cell_size,
+                                 self.grid.y0 + self.grid.rows * self.grid.cell_size))
+
+        self.asleep = np.zeros(n, dtype=bool)
+        self.quiet_time = np.zeros(n)
+        self.sleep_angle = np.zeros(n)
+        self.wake_angle = np.zeros(n)
+        self.awake_count = n
+        self.batches = 0
+        self.substeps = 1
+        # Warm-starting cache: sorted contact keys, accumulated normal and friction impulses.
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._impulses = np.zeros((2, 0))
+
+    def reset(self, pos, vel):
+        super().reset(pos, vel)
+        self.wake_all()
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._impulses = np.zeros((2, 0))
+
+    def wake_all(self):
+        self.asleep[:] = False
+        self.quiet_time[:] = 0.0
+        self.awake_count = self.n
+
+    def step(self, dt=DT):
+        # Above max_sleep_spin the pile tumbles and sleeping costs more than it saves.
+        sleep = self.sleep and abs(self.hex_ang_vel) <= self.max_sleep_spin
+        if not sleep and self.asleep.any():
+            self.wake_all()
+        if sleep:
+            sleeping = np.flatnonzero(self.asleep)
+            if sleeping.size:
+                if self.hex_ang_vel:
+                    self.carry(sleeping, self.hex_ang_vel * dt)
+                turned = np.abs(self.hex_rotation - self.sleep_angle[sleeping])
+                woken = sleeping[turned > self.wake_angle[sleeping]]
+                # Balls resting on a moving ball have lost their support.
+                woken = np.union1d(woken, self.resting_on(self.moving()))
+                self.asleep[woken] = False
+                self.quiet_time[woken] = 0.0
+
+        awake = np.flatnonzero(~self.asleep)
+        self.awake_count = awake.size
+        if awake.size == 0:
+            self.hex_rotation += self.hex_ang_vel * dt
+            self.contacts = self.batches = 0
+            self.substeps = 1
+            return
+
+        # Enough substeps that no two bodies close in by more than `margin`
+        # within one, so every contact is gathered before it can overlap.
+        vx = self.vx[awake]
+        vy = self.vy[awake]
+        speed = (math.sqrt(float(np.max(vx * vx + vy * vy))) + self.gravity * dt
+                 + abs(self.hex_ang_vel) * self.hex_radius)
+        self.substeps = min(MAX_SUBSTEPS, max(1, math.ceil(2 * speed * dt / self.margin)))
+        h = dt / self.substeps
+        touching = np.zeros(self.n + 1, dtype=bool)
+        for _ in range(self.substeps):
+            self.hex_rotation += self.hex_ang_vel * h
+            a, b = self.substep(np.flatnonzero(~self.asleep), h)
+            touching[a] = True
+            touching[b] = True
+        if sleep:
+            self.fall_asleep(np.flatnonzero(~self.asleep), touching, dt)
+
+    def substep(self, awake, dt):
+        """Advance the awake balls by dt; returns the bodies of every contact (a, b)."""
+        moving = slice(None) if awake.size == self.n else awake
+        damping = self.air_friction ** (dt * FPS)
+        self.vy[moving] += self.gravity * dt
+        self.vx[moving] *= damping
+        self.vy[moving] *= damping
+
+        contacts = self.gather(awake)
+        self.contacts = len(contacts[0])
+        if self.contacts:
+            self.solve(contacts, dt)
+        else:
+            self.batches = 0
+            self.store_impulses(*contacts[-1:], np.zeros(0), np.zeros(0))
+            self.x[moving] += self.vx[moving] * dt
+            self.y[moving] += self.vy[moving] * dt
+        return contacts[0], contacts[1]
+
+    # ---------------------------
+    # Contacts
+    # ---------------------------
+    def gather(self, awake):
+        """
+        Every contact of an awake ball, as arrays (a, b, nx, ny, gap, wvx, wvy,
+        key): ball a is awake and is pushed along n; b is the other ball, or
+        n for a wall moving at (wvx, wvy); gap < 0 is overlap.
+        """
+        n = self.n
+        x, y = self.x, self.y
+        radius = self.ball_radius
+        reach = radius + self.margin
+        stride = n + self.num_sides
+        parts = []
+
+        # Walls: each edge's half-plane, for awake balls near the boundary.
+        cx, cy = self.hex_center
+        px = x[awake] - cx
+        py = y[awake] - cy
+        near = np.flatnonzero(px * px + py * py > self._near_sq)
+        if near.size:
+            balls = awake[near]
+            px = px[near]
+            py = py[near]
+            omega = self.hex_ang_vel
+            sector = 2 * math.pi / self.num_sides
+            for k in range(self.num_sides):
+                angle = self.hex_rotation + (k + 0.5) * sector
+                nx, ny = -math.cos(angle), -math.sin(angle)     # inward normal of edge k
+                distance = self.apothem + px * nx + py * ny
+                hit = np.flatnonzero(distance < reach)
+                if hit.size == 0:
+                    continue
+                d = distance[hit]
+                # The wall's velocity at the contact point, omega x r.
+                qx = px[hit] - nx * d
+                qy = py[hit] - ny * d
+                a = balls[hit]
+                parts.append((a, np.full(hit.size, n), np.full(hit.size, nx),
+                              np.full(hit.size, ny), d - radius, -omega * qy, omega * qx,
+                              a * stride + n + k))
+
+        # Ball pairs with at least one awake ball; a is the awake one.
+        if self.ball_collisions:
+            i, j, dx, dy, dist_sq = self.grid.pairs_within(x, y, 2 * radius + self.margin)
+            if awake.size < n:
+                live = np.flatnonzero(~(self.asleep[i] & self.asleep[j]))
+                i, j, dx, dy, dist_sq = i[live], j[live], dx[live], dy[live], dist_sq[live]
+                swap = self.asleep[i]
+                i, j = np.where(swap, j, i), np.where(swap, i, j)
+                dx = np.where(swap, -dx, dx)
+                dy = np.where(swap, -dy, dy)
+            if i.size:
+                dist = np.sqrt(dist_sq)
+                # Coincident centers: pick an arbitrary separating direction.
+                apart = dist > 0
+                safe = np.where(apart, dist, 1.0)
+                nx = np.where(apart, -dx / safe, 1.0)
+                ny = np.where(apart, -dy / safe, 0.0)
+                zero = np.zeros(i.size)
+                parts.append((i, j, nx, ny, dist - 2 * radius, zero, zero,
+                              np.minimum(i, j) * stride + np.maximum(i, j)))
+
+        if not parts:
+            empty = np.zeros(0)
+            index = np.zeros(0, dtype=np.int64)
+            return index, index, empty, empty, empty, empty, empty, index
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def solve(self, contacts, dt):
+        """Sequential impulses over the gathered contacts, then integrate and correct positions."""
+        a, b, nx, ny, gap, wvx, wvy, keys = contacts
+        n = self.n
+        tx, ty = -ny, nx
+
+        # Velocities with one extra static slot standing in for the walls.
+        vx = np.append(self.vx, 0.0)
+        vy = np.append(self.vy, 0.0)
+        asleep = np.append(self.asleep, True)
+
+        vn0 = (vx[a] - vx[b] - wvx) * nx + (vy[a] - vy[b] - wvy) * ny
+        # A hard hit wakes a sleeping ball, which then takes part in this step.
+        hit = np.flatnonzero(asleep[b] & (b < n) & (vn0 < -self.bounce_threshold))
+        if hit.size:
+            woken = b[hit]
+            asleep[woken] = False
+            self.asleep[woken] = False
+            self.quiet_time[woken] = 0.0
+        inv_b = np.where(asleep[b], 0.0, 1.0)
+        mass = 1.0 / (1.0 + inv_b)
+
+        # Speculative contacts may close their gap this step, touching ones may not approach.
+        target = np.where(gap > 0, -gap / dt, 0.0)
+
+        # Warm start from last step's accumulated impulses.
+        acc_n = np.zeros(len(a))
+        acc_t = np.zeros(len(a))
+        if self._keys.size:
+            slot = np.searchsorted(self._keys, keys)
+            np.clip(slot, 0, self._keys.size - 1, out=slot)
+            known = self._keys[slot] == keys
+            acc_n[known] = self._impulses[0, slot[known]]
+            acc_t[known] = self._impulses[1, slot[known]]
+            warm = np.flatnonzero(known)
+            if warm.size:
+                jx = acc_n[warm] * nx[warm] + acc_t[warm] * tx[warm]
+                jy = acc_n[warm] * ny[warm] + acc_t[warm] * ty[warm]
+                size = n + 1
+                vx += np.bincount(a[warm], jx, size) - np.bincount(b[warm], jx * inv_b[warm], size)
+                vy += np.bincount(a[warm], jy, size) - np.bincount(b[warm], jy * inv_b[warm], size)
+
+        order, bounds = color_batches(a, np.where(asleep[b], a, b), n + 1)
+        self.batches = len(bounds) - 1
+        a, b, nx, ny, tx, ty, wvx, wvy = (a[order], b[order], nx[order], ny[order], tx[order],
+                                          ty[order], wvx[order], wvy[order])
+        inv_b, mass, target, gap, vn0 = (inv_b[order], mass[order], target[order], gap[order],
+                                         vn0[order])
+        acc_n, acc_t, keys = acc_n[order], acc_t[order], keys[order]
+        friction = self.friction
+        spans = [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        for _ in range(self.iterations):
+            for s in spans:
+                ai, bi, ib = a[s], b[s], inv_b[s]
+                cnx, cny, ctx, cty = nx[s], ny[s], tx[s], ty[s]
+                rvx = vx[ai] - vx[bi] - wvx[s]
+                rvy = vy[ai] - vy[bi] - wvy[s]
+
+                # Friction, within the cone of the current normal impulse.
+                limit = friction * acc_n[s]
+                old = acc_t[s]
+                new = np.clip(old - (rvx * ctx + rvy * cty) * mass[s], -limit, limit)
+                lam = new - old
+                acc_t[s] = new
+                jx = lam * ctx
+                jy = lam * cty
+                rvx += jx * (1.0 + ib)
+                rvy += jy * (1.0 + ib)
+                vx[ai] += jx
+                vy[ai] += jy
+                vx[bi] -= jx * ib
+                vy[bi] -= jy * ib
+
+                # Normal: push apart only, up to the target separation speed.
+                old = acc_n[s]
+                new = np.maximum(old + (target[s] - (rvx * cnx + rvy * cny)) * mass[s], 0.0)
+                lam = new - old
+                acc_n[s] = new
+                jx = lam * cnx
+                jy = lam * cny
+                vx[ai] += jx
+                vy[ai] += jy
+                vx[bi] -= jx * ib
+                vy[bi] -= jy * ib
+
+        self.store_impulses(keys, acc_n, acc_t)
+
+        # Restitution, once the contacts are solved: a contact that was hit
+        # faster than bounce_threshold and pushed back now separates at
+        # `restitution` times its approach speed. Bouncing inside the sweeps
+        # instead adds energy to piles, and warm starting leaves it out.
+        bouncing = (vn0 < -self.bounce_threshold) & (acc_n > 0)
+        for s in spans:
+            c = s.start + np.flatnonzero(bouncing[s])
+            if c.size == 0:
+                continue
+            ai, bi, ib = a[c], b[c], inv_b[c]
+            vn = ((vx[ai] - vx[bi] - wvx[c]) * nx[c] + (vy[ai] - vy[bi] - wvy[c]) * ny[c])
+            old = acc_n[c]
+            lam = np.maximum(old + (-self.restitution * vn0[c] - vn) * mass[c], 0.0) - old
+            jx = lam * nx[c]
+            jy = lam * ny[c]
+            vx[ai] += jx
+            vy[ai] += jy
+            vx[bi] -= jx * ib
+            vy[bi] -= jy * ib
+
+        self.vx[:] = vx[:n]
+        self.vy[:] = vy[:n]
+        awake = ~self.asleep
+        self.x[awake] += self.vx[awake] * dt
+        self.y[awake] += self.vy[awake] * dt
+
+        # Overlap left after the move (linearized), removed over
+        # separation_passes passes that move positions only.
+        vn = (vx[a] - vx[b] - wvx) * nx + (vy[a] - vy[b] - wvy) * ny
+        gap = gap + vn * dt
+        size = n + 1
+        shift_x = np.zeros(size)
+        shift_y = np.zeros(size)
+        for _ in range(self.separation_passes):
+            depth = -(gap + (shift_x[a] - shift_x[b]) * nx + (shift_y[a] - shift_y[b]) * ny)
+            deep = np.flatnonzero(depth > self.slop)
+            if deep.size == 0:
+                break
+            push = (depth[deep] - self.slop) * self.correction * mass[deep]
+            px = push * nx[deep]
+            py = push * ny[deep]
+            ad, bd, ib = a[deep], b[deep], inv_b[deep]
+            shift_x += np.bincount(ad, px, size) - np.bincount(bd, px * ib, size)
+            shift_y += np.bincount(ad, py, size) - np.bincount(bd, py * ib, size)
+        self.x += shift_x[:n]
+        self.y += shift_y[:n]
+
+    def store_impulses(self, keys, acc_n, acc_t):
+        """
+        Cache this step's accumulated impulses for warm starting, plus the
+        cached ones between sleeping balls (and walls), so a pile that wakes
+        up starts out supported.
+        """
+        if self._keys.size:
+            stride = self.n + self.num_sides
+            still = np.append(self.asleep, np.ones(self.num_sides, dtype=bool))
+            keep = still[self._keys // stride] & still[self._keys % stride]
+            keys = np.concatenate((keys, self._keys[keep]))
+            acc_n = np.concatenate((acc_n, self._impulses[0, keep]))
+            acc_t = np.concatenate((acc_t, self._impulses[1, keep]))
+        order = np.argsort(keys)
+        self._keys = keys[order]
+        self._impulses = np.vstack((acc_n[order], acc_t[order]))
+
+    # ---------------------------
+    # Sleeping
+    # ---------------------------
+    def carry(self, balls, rotation):
+        """Rotate sleeping balls with the container and give them its velocity."""
+        cx, cy = self.hex_center
+        cos_r, sin_r = math.cos(rotation), math.sin(rotation)
+        dx = self.x[balls] - cx
+        dy = self.y[balls] - cy
+        dx, dy = cos_r * dx - sin_r * dy, sin_r * dx + cos_r * dy
+        self.x[balls] = cx + dx
+        self.y[balls] = cy + dy
+        self.vx[balls] = -self.hex_ang_vel * dy
+        self.vy[balls] = self.hex_ang_vel * dx
+
+    def fall_asleep(self, awake, touching, dt):
+        """Put to sleep the awake balls that have rested in contact for sleep_time."""
+        quiet = touching[awake] & (self.relative_speed_sq(awake) < self.sleep_speed ** 2)
+        quiet_time = np.where(quiet, self.quiet_time[awake] + dt, 0.0)
+        self.quiet_time[awake] = quiet_time
+        sleepers = awake[quiet_time >= self.sleep_time]
+        if sleepers.size:
+            self.asleep[sleepers] = True
+            self.sleep_angle[sleepers] = self.hex_rotation
+            self.wake_angle[sleepers] = np.clip(self.slack()[sleepers], self.min_wake_angle,
+                                                self.max_wake_angle)
+            self.carry(sleepers, 0.0)
+
+    def relative_speed_sq(self, balls):
+        """Squared speed of `balls` relative to the container at their positions."""
+        omega = self.hex_ang_vel
+        vx = self.vx[balls] + omega * (self.y[balls] - self.hex_center[1])
+        vy = self.vy[balls] - omega * (self.x[balls] - self.hex_center[0])
+        return vx * vx + vy * vy
+
+    def moving(self):
+        """Awake balls moving faster than sleep_speed relative to the container."""
+        awake = np.flatnonzero(~self.asleep)
+        return awake[self.relative_speed_sq(awake) > self.sleep_speed ** 2]
+
+    def resting_on(self, balls):
+        """Sleeping balls above one of `balls` in a cached contact, i.e. resting on it."""
+        stride = self.n + self.num_sides
+        keys = self._keys
+        a = keys // stride
+        b = keys % stride
+        pair = b < self.n
+        a, b = a[pair], b[pair]
+        upper = np.where(self.y[a] < self.y[b], a, b)
+        lower = a + b - upper
+        support = np.zeros(self.n, dtype=bool)
+        support[balls] = True
+        return np.unique(upper[support[lower] & self.asleep[upper]])
+
+    def slack(self):
+        """
+        Per ball, how far the container can turn (in its direction of
+        rotation) before gravity leaves the cone its supports can push in.
+        Supports are the contacts in the warm-starting cache that carry an
+        impulse and push the ball upwards; the cone spans their normals,
+        each widened by atan(friction); 0 for a ball the cone does not hold
+        up (something else does, since it came to rest).
+        """
+        n = self.n
+        stride = n + self.num_sides
+        keys = self._keys[self._impulses[0] > 0]
+        a = keys // stride
+        b = keys % stride
+        wall = b >= n
+        # Normal on ball a: away from ball b, or the edge's inward normal.
+        edge_angle = self.hex_rotation + (b - n + 0.5) * (2 * math.pi / self.num_sides)
+        other = np.where(wall, a, b)
+        nx = np.where(wall, -np.cos(edge_angle), self.x[a] - self.x[other])
+        ny = np.where(wall, -np.sin(edge_angle), self.y[a] - self.y[other])
+        # Angles in (-pi, pi] from straight up (-y on screen, against
+        # gravity), of the normal on a and of the opposite one on b.
+        angle = np.arctan2(nx, -ny)
+        pair = ~wall
+        balls = np.concatenate((a, b[pair]))
+        angle = np.concatenate((angle, angle[pair] - np.copysign(math.pi, angle[pair])))
+        support = np.abs(angle) < math.pi / 2
+        balls = balls[support]
+        angle = angle[support]
+
+        low = np.full(n, np.inf)
+        high = np.full(n, -np.inf)
+        np.minimum.at(low, balls, angle)
+        np.maximum.at(high, balls, angle)
+        low -= self.cone
+        high += self.cone
+        # Turning by theta turns every normal by theta and leaves gravity.
+        side = -low if self.hex_ang_vel >= 0 else high
+        held = (low <= 0) & (high >= 0)
+        return np.where(held, side, 0.0)
+
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+def settled_scene(world, n, hex_radius, radius, settle_steps):
+    world.reset(*lattice_balls(n, radius, hex_radius, speed=20.0))
+    for _ in range(settle_steps):
+        world.step()
+    return world
+
+
+def time_steps(world, steps):
+    """Means over `steps` steps of the seconds per step, awake balls and kinetic energy per ball."""
+    elapsed = awake = energy = 0.0
+    for _ in range(steps):
+        start = time.perf_counter()
+        world.step()
+        elapsed += time.perf_counter() - start
+        awake += getattr(world, "awake_count", world.n)
+        energy += 0.5 * float(np.mean(world.vx ** 2 + world.vy ** 2))
+    return elapsed / steps, awake / steps, energy / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of a settled pile, with and without sleeping")
+    parser.add_argument("--balls", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--radius", type=float, default=4.0, help="ball radius, px")
+    parser.add_argument("--spin", type=float, nargs="+", default=[0.001],
+                        help="container angular velocities, rad/s")
+    parser.add_argument("--settle", type=float, default=10.0, help="seconds simulated first")
+    parser.add_argument("--steps", type=int, default=600,
+                        help="steps timed afterwards (means over them are reported)")
+    args = parser.parse_args()
+    settle_steps = int(args.settle * FPS)
+
+    print(f"{'balls':>6s} {'spin':>6s} {'solver':22s} {'ms/step':>8s} {'awake':>6s} "
+          f"{'contacts':>8s} {'batches':>7s} {'KE/ball':>8s} {'overlap':>8s}")
+    for n, spin in itertools.product(args.balls, args.spin):
+        hex_radius = container_radius_for(n, args.radius)
+        shape = dict(ball_radius=args.radius, hex_radius=hex_radius, hex_ang_vel=spin)
+        worlds = [
+            ("multiball (passes)", MultiBallWorld(n, **shape)),
+            ("contacts, no sleeping", ContactWorld(n, sleep=False, **shape)),
+            ("contacts + sleeping", ContactWorld(n, **shape)),
+        ]
+        baseline = None
+        for label, world in worlds:
+            settled_scene(world, n, hex_radius, args.radius, settle_steps)
+            per_step, awake, energy = time_steps(world, args.steps)
+            baseline = baseline or per_step
+            batches = getattr(world, "batches", "")
+            print(f"{n:6d} {spin:6.3f} {label:22s} {per_step * 1000:8.3f} {awake:6.0f} "
+                  f"{world.contacts:8d} {batches!s:>7s} {energy:8.1f} "
+                  f"{max_overlap(world):8.2f}  ({baseline / per_step:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
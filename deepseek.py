@@ -1,8 +1,15 @@
 import pygame
 import math
 
+from ball_state import BallState
+from fixed_step import lerp
+from frame_budget import FULL, SKIP, FrameScheduler
+from phase_timer import from_env as phase_timer
+from renderer import DirtyRectRenderer, init_video
+from telemetry import from_env as telemetry
+
 # Initialize Pygame
-pygame.init()
+init_video()
 
 # Constants
 WIDTH, HEIGHT = 800, 600
@@ -14,6 +21,7 @@ AIR_FRICTION = 0.02  # per second
 RESTITUTION = 0.8
 FRICTION = 0.3
 ANGULAR_VELOCITY = math.radians(180)  # 180 degrees per second in radians
+PHYSICS_HZ = 240  # fixed physics rate, independent of the frame rate
 
 # Colors
 WHITE = (255, 255, 255)
@@ -23,15 +31,6 @@ RED = (255, 0, 0)
 # Setup display
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Bouncing Ball in Spinning Hexagon")
-clock = pygame.time.Clock()
-
-class Ball:
-    def __init__(self, x, y, radius):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.vx = 0.0
-        self.vy = 0.0
 
 class Hexagon:
     def __init__(self, center, radius):
@@ -68,105 +67,138 @@ def closest_point_on_segment(A, B, C):
     return (Px, Py)
 
 # Initialize ball and hexagon
-ball = Ball(CENTER[0], CENTER[1], BALL_RADIUS)
-ball.vx = 100.0  # initial velocity
+ball = BallState(CENTER[0], CENTER[1], 100.0, 0.0, BALL_RADIUS)  # initial velocity 100 px/s
 hexagon = Hexagon(CENTER, HEX_RADIUS)
 
+# Cached ball and hexagon sprites; only the regions that change are redrawn
+renderer = DirtyRectRenderer(screen, CENTER, HEX_RADIUS, BALL_RADIUS, WHITE, RED, BLACK)
+
+# Per-phase timing, enabled with PHASE_TIMING (see phase_timer.py)
+timer = phase_timer("deepseek")
+# Live overlay, enabled with TELEMETRY (see telemetry.py)
+hud = telemetry("deepseek", GRAVITY, step_hz=PHYSICS_HZ, floor_y=HEIGHT,
+                velocity=(ball.vx, ball.vy))
+
+# Physics never drops steps; under load, frames are degraded or skipped
+# instead (see frame_budget.py)
+frames = FrameScheduler(PHYSICS_HZ, 60)
+loop = frames.loop
+dt = loop.dt  # fixed step in seconds
+prev_ball = (ball.x, ball.y)
+prev_angle = hexagon.rotation_angle
 running = True
+timer.start()
 while running:
-    dt = clock.tick(60) / 1000.0  # dt in seconds
-
     # Handle events
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-
-    # Update hexagon rotation
-    hexagon.rotation_angle += ANGULAR_VELOCITY * dt
-
-    # Update ball physics (gravity and air friction)
-    ball.vy += GRAVITY * dt
-    ball.vx *= (1 - AIR_FRICTION * dt)
-    ball.vy *= (1 - AIR_FRICTION * dt)
-
-    # Update ball position
-    ball.x += ball.vx * dt
-    ball.y += ball.vy * dt
-
-    # Check collisions with hexagon walls
-    vertices = hexagon.get_vertices()
-    for i in range(6):
-        A = vertices[i]
-        B = vertices[(i + 1) % 6]
-        C = (ball.x, ball.y)
-
-        # Find closest point on the segment AB
-        P = closest_point_on_segment(A, B, C)
-        distance = math.hypot(C[0] - P[0], C[1] - P[1])
-
-        if distance < ball.radius:
-            # Compute midpoint of AB
-            mid_x = (A[0] + B[0]) / 2
-            mid_y = (A[1] + B[1]) / 2
-            # Compute normal vector (from center to midpoint)
-            normal_x = mid_x - hexagon.center[0]
-            normal_y = mid_y - hexagon.center[1]
-            # Normalize the normal vector
-            norm = math.hypot(normal_x, normal_y)
-            if norm == 0:
-                continue  # avoid division by zero
-            normal_x /= norm
-            normal_y /= norm
-
-            # Compute velocity of point P due to rotation
-            # P's position relative to center
-            rel_px = P[0] - hexagon.center[0]
-            rel_py = P[1] - hexagon.center[1]
-            # Velocity of P: v = (-omega * rel_py, omega * rel_px)
-            omega = ANGULAR_VELOCITY
-            v_wall_x = -omega * rel_py
-            v_wall_y = omega * rel_px
-
-            # Relative velocity
-            rel_vx = ball.vx - v_wall_x
-            rel_vy = ball.vy - v_wall_y
-
-            # Dot product of relative velocity and normal
-            dot_product = rel_vx * normal_x + rel_vy * normal_y
-
-            if dot_product < 0:  # Moving towards the wall
-                # Compute penetration vector
-                penetration = ball.radius - distance
-                ball.x += normal_x * penetration
-                ball.y += normal_y * penetration
-
-                # Compute new relative velocity after collision
-                # Restitution affects the normal component
-                new_normal_v = -RESTITUTION * dot_product
-                # Tangential component is scaled by (1 - FRICTION)
-                tangent_vx = rel_vx - dot_product * normal_x
-                tangent_vy = rel_vy - dot_product * normal_y
-                tangent_vx *= (1 - FRICTION)
-                tangent_vy *= (1 - FRICTION)
-
-                # New relative velocity
-                new_rel_vx = new_normal_v * normal_x + tangent_vx
-                new_rel_vy = new_normal_v * normal_y + tangent_vy
-
-                # New ball velocity
-                ball.vx = v_wall_x + new_rel_vx
-                ball.vy = v_wall_y + new_rel_vy
-
-    # Draw everything
-    screen.fill(BLACK)
-
-    # Draw hexagon
-    vertices = hexagon.get_vertices()
-    pygame.draw.polygon(screen, WHITE, vertices, 2)
-
-    # Draw ball
-    pygame.draw.circle(screen, RED, (int(ball.x), int(ball.y)), ball.radius)
-
-    pygame.display.flip()
-
+        elif event.type == pygame.VIDEOEXPOSE:
+            renderer.invalidate()
+    timer.lap("events")
+
+    # Run as many fixed physics steps as the elapsed time covers
+    for _ in range(loop.advance()):
+        prev_ball = (ball.x, ball.y)
+        prev_angle = hexagon.rotation_angle
+
+        # Update hexagon rotation
+        hexagon.rotation_angle += ANGULAR_VELOCITY * dt
+
+        # Update ball physics (gravity and air friction)
+        ball.vy += GRAVITY * dt
+        ball.vx *= (1 - AIR_FRICTION * dt)
+        ball.vy *= (1 - AIR_FRICTION * dt)
+
+        # Update ball position
+        ball.x += ball.vx * dt
+        ball.y += ball.vy * dt
+        timer.lap("integrate")
+
+        # Check collisions with hexagon walls
+        vertices = hexagon.get_vertices()
+        for i in range(6):
+            A = vertices[i]
+            B = vertices[(i + 1) % 6]
+            C = (ball.x, ball.y)
+
+            # Find closest point on the segment AB
+            P = closest_point_on_segment(A, B, C)
+            distance = math.hypot(C[0] - P[0], C[1] - P[1])
+
+            if distance < ball.radius:
+                # Compute midpoint of AB
+                mid_x = (A[0] + B[0]) / 2
+                mid_y = (A[1] + B[1]) / 2
+                # Compute normal vector (from center to midpoint)
+                normal_x = mid_x - hexagon.center[0]
+                normal_y = mid_y - hexagon.center[1]
+                # Normalize the normal vector
+                norm = math.hypot(normal_x, normal_y)
+                if norm == 0:
+                    continue  # avoid division by zero
+                normal_x /= norm
+                normal_y /= norm
+
+                # Compute velocity of point P due to rotation
+                # P's position relative to center
+                rel_px = P[0] - hexagon.center[0]
+                rel_py = P[1] - hexagon.center[1]
+                # Velocity of P: v = (-omega * rel_py, omega * rel_px)
+                omega = ANGULAR_VELOCITY
+                v_wall_x = -omega * rel_py
+                v_wall_y = omega * rel_px
+
+                # Relative velocity
+                rel_vx = ball.vx - v_wall_x
+                rel_vy = ball.vy - v_wall_y
+
+                # Dot product of relative velocity and normal
+                dot_product = rel_vx * normal_x + rel_vy * normal_y
+
+                if dot_product < 0:  # Moving towards the wall
+                    # Compute penetration vector
+                    penetration = ball.radius - distance
+                    ball.x += normal_x * penetration
+                    ball.y += normal_y * penetration
+
+                    # Compute new relative velocity after collision
+                    # Restitution affects the normal component
+                    new_normal_v = -RESTITUTION * dot_product
+                    # Tangential component is scaled by (1 - FRICTION)
+                    tangent_vx = rel_vx - dot_product * normal_x
+                    tangent_vy = rel_vy - dot_product * normal_y
+                    tangent_vx *= (1 - FRICTION)
+                    tangent_vy *= (1 - FRICTION)
+
+                    # New relative velocity
+                    new_rel_vx = new_normal_v * normal_x + tangent_vx
+                    new_rel_vy = new_normal_v * normal_y + tangent_vy
+
+                    # New ball velocity
+                    ball.vx = v_wall_x + new_rel_vx
+                    ball.vy = v_wall_y + new_rel_vy
+        timer.lap("collide")
+        hud.step(ball.x, ball.y, ball.vx, ball.vy)
+
+    quality = frames.plan()
+    if quality != SKIP:
+        # Draw everything, interpolated between the last two physics states
+        alpha = loop.alpha
+        draw_angle = lerp(prev_angle, hexagon.rotation_angle, alpha)
+        draw_x = lerp(prev_ball[0], ball.x, alpha)
+        draw_y = lerp(prev_ball[1], ball.y, alpha)
+        dirty = renderer.draw(draw_angle, draw_x, draw_y, outline=quality == FULL)
+        if quality == FULL:
+            dirty += hud.draw(screen)
+        timer.lap("draw")
+        pygame.display.update(dirty)
+        timer.lap("display")
+    hud.frame()
+    frames.wait()
+    timer.lap("wait")
+
+timer.report()
+hud.report()
+frames.report("deepseek")
 pygame.quit()
\ No newline at end of file
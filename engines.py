@@ -0,0 +1,689 @@
+"""
+Headless ports of the physics in each model's script.
+
+Every class below reproduces the update step of one script (same order of
+operations, same collision routine, same constants) without opening a window
+or waiting on a frame limiter, so the models can be stepped side by side.
+
+All engines share the same interface:
+
+    engine.reset(pos, vel)   # place the ball; pos in px, vel in px/s
+    engine.step(dt)          # advance the simulation by dt seconds
+    engine.state()           # (x, y, vx, vy, angle) in px, px/s, radians
+
+Scripts that work in "per frame" units (gemini, kimi, o1, o3_Mini_High,
+gpt_4o's rotation) are stepped as if a frame lasted 1/60 s; a different dt
+scales their per-frame quantities by dt * FPS.
+"""
+import math
+
+from ball_state import BallState
+from vec2 import Vector2
+
+WIDTH, HEIGHT = 800, 600
+FPS = 60
+DT = 1 / FPS
+
+# Identical starting point used by the comparison tools:
+# 100 px above the hexagon center, moving right and slightly up.
+INITIAL_POS = (WIDTH / 2, HEIGHT / 2 - 100)
+INITIAL_VEL = (150.0, -50.0)
+
+
+# ---------------------------
+# 3o-mini.py
+# ---------------------------
+class ThreeOMini:
+    """Vector2 state, seconds-based dt, wall velocity from omega x r."""
+
+    name = "3o-mini"
+
+    def __init__(self, restitution=0.9, wall_friction=0.98, hex_angular_velocity=0.5,
+                 gravity=500, air_friction=0.999, ball_radius=15, hex_radius=250,
+                 num_sides=6):
+        self.restitution = restitution
+        self.wall_friction = wall_friction
+        self.hex_angular_velocity = hex_angular_velocity
+        self.gravity = Vector2(0, gravity)
+        self.air_friction = air_friction
+        self.ball_radius = ball_radius
+        self.hex_radius = hex_radius
+        self.num_sides = num_sides
+
+        self.hex_center = Vector2(WIDTH // 2, HEIGHT // 2)
+        self.local_hex_vertices = []
+        for i in range(num_sides):
+            angle = 2 * math.pi * i / num_sides
+            self.local_hex_vertices.append(
+                Vector2(hex_radius * math.cos(angle), hex_radius * math.sin(angle)))
+
+        self.hex_angle = 0.0
+        self.ball_pos = Vector2(WIDTH // 2, HEIGHT // 2 - 100)
+        self.ball_vel = Vector2(150, -50)
+
+    def reset(self, pos, vel):
+        self.hex_angle = 0.0
+        self.ball_pos = Vector2(pos)
+        self.ball_vel = Vector2(vel)
+
+    def get_rotated_hex_vertices(self, center, angle):
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        return [center + Vector2(v.x * cos_a - v.y * sin_a, v.x * sin_a + v.y * cos_a)
+                for v in self.local_hex_vertices]
+
+    def process_collisions(self, ball_pos, ball_vel, hex_vertices):
+        n = len(hex_vertices)
+        for i in range(n):
+            p1 = hex_vertices[i]
+            p2 = hex_vertices[(i + 1) % n]
+
+            # closest_point_on_segment
+            ab = p2 - p1
+            ab_len2 = ab.length_squared()
+            if ab_len2 == 0:
+                closest = p1
+            else:
+                t = max(0, min(1, (ball_pos - p1).dot(ab) / ab_len2))
+                closest = p1 + t * ab
+
+            diff = ball_pos - closest
+            dist = diff.length()
+            if dist < self.ball_radius:
+                if dist != 0:
+                    normal = diff.normalize()
+                else:
+                    normal = (ball_pos - (p1 + p2) * 0.5).normalize()
+                penetration = self.ball_radius - dist
+
+                r = closest - self.hex_center
+                wall_velocity = self.hex_angular_velocity * Vector2(-r.y, r.x)
+                rel_vel = ball_vel - wall_velocity
+
+                if rel_vel.dot(normal) < 0:
+                    vn = normal * rel_vel.dot(normal)
+                    vt = rel_vel - vn
+                    vn = -self.restitution * vn
+                    vt *= self.wall_friction
+                    ball_vel = vn + vt + wall_velocity
+                    ball_pos += normal * penetration
+        return ball_pos, ball_vel
+
+    def step(self, dt=DT):
+        self.hex_angle += self.hex_angular_velocity * dt
+        self.ball_vel += self.gravity * dt
+        self.ball_vel *= self.air_friction ** (dt * FPS)
+        self.ball_pos += self.ball_vel * dt
+        hex_vertices = self.get_rotated_hex_vertices(self.hex_center, self.hex_angle)
+        self.ball_pos, self.ball_vel = self.process_collisions(
+            self.ball_pos, self.ball_vel, hex_vertices)
+
+    def state(self):
+        return (self.ball_pos.x, self.ball_pos.y, self.ball_vel.x, self.ball_vel.y,
+                self.hex_angle)
+
+
+# ---------------------------
+# deepseek.py
+# ---------------------------
+class DeepseekHexagon:
+    def __init__(self, center, radius):
+        self.center = center
+        self.radius = radius
+        self.rotation_angle = 0.0
+
+    def get_vertices(self):
+        vertices = []
+        cx, cy = self.center
+        for i in range(6):
+            theta = self.rotation_angle + math.radians(60 * i)
+            vertices.append((cx + self.radius * math.cos(theta),
+                             cy + self.radius * math.sin(theta)))
+        return vertices
+
+
+def deepseek_closest_point_on_segment(A, B, C):
+    Ax, Ay = A
+    Bx, By = B
+    Cx, Cy = C
+    ABx = Bx - Ax
+    ABy = By - Ay
+    t = ((Cx - Ax) * ABx + (Cy - Ay) * ABy) / (ABx**2 + ABy**2 + 1e-8)
+    t = max(0.0, min(1.0, t))
+    return (Ax + t * ABx, Ay + t * ABy)
+
+
+class Deepseek:
+    """Ball/Hexagon classes, tuple vertices, normal taken from the edge midpoint."""
+
+    name = "deepseek"
+
+    def __init__(self, restitution=0.8, friction=0.3, angular_velocity=math.radians(180),
+                 gravity=600, air_friction=0.02, ball_radius=10, hex_radius=200):
+        self.restitution = restitution
+        self.friction = friction
+        self.angular_velocity = angular_velocity
+        self.gravity = gravity
+        self.air_friction = air_friction
+        center = (WIDTH // 2, HEIGHT // 2)
+        self.ball = BallState(center[0], center[1], 100.0, 0.0, ball_radius)
+        self.hexagon = DeepseekHexagon(center, hex_radius)
+
+    def reset(self, pos, vel):
+        self.hexagon.rotation_angle = 0.0
+        self.ball.x, self.ball.y = pos
+        self.ball.vx, self.ball.vy = vel
+
+    def step(self, dt=DT):
+        ball = self.ball
+        hexagon = self.hexagon
+        hexagon.rotation_angle += self.angular_velocity * dt
+
+        ball.vy += self.gravity * dt
+        ball.vx *= (1 - self.air_friction * dt)
+        ball.vy *= (1 - self.air_friction * dt)
+        ball.x += ball.vx * dt
+        ball.y += ball.vy * dt
+
+        self.collide(ball, hexagon.get_vertices())
+
+    def collide(self, ball, vertices):
+        """Resolve the ball against the six edges, in place."""
+        hexagon = self.hexagon
+        for i in range(6):
+            A = vertices[i]
+            B = vertices[(i + 1) % 6]
+            C = (ball.x, ball.y)
+            P = deepseek_closest_point_on_segment(A, B, C)
+            distance = math.hypot(C[0] - P[0], C[1] - P[1])
+
+            if distance < ball.radius:
+                normal_x = (A[0] + B[0]) / 2 - hexagon.center[0]
+                normal_y = (A[1] + B[1]) / 2 - hexagon.center[1]
+                norm = math.hypot(normal_x, normal_y)
+                if norm == 0:
+                    continue
+                normal_x /= norm
+                normal_y /= norm
+
+                omega = self.angular_velocity
+                v_wall_x = -omega * (P[1] - hexagon.center[1])
+                v_wall_y = omega * (P[0] - hexagon.center[0])
+                rel_vx = ball.vx - v_wall_x
+                rel_vy = ball.vy - v_wall_y
+                dot_product = rel_vx * normal_x + rel_vy * normal_y
+
+                if dot_product < 0:
+                    penetration = ball.radius - distance
+                    ball.x += normal_x * penetration
+                    ball.y += normal_y * penetration
+
+                    new_normal_v = -self.restitution * dot_product
+                    tangent_vx = (rel_vx - dot_product * normal_x) * (1 - self.friction)
+                    tangent_vy = (rel_vy - dot_product * normal_y) * (1 - self.friction)
+                    ball.vx = v_wall_x + new_normal_v * normal_x + tangent_vx
+                    ball.vy = v_wall_y + new_normal_v * normal_y + tangent_vy
+
+    def state(self):
+        return (self.ball.x, self.ball.y, self.ball.vx, self.ball.vy,
+                self.hexagon.rotation_angle)
+
+
+# ---------------------------
+# gemini.py
+# ---------------------------
+class Gemini:
+    """Per-frame units, angle in degrees, plain reflection plus screen clamping."""
+
+    name = "gemini"
+
+    def __init__(self, friction=0.98, rotation_speed=0.02, gravity=0.5, ball_radius=10,
+                 hexagon_radius=150, num_sides=6):
+        self.friction = friction
+        self.rotation_speed = rotation_speed
+        self.gravity = gravity
+        self.ball_radius = ball_radius
+        self.hexagon_radius = hexagon_radius
+        self.num_sides = num_sides
+        self.hexagon_center = (WIDTH // 2, HEIGHT // 2)
+        self.rotation_angle = 0
+        self.ball_x = WIDTH // 2
+        self.ball_y = HEIGHT // 4
+        self.ball_vx = 5
+        self.ball_vy = 0
+
+    def reset(self, pos, vel):
+        self.rotation_angle = 0
+        self.ball_x, self.ball_y = pos
+        self.ball_vx = vel[0] / FPS
+        self.ball_vy = vel[1] / FPS
+
+    def ball_collision(self, ball_x, ball_y, ball_vx, ball_vy, center, radius, angle):
+        ball_radius = self.ball_radius
+        num_sides = self.num_sides
+        for i in range(num_sides):
+            angle_rad1 = math.radians(angle + i * (360 / num_sides))
+            angle_rad2 = math.radians(angle + (i + 1) * (360 / num_sides))
+            x1 = center[0] + radius * math.cos(angle_rad1)
+            y1 = center[1] + radius * math.sin(angle_rad1)
+            x2 = center[0] + radius * math.cos(angle_rad2)
+            y2 = center[1] + radius * math.sin(angle_rad2)
+
+            dx = x2 - x1
+            dy = y2 - y1
+            t = ((ball_x - x1) * dx + (ball_y - y1) * dy) / (dx*dx + dy*dy)
+            if 0 <= t <= 1:
+                closest_x = x1 + t * dx
+                closest_y = y1 + t * dy
+                distance = math.sqrt((ball_x - closest_x)**2 + (ball_y - closest_y)**2)
+                if distance <= ball_radius:
+                    nx = -(y2 - y1)
+                    ny = x2 - x1
+                    norm_length = math.sqrt(nx*nx + ny*ny)
+                    nx /= norm_length
+                    ny /= norm_length
+                    dot_product = ball_vx * nx + ball_vy * ny
+                    ball_vx -= 2 * dot_product * nx
+                    ball_vy -= 2 * dot_product * ny
+                    ball_x += nx * (ball_radius - distance + 1)
+                    ball_y += ny * (ball_radius - distance + 1)
+                    ball_vx *= self.friction
+                    ball_vy *= self.friction
+                    break
+        return ball_x, ball_y, ball_vx, ball_vy
+
+    def step(self, dt=DT):
+        frames = dt * FPS
+        self.ball_x += self.ball_vx * frames
+        self.ball_y += self.ball_vy * frames
+        self.ball_vy += self.gravity * frames
+
+        self.ball_x, self.ball_y, self.ball_vx, self.ball_vy = self.ball_collision(
+            self.ball_x, self.ball_y, self.ball_vx, self.ball_vy,
+            self.hexagon_center, self.hexagon_radius, self.rotation_angle)
+
+        # Screen clamping from the original ("optional - for debugging").
+        r = self.ball_radius
+        if self.ball_x + r > WIDTH:
+            self.ball_x = WIDTH - r
+            self.ball_vx *= -self.friction
+        if self.ball_x - r < 0:
+            self.ball_x = r
+            self.ball_vx *= -self.friction
+        if self.ball_y + r > HEIGHT:
+            self.ball_y = HEIGHT - r
+            self.ball_vy *= -self.friction
+        if self.ball_y - r < 0:
+            self.ball_y = r
+            self.ball_vy *= -self.friction
+
+        self.rotation_angle += self.rotation_speed * frames
+
+    def state(self):
+        return (self.ball_x, self.ball_y, self.ball_vx * FPS, self.ball_vy * FPS,
+                math.radians(self.rotation_angle))
+
+
+# ---------------------------
+# gpt_4o.py
+# ---------------------------
+class Gpt4o:
+    """pymunk Space with a kinematic hexagon body rotated by setting its angle."""
+
+    name = "gpt_4o"
+
+    def __init__(self, rotation_speed=0.05, gravity=980, hexagon_radius=200,
+                 wall_elasticity=0.9, wall_friction=0.5, ball_elasticity=0.8,
+                 ball_friction=0.4, ball_radius=20):
+        import pymunk
+
+        self.rotation_speed = rotation_speed
+        self.hexagon_radius = hexagon_radius
+        self.ball_radius = ball_radius
+        self.space = pymunk.Space()
+        self.space.gravity = (0, gravity)
+
+        self.hexagon_body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
+        self.hexagon_body.position = (WIDTH // 2, HEIGHT // 2)
+        self.space.add(self.hexagon_body)
+        for i in range(6):
+            angle1 = math.radians(60 * i)
+            angle2 = math.radians(60 * (i + 1))
+            p1 = (math.cos(angle1) * hexagon_radius, math.sin(angle1) * hexagon_radius)
+            p2 = (math.cos(angle2) * hexagon_radius, math.sin(angle2) * hexagon_radius)
+            shape = pymunk.Segment(self.hexagon_body, p1, p2, 5)
+            shape.elasticity = wall_elasticity
+            shape.friction = wall_friction
+            self.space.add(shape)
+
+        self.ball_body = pymunk.Body(1, pymunk.moment_for_circle(1, 0, ball_radius))
+        self.ball_body.position = (WIDTH // 2, HEIGHT // 4)
+        shape = pymunk.Circle(self.ball_body, ball_radius)
+        shape.elasticity = ball_elasticity
+        shape.friction = ball_friction
+        self.space.add(self.ball_body, shape)
+
+    def reset(self, pos, vel):
+        self.hexagon_body.angle = 0.0
+        self.ball_body.position = pos
+        self.ball_body.velocity = vel
+        self.ball_body.angular_velocity = 0.0
+
+    def step(self, dt=DT):
+        self.hexagon_body.angle += self.rotation_speed * dt * FPS
+        self.space.step(dt)
+
+    def state(self):
+        x, y = self.ball_body.position
+        vx, vy = self.ball_body.velocity
+        return (x, y, vx, vy, self.hexagon_body.angle)
+
+
+# ---------------------------
+# kimi.py
+# ---------------------------
+def kimi_rotate_point(point, angle):
+    theta = math.radians(angle)
+    x, y = point
+    return (x * math.cos(theta) - y * math.sin(theta),
+            x * math.sin(theta) + y * math.cos(theta))
+
+
+class Kimi:
+    """Per-frame units, dict-based ball, inline edge loop with restitution only."""
+
+    name = "kimi"
+
+    def __init__(self, gravity=0.8, friction=0.98, restitution=0.8, angular_speed=0.5,
+                 ball_radius=10, hex_size=200):
+        self.gravity = gravity
+        self.friction = friction
+        self.restitution = restitution
+        self.angular_speed = angular_speed
+        self.ball_radius = ball_radius
+        self.center = (WIDTH // 2, HEIGHT // 2)
+        self.ball = BallState(self.center[0], self.center[1] - 150, 0, 0, ball_radius)
+        self.original_vertices = []
+        for i in range(6):
+            angle = math.radians(60 * i)
+            self.original_vertices.append((hex_size * math.cos(angle),
+                                           hex_size * math.sin(angle)))
+        self.angle = 0
+
+    def reset(self, pos, vel):
+        self.angle = 0
+        self.ball = BallState(pos[0], pos[1], vel[0] / FPS, vel[1] / FPS, self.ball_radius)
+
+    def step(self, dt=DT):
+        frames = dt * FPS
+        ball = self.ball
+        center = self.center
+        ball_radius = self.ball_radius
+
+        self.angle += self.angular_speed * frames
+        self.angle %= 360
+
+        ball.vy += self.gravity * frames
+        ball.vx *= self.friction ** frames
+        ball.vy *= self.friction ** frames
+        ball.x += ball.vx * frames
+        ball.y += ball.vy * frames
+
+        current_vertices = [kimi_rotate_point(v, self.angle) for v in self.original_vertices]
+        hex_points = [(center[0] + x, center[1] + y) for (x, y) in current_vertices]
+        self.collide(ball, hex_points)
+
+    def collide(self, ball, hex_points):
+        """Resolve the ball against the six edges, in place."""
+        ball_radius = self.ball_radius
+        for i in range(6):
+            ax, ay = hex_points[i]
+            bx, by = hex_points[(i + 1) % 6]
+            dx = bx - ax
+            dy = by - ay
+            if dx == 0 and dy == 0:
+                continue
+
+            cx = ball.x
+            cy = ball.y
+            dot = (cx - ax) * dx + (cy - ay) * dy
+            len_sq = dx*dx + dy*dy
+            closest_x = ax
+            closest_y = ay
+            if dot > 0:
+                t = min(dot / len_sq, 1)
+                closest_x = ax + dx * t
+                closest_y = ay + dy * t
+
+            distance = math.hypot(cx - closest_x, cy - closest_y)
+            if distance < ball_radius:
+                normal_x = -dy / math.sqrt(len_sq)
+                normal_y = dx / math.sqrt(len_sq)
+                dot_product = ball.vx * normal_x + ball.vy * normal_y
+                ball.vx -= 2 * dot_product * normal_x * self.restitution
+                ball.vy -= 2 * dot_product * normal_y * self.restitution
+                penetration = ball_radius - distance
+                ball.x += normal_x * penetration
+                ball.y += normal_y * penetration
+
+    def state(self):
+        b = self.ball
+        return (b.x, b.y, b.vx * FPS, b.vy * FPS, math.radians(self.angle))
+
+
+# ---------------------------
+# o1.py
+# ---------------------------
+def o1_rotate_point(x, y, cx, cy, angle_degs):
+    theta = math.radians(angle_degs)
+    dx = x - cx
+    dy = y - cy
+    rx = dx * math.cos(theta) - dy * math.sin(theta)
+    ry = dx * math.sin(theta) + dy * math.cos(theta)
+    return (rx + cx, ry + cy)
+
+
+class O1:
+    """Per-frame units, signed distance along the outward normal, reflect and scale."""
+
+    name = "o1"
+
+    def __init__(self, gravity=0.2, air_friction=0.999, bounce_friction=0.8,
+                 rotation_speed=1.0, hex_radius=200, ball_radius=15):
+        self.gravity = gravity
+        self.air_friction = air_friction
+        self.bounce_friction = bounce_friction
+        self.rotation_speed = rotation_speed
+        self.ball_radius = ball_radius
+        self.hex_center = (WIDTH // 2, HEIGHT // 2)
+        self.hex_local_vertices = []
+        for i in range(6):
+            angle_rad = math.radians(60 * i - 30)
+            self.hex_local_vertices.append((hex_radius * math.cos(angle_rad),
+                                            hex_radius * math.sin(angle_rad)))
+        self.ball_x, self.ball_y = (WIDTH // 2, HEIGHT // 2 - 100)
+        self.ball_vx, self.ball_vy = (2.0, 0.0)
+        self.rotation_angle = 0.0
+
+    def reset(self, pos, vel):
+        self.rotation_angle = 0.0
+        self.ball_x, self.ball_y = pos
+        self.ball_vx = vel[0] / FPS
+        self.ball_vy = vel[1] / FPS
+
+    def collide_and_reflect(self, ball_pos, ball_vel, p1, p2):
+        x, y = ball_pos
+        vx, vy = ball_vel
+        line_dx = p2[0] - p1[0]
+        line_dy = p2[1] - p1[1]
+        wall_normal = (line_dy, -line_dx)
+        p1_to_ball = (x - p1[0], y - p1[1])
+
+        normal_length = math.hypot(*wall_normal)
+        if normal_length == 0:
+            return (ball_pos, ball_vel, False)
+        dist = (p1_to_ball[0]*wall_normal[0] + p1_to_ball[1]*wall_normal[1]) / normal_length
+
+        line_len = math.hypot(line_dx, line_dy)
+        if line_len == 0:
+            return (ball_pos, ball_vel, False)
+        t = (p1_to_ball[0]*line_dx + p1_to_ball[1]*line_dy) / (line_len**2)
+
+        if 0 <= t <= 1 and abs(dist) < self.ball_radius:
+            if dist <= 0:
+                return (ball_pos, ball_vel, False)
+            overlap = self.ball_radius - abs(dist)
+            nx = wall_normal[0]/normal_length
+            ny = wall_normal[1]/normal_length
+            x_new = x - nx * overlap
+            y_new = y - ny * overlap
+            v_dot_n = vx*nx + vy*ny
+            vx_new = (vx - 2 * v_dot_n * nx) * self.bounce_friction
+            vy_new = (vy - 2 * v_dot_n * ny) * self.bounce_friction
+            return ((x_new, y_new), (vx_new, vy_new), True)
+        return (ball_pos, ball_vel, False)
+
+    def step(self, dt=DT):
+        frames = dt * FPS
+        self.ball_vy += self.gravity * frames
+        damping = self.air_friction ** frames
+        self.ball_vx *= damping
+        self.ball_vy *= damping
+        self.ball_x += self.ball_vx * frames
+        self.ball_y += self.ball_vy * frames
+
+        self.rotation_angle += self.rotation_speed * frames
+        if self.rotation_angle >= 360:
+            self.rotation_angle -= 360
+
+        cx, cy = self.hex_center
+        rotated_vertices = []
+        for vx, vy in self.hex_local_vertices:
+            rotated_vertices.append(o1_rotate_point(vx + cx, vy + cy, cx, cy,
+                                                    self.rotation_angle))
+
+        self.ball_x, self.ball_y, self.ball_vx, self.ball_vy = self.collide(
+            self.ball_x, self.ball_y, self.ball_vx, self.ball_vy, rotated_vertices)
+
+    def collide(self, x, y, vx, vy, rotated_vertices):
+        """collide_and_reflect against every edge in turn; returns (x, y, vx, vy)."""
+        n = len(rotated_vertices)
+        for i in range(n):
+            (x, y), (vx, vy), _ = self.collide_and_reflect(
+                (x, y), (vx, vy), rotated_vertices[i], rotated_vertices[(i + 1) % n])
+        return x, y, vx, vy
+
+    def state(self):
+        return (self.ball_x, self.ball_y, self.ball_vx * FPS, self.ball_vy * FPS,
+                math.radians(self.rotation_angle))
+
+
+# ---------------------------
+# o3_Mini_High.py
+# ---------------------------
+class O3MiniHigh:
+    """Per-frame Vector2 units, vertex-aware normals, up to 5 unsticking passes."""
+
+    name = "o3_Mini_High"
+
+    def __init__(self, restitution=0.9, friction_coeff=0.1, hex_ang_vel=0.02, gravity=0.5,
+                 air_friction=0.999, ball_radius=12, hex_radius=250,
+                 collision_iterations=5):
+        self.restitution = restitution
+        self.friction_coeff = friction_coeff
+        self.hex_ang_vel = hex_ang_vel
+        self.gravity = Vector2(0, gravity)
+        self.air_friction = air_friction
+        self.ball_radius = ball_radius
+        self.hex_radius = hex_radius
+        self.collision_iterations = collision_iterations
+        self.hex_center = Vector2(WIDTH / 2, HEIGHT / 2)
+        self.hex_rotation = 0.0
+        self.ball_pos = Vector2(WIDTH / 2, HEIGHT / 2)
+        self.ball_vel = Vector2(4, -7)
+
+    def reset(self, pos, vel):
+        self.hex_rotation = 0.0
+        self.ball_pos = Vector2(pos)
+        self.ball_vel = Vector2(vel) / FPS
+
+    def get_hexagon_vertices(self, center, radius, rotation):
+        vertices = []
+        for i in range(6):
+            angle = rotation + i * (2 * math.pi / 6)
+            vertices.append(Vector2(center.x + radius * math.cos(angle),
+                                    center.y + radius * math.sin(angle)))
+        return vertices
+
+    def check_collision(self, ball_pos, ball_vel, ball_radius, A, B, hex_center, hex_ang_vel):
+        AB = B - A
+        t = (ball_pos - A).dot(AB) / AB.dot(AB)
+        t_clamped = max(0, min(1, t))
+        closest_point = A + AB * t_clamped
+        dist = (ball_pos - closest_point).length()
+
+        if dist < ball_radius:
+            penetration = ball_radius - dist
+            if 0.01 < t_clamped < 0.99:
+                wall_normal = (hex_center - (A + B) / 2).normalize()
+            elif (ball_pos - A).length() < (ball_pos - B).length():
+                wall_normal = (ball_pos - A).normalize() if (ball_pos - A).length() > 0 else Vector2(1, 0)
+            else:
+                wall_normal = (ball_pos - B).normalize() if (ball_pos - B).length() > 0 else Vector2(1, 0)
+
+            new_ball_pos = ball_pos + wall_normal * penetration
+
+            r = closest_point - hex_center
+            wall_vel = hex_ang_vel * Vector2(-r.y, r.x)
+            rel_vel = ball_vel - wall_vel
+            rel_vel_normal = rel_vel.dot(wall_normal) * wall_normal
+            rel_vel_tangent = rel_vel - rel_vel_normal
+            new_rel_vel = (-self.restitution * rel_vel_normal
+                           + (1 - self.friction_coeff) * rel_vel_tangent)
+            return True, new_ball_pos, wall_vel + new_rel_vel
+        return False, ball_pos, ball_vel
+
+    def step(self, dt=DT):
+        frames = dt * FPS
+        self.hex_rotation += self.hex_ang_vel * frames
+        vertices = self.get_hexagon_vertices(self.hex_center, self.hex_radius,
+                                             self.hex_rotation)
+
+        self.ball_vel += self.gravity * frames
+        self.ball_vel *= self.air_friction ** frames
+        self.ball_pos += self.ball_vel * frames
+
+        self.ball_pos, self.ball_vel = self.resolve_collisions(self.ball_pos, self.ball_vel,
+                                                               vertices)
+
+    def resolve_collisions(self, ball_pos, ball_vel, vertices):
+        """Up to collision_iterations passes of check_collision; returns (pos, vel)."""
+        for _ in range(self.collision_iterations):
+            collision_happened = False
+            for i in range(len(vertices)):
+                collided, new_pos, new_vel = self.check_collision(
+                    ball_pos, ball_vel, self.ball_radius,
+                    vertices[i], vertices[(i + 1) % len(vertices)],
+                    self.hex_center, self.hex_ang_vel)
+                if collided:
+                    ball_pos = new_pos
+                    ball_vel = new_vel
+                    collision_happened = True
+                    break
+            if not collision_happened:
+                break
+        return ball_pos, ball_vel
+
+    def state(self):
+        return (self.ball_pos.x, self.ball_pos.y, self.ball_vel.x * FPS,
+                self.ball_vel.y * FPS, self.hex_rotation)
+
+
+ENGINES = {cls.name: cls for cls in (ThreeOMini, Deepseek, Gemini, Gpt4o, Kimi, O1, O3MiniHigh)}
+
+
+def make_engine(name, pos=INITIAL_POS, vel=INITIAL_VEL, **params):
+    """Build the named engine and place its ball at the shared initial conditions."""
+    engine = ENGINES[name](**params)
+    engine.reset(pos, vel)
+    return engine
@@ -0,0 +1,289 @@
+"""
+Offline export of a run to a PNG sequence or a raw video stream.
+
+Renders a recorded trajectory (see trajectory.py), or a model simulated on
+the spot, frame by frame at a fixed output rate, as fast as the machine
+allows instead of in real time:
+
+- frames are drawn off-screen with renderer.DirtyRectRenderer, into a small
+  pool of surfaces, each with its own renderer so that every surface only
+  needs the regions that changed since it was last used;
+- a background thread encodes finished surfaces and hands them back to the
+  pool, so drawing the next frame overlaps with encoding and writing the
+  last one. Raw frames are written straight from `Surface.get_view`
+  without copying; PNGs are encoded from the same view with zlib at a low
+  compression level (about 4x faster than pygame.image.save here, and
+  zlib releases the GIL while it works);
+- with --workers, the timeline is split into chunks rendered by a process
+  pool. PNG chunks write their own numbered files; raw chunks write part
+  files that are joined in order at the end.
+
+The raw stream is the surface's own 32-bit pixel layout (printed on exit,
+usually bgr0), ready for ffmpeg:
+
+    ffmpeg -f rawvideo -pix_fmt bgr0 -s 800x600 -r 60 -i o1.raw o1.mp4
+
+Usage:
+    python export.py o1.traj --png frames/o1_%05d.png
+    python export.py --model kimi --seconds 600 --raw kimi.raw --workers 4
+    python export.py o1.traj --raw - | ffmpeg -f rawvideo -pix_fmt bgr0 -s 800x600 -r 60 -i - o1.mp4
+"""
+import argparse
+import os
+import queue
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
+
+from engines import DT, ENGINES, make_engine
+from renderer import DirtyRectRenderer
+from replay import BACKGROUND, BALL_COLOR, HEX_COLOR, HEIGHT, WIDTH, interpolated_state
+from trajectory import Trajectory, record_engine
+
+POOL_SIZE = 4   # surfaces in flight between the drawing and encoding threads
+
+
+def init_display():
+    """Initialize pygame headless; convert() needs a display mode, any size."""
+    # Offline rendering never opens a window. SDL reads the driver when the
+    # display is initialized, not when pygame is imported.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+def frame_count(trajectory, fps):
+    return int((len(trajectory) - 1) * trajectory.dt * fps) + 1
+
+
+def raw_pixel_format(surface):
+    """ffmpeg pix_fmt name of a 32-bit surface's bytes in memory (e.g. bgr0)."""
+    masks = surface.get_masks()
+    names = []
+    for byte in range(4):
+        shift = 8 * byte if sys.byteorder == "little" else 8 * (3 - byte)
+        for mask, name in zip(masks, "rgba"):
+            if mask == 0xFF << shift:
+                names.append(name)
+                break
+        else:
+            names.append("0")
+    return "".join(names)
+
+
+def pixel_buffer(surface):
+    """The surface's pixels as a contiguous buffer, without copying when possible."""
+    try:
+        return surface.get_view("1")
+    except ValueError:
+        # Padded rows: fall back to one copy.
+        return pygame.image.tobytes(surface, "RGBX")
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_png(surface, level=1):
+    """PNG bytes (8-bit RGB) of a 32-bit surface."""
+    width, height = surface.get_size()
+    view = pixel_buffer(surface)
+    if isinstance(view, bytes):
+        order = [0, 1, 2]   # the RGBX copy
+    else:
+        order = [shift // 8 if sys.byteorder == "little" else 3 - shift // 8
+                 for shift in surface.get_shifts()[:3]]
+    pixels = np.frombuffer(view, np.uint8).reshape(height, width, 4)
+    # One filter byte (0, none) per row, then the RGB samples.
+    rows = np.zeros((height, 1 + 3 * width), np.uint8)
+    rows[:, 1:].reshape(height, width, 3)[:] = pixels[:, :, order]
+    # Drop the buffer proxy now: it keeps the surface locked.
+    del pixels, view
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"IDAT", zlib.compress(rows, level)) + _png_chunk(b"IEND", b""))
+
+
+class PngSink:
+    def __init__(self, pattern, level=1):
+        self.pattern = pattern
+        self.level = level
+
+    def __call__(self, index, surface):
+        with open(self.pattern % index, "wb") as f:
+            f.write(encode_png(surface, self.level))
+
+    def close(self):
+        pass
+
+
+class RawSink:
+    def __init__(self, f):
+        self.file = f
+
+    def __call__(self, index, surface):
+        self.file.write(pixel_buffer(surface))
+
+    def close(self):
+        self.file.flush()
+
+
+class EncoderThread(threading.Thread):
+    """Encodes surfaces in submission order and returns them to the pool."""
+
+    def __init__(self, sink, pool):
+        super().__init__(daemon=True)
+        self.sink = sink
+        self.pool = pool
+        self.work = queue.Queue()
+        self.error = None
+
+    def run(self):
+        while True:
+            item = self.work.get()
+            if item is None:
+                return
+            index, slot = item
+            try:
+                if self.error is None:
+                    self.sink(index, slot[0])
+            except Exception as exc:
+                self.error = exc
+            self.pool.put(slot)
+
+
+def render_frames(trajectory, fps, start, stop, sink, pool_size=POOL_SIZE):
+    """Draw frames start..stop-1 and pass each surface to `sink` on a background thread."""
+    geometry = trajectory.geometry
+    pool = queue.Queue()
+    outlines = None
+    for _ in range(pool_size):
+        surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+        renderer = DirtyRectRenderer(surface, geometry["center"], geometry["hex_radius"],
+                                     max(1, int(round(geometry["ball_radius"]))), HEX_COLOR,
+                                     BALL_COLOR, BACKGROUND, num_sides=geometry["num_sides"],
+                                     phase=geometry["phase"], outlines=outlines)
+        # The outlines are the same for every surface: render them once.
+        outlines = renderer.outlines
+        pool.put((surface, renderer))
+
+    encoder = EncoderThread(sink, pool)
+    encoder.start()
+    steps_per_frame = 1 / (fps * trajectory.dt)
+    last = len(trajectory) - 1
+    try:
+        for index in range(start, stop):
+            slot = pool.get()
+            x, y, angle, _ = interpolated_state(trajectory, min(index * steps_per_frame, last))
+            slot[1].draw(angle, x, y)
+            encoder.work.put((index, slot))
+            if encoder.error is not None:
+                break
+    finally:
+        encoder.work.put(None)
+        encoder.join()
+        sink.close()
+    if encoder.error is not None:
+        raise encoder.error
+    return stop - start
+
+
+def render_chunk(path, fps, start, stop, png=None, raw_part=None):
+    """Process-pool entry point: render one chunk of frames to PNGs or a raw part file."""
+    init_display()
+    trajectory = Trajectory(path)
+    if png:
+        return render_frames(trajectory, fps, start, stop, PngSink(png))
+    with open(raw_part, "wb") as f:
+        return render_frames(trajectory, fps, start, stop, RawSink(f))
+
+
+def export(path, fps=60, png=None, raw=None, workers=1, chunk_frames=None):
+    """Render the whole trajectory; returns the number of frames written."""
+    trajectory = Trajectory(path)
+    frames = frame_count(trajectory, fps)
+    out = None
+    if raw:
+        out = sys.stdout.buffer if raw == "-" else open(raw, "wb")
+    try:
+        if workers <= 1:
+            init_display()
+            sink = PngSink(png) if png else RawSink(out)
+            return render_frames(trajectory, fps, 0, frames, sink)
+
+        chunk_frames = chunk_frames or -(-frames // workers)
+        bounds = [(start, min(start + chunk_frames, frames))
+                  for start in range(0, frames, chunk_frames)]
+        with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(workers) as executor:
+            parts = [os.path.join(tmp, f"part{k:05d}.raw") if raw else None
+                     for k in range(len(bounds))]
+            futures = [executor.submit(render_chunk, path, fps, start, stop, png, part)
+                       for (start, stop), part in zip(bounds, parts)]
+            # Join raw parts in timeline order as they complete.
+            for future, part in zip(futures, parts):
+                future.result()
+                if raw:
+                    with open(part, "rb") as f:
+                        shutil.copyfileobj(f, out, 1 << 22)
+                    os.remove(part)
+        return frames
+    finally:
+        if out is not None and out is not sys.stdout.buffer:
+            out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a run to PNG frames or raw video")
+    parser.add_argument("trajectory", nargs="?", help="recording from trajectory.py")
+    parser.add_argument("--model", choices=sorted(ENGINES),
+                        help="simulate this model instead of reading a recording")
+    parser.add_argument("--seconds", type=float, default=60.0,
+                        help="simulated length with --model")
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--png", help="PNG file pattern, e.g. frames/run_%%05d.png")
+    parser.add_argument("--raw", help="raw video file, or - for stdout")
+    parser.add_argument("--workers", type=int, default=1, help="rendering processes")
+    parser.add_argument("--chunk-frames", type=int, help="frames per worker task")
+    args = parser.parse_args()
+    if bool(args.png) == bool(args.raw):
+        parser.error("give exactly one of --png and --raw")
+    if bool(args.trajectory) == bool(args.model):
+        parser.error("give a trajectory file or --model")
+
+    log = sys.stderr
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.trajectory
+        if args.model:
+            path = os.path.join(tmp, f"{args.model}.traj")
+            start = time.perf_counter()
+            record_engine(make_engine(args.model), path, int(args.seconds / DT))
+            print(f"simulated {args.seconds:g} s of {args.model} in "
+                  f"{time.perf_counter() - start:.2f} s", file=log)
+        if args.png and os.path.dirname(args.png):
+            os.makedirs(os.path.dirname(args.png), exist_ok=True)
+
+        start = time.perf_counter()
+        frames = export(path, args.fps, args.png, args.raw, args.workers, args.chunk_frames)
+        elapsed = time.perf_counter() - start
+
+    length = frames / args.fps
+    print(f"{frames:,d} frames ({length:.1f} s at {args.fps} FPS) in {elapsed:.2f} s: "
+          f"{frames / elapsed:,.0f} frames/s, {length / elapsed:.1f}x real time", file=log)
+    if args.raw:
+        init_display()
+        surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+        print(f"raw format: -f rawvideo -pix_fmt {raw_pixel_format(surface)} "
+              f"-s {WIDTH}x{HEIGHT} -r {args.fps}", file=log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Fixed-timestep loop with an accumulator.
+
+Physics always advances in steps of exactly 1 / rate seconds, however long
+the frames take: each frame adds the elapsed wall-clock time to an
+accumulator and runs as many whole steps as it covers. What is left over
+(`alpha`, between 0 and 1) tells the renderer how far it is between the last
+two physics states, so it can interpolate instead of stuttering.
+
+A slow frame therefore changes how many steps run before the next draw, but
+never the size of a step, so the trajectory is the same at any frame rate.
+Headless runs skip the clock entirely and step as fast as the CPU allows.
+
+By default a very long frame is clamped to MAX_FRAME_TIME, so the
+simulation falls behind the clock instead of catching up all at once. With
+max_frame_time=None no time is ever dropped; max_steps then bounds the
+steps run in one frame, and the rest stays in the accumulator for the next
+frames (see frame_budget.py).
+
+In a main loop:
+
+    loop = FixedStepLoop(240)
+    while running:
+        for _ in range(loop.advance()):
+            previous = state
+            state = step(state, loop.dt)
+        draw(lerp(previous, state, loop.alpha))
+"""
+import time
+
+# Frames longer than this (window dragged, debugger paused) are clamped, so
+# the loop does not try to catch up on seconds of missed steps at once.
+MAX_FRAME_TIME = 0.25
+
+
+class FixedStepLoop:
+    """Turns elapsed wall-clock time into a whole number of fixed physics steps."""
+
+    def __init__(self, rate=240, max_frame_time=MAX_FRAME_TIME, clock=time.perf_counter,
+                 max_steps=None):
+        self.rate = rate
+        self.dt = 1 / rate
+        self.max_frame_time = max_frame_time
+        self.max_steps = max_steps
+        self.clock = clock
+        self.accumulator = 0.0
+        self.steps = 0
+        self.last_time = clock()
+
+    def advance(self):
+        """Add the time since the previous call; return how many steps to run now."""
+        now = self.clock()
+        frame_time = now - self.last_time
+        if self.max_frame_time is not None:
+            frame_time = min(frame_time, self.max_frame_time)
+        self.last_time = now
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.dt)
+        if self.max_steps is not None:
+            steps = min(steps, self.max_steps)
+        self.accumulator -= steps * self.dt
+        self.steps += steps
+        return steps
+
+    @property
+    def behind(self):
+        """Whether whole steps are still owed (only when max_steps held some back)."""
+        return self.accumulator >= self.dt
+
+    @property
+    def alpha(self):
+        """Fraction of a step between the last physics state and the display time."""
+        return min(self.accumulator / self.dt, 1.0)
+
+
+def lerp(a, b, alpha):
+    """Linear interpolation between two numbers."""
+    return a + (b - a) * alpha
+
+
+def run_headless(engine, steps, rate=240):
+    """Step an engine (see engines.py) `steps` times at `rate` Hz, no clock, no window."""
+    dt = 1 / rate
+    step = engine.step
+    for _ in range(steps):
+        step(dt)
+    return engine
@@ -0,0 +1,250 @@
+"""
+Frame-budget scheduler: physics steps are never dropped, render frames are.
+
+fixed_step.FixedStepLoop already keeps the step size fixed, but two things
+still bend the simulation to the display: a frame longer than
+MAX_FRAME_TIME loses the time past it (an OS stall or a dragged window
+slows the simulation down), and every frame is drawn in full however late
+it is, so a slow renderer delays the next physics steps with it.
+
+FrameScheduler owns the loop and runs it without the clamp: every second of
+wall-clock time becomes 1 / dt physics steps, at most `max_steps` per frame
+with the rest owed to the next frames. After the steps, plan() decides what
+this frame may still afford within the 1 / fps budget:
+
+- FULL: everything, when the frame's expected cost fits;
+- DEGRADED: the container keeps its last drawn angle and the HUD is left
+  out, when only that fits;
+- SKIP: nothing is drawn, when physics is still catching up, the frame is
+  already over budget before drawing (slow steps, or a stall since the last
+  one), or even a degraded frame would not fit. At most
+  `max_skip` frames in a row are skipped; the next one is drawn degraded.
+
+Render costs are running averages of what each quality actually took
+(samples capped at two budgets, so a single spike does not linger), and
+while frames are degraded one full frame is tried every `probe_every`
+frames to notice when the load has dropped.
+wait() then sleeps to the next frame deadline in place of clock.tick; when
+the deadline has already passed by whole frames (an OS stall, or a frame
+whose steps and drawing overran), those frames are counted as dropped too,
+as "stall". Every dropped or degraded frame is recorded
+with its reason, and report() prints the counts at exit.
+
+Since physics only ever sees fixed steps, the trajectory is the one an
+unthrottled run gives; only its presentation gets coarser under load. The
+check runs a model through a simulated clock with slow, spiky frames and
+stalls, and again with free frames and no stalls, for the same wall time.
+Both runs record the state after every step: the throttled one must match
+the unthrottled one step for step, and must have run as many steps, apart
+from those still owed at the end ("lost" counts any others):
+
+Usage:
+    python frame_budget.py
+    python frame_budget.py --model kimi --seconds 120 --render-ms 12 --stall-every 300
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from fixed_step import FixedStepLoop
+
+FULL = "full"
+DEGRADED = "degraded"
+SKIP = "skip"
+
+
+class FrameScheduler:
+    """Fixed physics steps every frame; rendering skipped or degraded to fit 1 / fps."""
+
+    def __init__(self, rate=240, fps=60, max_steps=None, max_skip=4, probe_every=60,
+                 clock=time.perf_counter, sleep=time.sleep, smoothing=0.1):
+        if max_steps is None:
+            # A quarter second of physics per frame; a longer backlog drains
+            # over the following frames, which skip drawing meanwhile.
+            max_steps = max(1, rate // 4)
+        self.loop = FixedStepLoop(rate, max_frame_time=None, clock=clock, max_steps=max_steps)
+        self.budget = 1 / fps
+        self.max_skip = max_skip
+        self.probe_every = probe_every
+        self.clock = clock
+        self.sleep = sleep
+        self.smoothing = smoothing
+        self.cost = {FULL: 0.0, DEGRADED: 0.0}
+        self.frames = 0
+        self.drawn = Counter()
+        self.dropped = Counter()
+        self.degraded = Counter()
+        self.skipped = 0
+        self.since_full = 0
+        self.quality = None
+        self.frame_start = self.deadline = clock()
+        self.plan_time = self.frame_start
+
+    def advance(self):
+        """Steps to run this frame (see FixedStepLoop.advance)."""
+        return self.loop.advance()
+
+    def plan(self):
+        """FULL, DEGRADED or SKIP for this frame, given the time already used."""
+        now = self.clock()
+        remaining = self.budget - (now - self.frame_start)
+        reason = None
+        if self.loop.behind:
+            quality, reason = SKIP, "catching up"
+        elif remaining <= 0:
+            quality, reason = SKIP, "late"
+        elif self.cost[FULL] <= remaining or self.since_full >= self.probe_every:
+            # Full frames are not measured while degraded, so one is tried
+            # every probe_every frames to see whether the load has dropped.
+            quality = FULL
+        elif self.cost[DEGRADED] <= remaining:
+            quality, reason = DEGRADED, "render"
+        else:
+            quality, reason = SKIP, "render"
+
+        if quality == SKIP and self.skipped >= self.max_skip:
+            quality = DEGRADED
+            reason = "too many skipped"
+        if quality == SKIP:
+            self.skipped += 1
+            self.dropped[reason] += 1
+        else:
+            self.skipped = 0
+            self.since_full = 0 if quality == FULL else self.since_full + 1
+            self.drawn[quality] += 1
+            if quality == DEGRADED:
+                self.degraded[reason] += 1
+        self.quality = quality
+        self.plan_time = now
+        return quality
+
+    def wait(self):
+        """Record the frame's render cost and sleep until the next frame is due."""
+        now = self.clock()
+        self.frames += 1
+        if self.quality in self.cost:
+            # Capped, so that one spike cannot hold the estimate up for long.
+            took = min(now - self.plan_time, 2 * self.budget)
+            cost = self.cost[self.quality]
+            self.cost[self.quality] = cost + (took - cost) * self.smoothing
+        self.deadline += self.budget
+        if now < self.deadline:
+            self.sleep(self.deadline - now)
+        else:
+            missed = int((now - self.deadline) / self.budget)
+            if missed:
+                self.dropped["stall"] += missed
+            self.deadline = now
+        self.frame_start = self.clock()
+
+    def summary(self):
+        return {"frames": self.frames, "drawn": dict(self.drawn), "dropped": dict(self.dropped),
+                "degraded": dict(self.degraded), "steps": self.loop.steps}
+
+    def report(self, name=""):
+        """Print dropped and degraded frames by reason, if there were any."""
+        if not self.dropped and not self.degraded:
+            return
+        print(f"{name} frames: {self.frames} run, {sum(self.drawn.values())} drawn, "
+              f"{sum(self.dropped.values())} dropped ({format_counts(self.dropped)}), "
+              f"{sum(self.degraded.values())} degraded ({format_counts(self.degraded)})")
+
+
+def format_counts(counts):
+    return ", ".join(f"{reason} {n}" for reason, n in counts.most_common()) or "-"
+
+
+# ---------------------------
+# Simulated run
+# ---------------------------
+class SimulatedClock:
+    """A clock that only moves when told to, for repeatable load tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.0)
+
+
+def simulate(engine, seconds, fps=60, rate=240, step_cost=20e-6, render_ms=4.0,
+             degraded_ms=1.0, spike_every=50, spike_ms=40.0, stall_every=600, stall_ms=500.0,
+             seed=0, states=None):
+    """
+    Run `engine` under a FrameScheduler for `seconds` of simulated wall
+    time. Full frames cost render_ms (with a spike_ms frame every
+    spike_every frames), degraded ones degraded_ms, and every stall_every
+    frames the process stalls for stall_ms. The state after every step is
+    appended to `states`, if given. Returns the scheduler.
+    """
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    frames = FrameScheduler(rate, fps, clock=clock, sleep=clock.sleep)
+    loop = frames.loop
+    step = engine.step
+    while clock.now < seconds:
+        if stall_every and rng.randrange(stall_every) == 0:
+            clock.now += stall_ms / 1000
+        for _ in range(frames.advance()):
+            step(loop.dt)
+            if states is not None:
+                states.append(engine.state())
+            clock.now += step_cost
+        quality = frames.plan()
+        if quality == FULL:
+            cost = render_ms
+            if spike_every and rng.randrange(spike_every) == 0:
+                cost = spike_ms
+            clock.now += cost * rng.uniform(0.8, 1.2) / 1000
+        elif quality == DEGRADED:
+            clock.now += degraded_ms * rng.uniform(0.8, 1.2) / 1000
+        frames.wait()
+    return frames
+
+
+def main():
+    from engines import ENGINES, make_engine
+
+    parser = argparse.ArgumentParser(description="Frame drops under load, physics unchanged")
+    parser.add_argument("--model", choices=sorted(ENGINES), default="o1")
+    parser.add_argument("--seconds", type=float, default=60.0, help="simulated wall time")
+    parser.add_argument("--render-ms", type=float, nargs="+", default=[4.0, 12.0, 20.0],
+                        help="cost of a full frame; one run per value")
+    parser.add_argument("--degraded-ms", type=float, default=1.0)
+    parser.add_argument("--stall-every", type=int, default=600,
+                        help="a 500 ms stall about once every N frames (0 = none)")
+    args = parser.parse_args()
+
+    print(f"{args.model}, {args.seconds:g} s at 60 FPS, physics at 240 Hz")
+    # Unthrottled: frames cost nothing and the process never stalls.
+    reference = []
+    free = simulate(make_engine(args.model), args.seconds, render_ms=0.0, degraded_ms=0.0,
+                    spike_every=0, stall_every=0, states=reference)
+    print(f"unthrottled: {free.frames} frames, {free.loop.steps} steps, "
+          f"{sum(free.dropped.values())} dropped")
+    print(f"{'render':>8s} {'frames':>7s} {'full':>6s} {'degr.':>6s} {'dropped':>8s}  "
+          f"{'steps':>7s} {'owed':>5s} {'lost':>5s} {'trajectory':>10s}  reasons")
+    for render_ms in args.render_ms:
+        states = []
+        frames = simulate(make_engine(args.model), args.seconds, render_ms=render_ms,
+                          degraded_ms=args.degraded_ms, stall_every=args.stall_every,
+                          states=states)
+        steps = frames.loop.steps
+        owed = int(frames.loop.accumulator / frames.loop.dt)
+        lost = free.loop.steps - steps - owed
+        common = min(len(states), len(reference))
+        same = "identical" if states[:common] == reference[:common] else "DIFFERENT"
+        reasons = "; ".join(f"{kind}: {format_counts(counts)}" for kind, counts in
+                            (("dropped", frames.dropped), ("degraded", frames.degraded))
+                            if counts)
+        print(f"{render_ms:6.1f}ms {frames.frames:7d} {frames.drawn[FULL]:6d} "
+              f"{frames.drawn[DEGRADED]:6d} {sum(frames.dropped.values()):8d}  "
+              f"{steps:7d} {owed:5d} {lost:5d} {same:>10s}  {reasons or '-'}")
+
+
+if __name__ == "__main__":
+    main()
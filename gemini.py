@@ -1,8 +1,15 @@
 import pygame
 import math
 
+from ball_state import BallState
+from fixed_step import lerp
+from frame_budget import FULL, SKIP, FrameScheduler
+from phase_timer import from_env as phase_timer
+from renderer import DirtyRectRenderer, init_video
+from telemetry import from_env as telemetry
+
 # Initialize Pygame
-pygame.init()
+init_video()
 
 # Screen dimensions
 width, height = 800, 600
@@ -21,10 +28,7 @@ num_sides = 6
 
 # Ball parameters
 ball_radius = 10
-ball_x = width // 2
-ball_y = height // 4  # Start a bit above center
-ball_vx = 5  # Initial x velocity
-ball_vy = 0  # Initial y velocity
+ball = BallState(width // 2, height // 4, 5, 0, ball_radius)  # start a bit above center, moving right
 gravity = 0.5
 friction = 0.98  # Air resistance/friction
 
@@ -32,19 +36,13 @@ friction = 0.98  # Air resistance/friction
 rotation_angle = 0
 rotation_speed = 0.02  # Radians per frame
 
-# Clock for controlling frame rate
-clock = pygame.time.Clock()
+# Frame rate
 fps = 60
 
-def draw_hexagon(center, radius, angle):
-    points = []
-    for i in range(num_sides):
-        angle_rad = math.radians(angle + i * (360 / num_sides))
-        x = center[0] + radius * math.cos(angle_rad)
-        y = center[1] + radius * math.sin(angle_rad)
-        points.append((x, y))
-    pygame.draw.polygon(screen, white, points, 2)
-
+# Physics runs at a fixed rate of its own; the per-frame quantities above
+# (velocity, gravity, rotation speed) are per 1/60 s and scaled to the step.
+physics_hz = 240
+frames_per_step = fps / physics_hz
 
 def ball_collision(ball_x, ball_y, ball_vx, ball_vy, center, radius, angle):
     for i in range(num_sides):
@@ -92,50 +90,91 @@ def ball_collision(ball_x, ball_y, ball_vx, ball_vy, center, radius, angle):
 
     return ball_x, ball_y, ball_vx, ball_vy
 
+# Cached ball and hexagon sprites; only the regions that change are redrawn
+renderer = DirtyRectRenderer(screen, hexagon_center, hexagon_radius, ball_radius, white, red, black,
+                             num_sides=num_sides)
+
+# Per-phase timing, enabled with PHASE_TIMING (see phase_timer.py)
+timer = phase_timer("gemini")
+# Live overlay, enabled with TELEMETRY (see telemetry.py)
+hud = telemetry("gemini", gravity * fps * fps, velocity_scale=fps, step_hz=physics_hz,
+                floor_y=height, velocity=(ball.vx, ball.vy))
+
 # Game loop
+# Physics never drops steps; under load, frames are degraded or skipped
+# instead (see frame_budget.py)
+frames = FrameScheduler(physics_hz, fps)
+loop = frames.loop
+prev_ball = (ball.x, ball.y)
+prev_angle = rotation_angle
 running = True
+timer.start()
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-
-    # Update ball position
-    ball_x += ball_vx
-    ball_y += ball_vy
-
-    # Apply gravity
-    ball_vy += gravity
-
-    # Collision detection with hexagon
-    ball_x, ball_y, ball_vx, ball_vy = ball_collision(ball_x, ball_y, ball_vx, ball_vy, hexagon_center, hexagon_radius, rotation_angle)
-
-    # Keep ball within screen bounds (optional - for debugging)
-    if ball_x + ball_radius > width:
-      ball_x = width - ball_radius
-      ball_vx *= -friction
-    if ball_x - ball_radius < 0:
-      ball_x = ball_radius
-      ball_vx *= -friction
-    if ball_y + ball_radius > height:
-      ball_y = height - ball_radius
-      ball_vy *= -friction
-    if ball_y - ball_radius < 0:
-      ball_y = ball_radius
-      ball_vy *= -friction
-
-
-    # Rotate the hexagon
-    rotation_angle += rotation_speed
-
-    # Draw everything
-    screen.fill(black)
-    draw_hexagon(hexagon_center, hexagon_radius, rotation_angle)
-    pygame.draw.circle(screen, red, (int(ball_x), int(ball_y)), ball_radius)
-
-    # Update the display
-    pygame.display.flip()
-
-    # Control frame rate
-    clock.tick(fps)
-
+        elif event.type == pygame.VIDEOEXPOSE:
+            renderer.invalidate()
+    timer.lap("events")
+
+    # Run as many fixed physics steps as the elapsed time covers
+    for _ in range(loop.advance()):
+        prev_ball = (ball.x, ball.y)
+        prev_angle = rotation_angle
+
+        # Update ball position
+        ball.x += ball.vx * frames_per_step
+        ball.y += ball.vy * frames_per_step
+
+        # Apply gravity
+        ball.vy += gravity * frames_per_step
+        timer.lap("integrate")
+
+        # Collision detection with hexagon
+        ball.x, ball.y, ball.vx, ball.vy = ball_collision(ball.x, ball.y, ball.vx, ball.vy, hexagon_center, hexagon_radius, rotation_angle)
+
+        # Keep ball within screen bounds (optional - for debugging)
+        if ball.x + ball_radius > width:
+          ball.x = width - ball_radius
+          ball.vx *= -friction
+        if ball.x - ball_radius < 0:
+          ball.x = ball_radius
+          ball.vx *= -friction
+        if ball.y + ball_radius > height:
+          ball.y = height - ball_radius
+          ball.vy *= -friction
+        if ball.y - ball_radius < 0:
+          ball.y = ball_radius
+          ball.vy *= -friction
+
+
+        # Rotate the hexagon
+        rotation_angle += rotation_speed * frames_per_step
+        timer.lap("collide")
+        hud.step(ball.x, ball.y, ball.vx, ball.vy)
+
+    quality = frames.plan()
+    if quality != SKIP:
+        # Draw everything, interpolated between the last two physics states
+        alpha = loop.alpha
+        draw_angle = lerp(prev_angle, rotation_angle, alpha)
+        draw_x = lerp(prev_ball[0], ball.x, alpha)
+        draw_y = lerp(prev_ball[1], ball.y, alpha)
+
+        # Draw and update only the changed regions of the display
+        dirty = renderer.draw(math.radians(draw_angle), draw_x, draw_y, outline=quality == FULL)
+        if quality == FULL:
+            dirty += hud.draw(screen)
+        timer.lap("draw")
+        pygame.display.update(dirty)
+        timer.lap("display")
+
+    # Sleep until the next frame is due
+    hud.frame()
+    frames.wait()
+    timer.lap("wait")
+
+timer.report()
+hud.report()
+frames.report("gemini")
 pygame.quit()
\ No newline at end of file
@@ -2,22 +2,37 @@ import pygame
 import pymunk
 import pymunk.pygame_util
 import math
+import numpy as np
+
+from bulk_renderer import BulkRenderer
+from frame_budget import FULL, SKIP, FrameScheduler
+from phase_timer import from_env as phase_timer
+from pymunk_multiball import add_balls, ball_radius_for, make_space, settings_from_env
+from renderer import init_video
+from telemetry import from_env as telemetry
 
 # Initialize Pygame
-pygame.init()
+init_video()
 WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
-clock = pygame.time.Clock()
 draw_options = pymunk.pygame_util.DrawOptions(screen)
 
+# Many-ball mode, enabled with GPT4O_BALLS (see pymunk_multiball.py)
+many = settings_from_env()
+
 # Initialize Pymunk space
-space = pymunk.Space()
+if many["balls"]:
+    space = make_space(threaded=True, threads=many["threads"], iterations=many["iterations"],
+                       collision_slop=many["collision_slop"])
+else:
+    space = pymunk.Space()
 space.gravity = (0, 980)  # Gravity in downward direction
 
 # Create the hexagon
 hexagon_radius = 200
 hexagon_center = (WIDTH // 2, HEIGHT // 2)
-rotation_speed = 0.05  # Radians per update
+rotation_speed = 0.05  # Radians per update (1/60 s)
+PHYSICS_HZ = 240  # fixed physics rate, independent of the frame rate
 
 # Create hexagon walls
 # Create hexagon walls
@@ -54,25 +69,76 @@ def create_ball():
     return body
 
 ball_body = create_ball()
+if many["balls"]:
+    crowd_radius = ball_radius_for(many["balls"], hexagon_radius)
+    # Spawned clear of the original ball, which the solver would otherwise
+    # have to push out of the crowd on the first step.
+    crowd = add_balls(space, many["balls"], crowd_radius, hexagon_radius, hexagon_center,
+                      spatial_hash=many["spatial_hash"],
+                      clear=[(*ball_body.position, 20)])
+    # debug_draw draws shape by shape in Python; draw the crowd from arrays instead
+    crowd_renderer = BulkRenderer(screen, crowd_radius, (52, 152, 219), (0, 0, 0))
+
+# Per-phase timing, enabled with PHASE_TIMING (see phase_timer.py)
+timer = phase_timer("gpt_4o")
+# Live overlay, enabled with TELEMETRY (see telemetry.py)
+hud = telemetry("gpt_4o", space.gravity[1], step_hz=PHYSICS_HZ, floor_y=HEIGHT,
+                velocity=ball_body.velocity)
 
 # Game loop
+# Physics never drops steps; under load, frames are degraded or skipped
+# instead (see frame_budget.py)
+frames = FrameScheduler(PHYSICS_HZ, 60)
+loop = frames.loop
 running = True
+timer.start()
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+    timer.lap("events")
     
-    # Rotate hexagon
-    hexagon_body.angle += rotation_speed
-    
-    # Redraw
-    screen.fill((0, 0, 0))
-    space.debug_draw(draw_options)
-    
-    # Step physics
-    space.step(1 / 60.0)
+    # Run as many fixed physics steps as the elapsed time covers
+    for _ in range(loop.advance()):
+        # Rotate hexagon
+        hexagon_body.angle += rotation_speed * 60 * loop.dt
+        timer.lap("rotate")
+
+        # Step physics
+        space.step(loop.dt)
+        timer.lap("space.step")
+        x, y = ball_body.position
+        vx, vy = ball_body.velocity
+        hud.step(x, y, vx, vy)
     
-    pygame.display.flip()
-    clock.tick(60)
+    quality = frames.plan()
+    if quality != SKIP:
+        # Redraw (debug_draw shows the latest physics state, no interpolation)
+        screen.fill((0, 0, 0))
+        if quality == FULL and not many["balls"]:
+            space.debug_draw(draw_options)
+        else:
+            # Plain walls and balls: the crowd, or a degraded frame with thin walls
+            width = 2 * int(hexagon_shapes[0].radius) if quality == FULL else 1
+            for shape in hexagon_shapes:
+                pygame.draw.line(screen, (200, 200, 200), hexagon_body.local_to_world(shape.a),
+                                 hexagon_body.local_to_world(shape.b), width)
+            if many["balls"]:
+                positions = np.fromiter((c for body in crowd for c in body.position), float,
+                                        2 * len(crowd))
+                crowd_renderer.draw(positions[0::2], positions[1::2])
+            pygame.draw.circle(screen, (255, 100, 100), ball_body.position, 20)
+        if quality == FULL:
+            hud.draw(screen)
+        timer.lap("draw")
+
+        pygame.display.flip()
+        timer.lap("display")
+    hud.frame()
+    frames.wait()
+    timer.lap("wait")
 
+timer.report()
+hud.report()
+frames.report("gpt_4o")
 pygame.quit()
@@ -0,0 +1,388 @@
+"""
+Collision-kernel micro-benchmark and accuracy suite.
+
+Each model resolves a ball against its container with its own narrow-phase
+code. This feeds every kernel the same randomized set of contact problems
+(ball position and velocity, hexagon angle, wall spin) and measures:
+
+- ns/call: time per call over all cases, minus the cost of calling an empty
+  function with the same arguments;
+- alloc B/call: transient heap per call, the tracemalloc peak above the
+  starting point (a proxy for allocation cost: it sees every object that is
+  allocated, not how many, and floats from the free list are not counted);
+- accuracy against a reference resolver: change of kinetic energy in the
+  wall's frame, velocity error, penetration left after resolution, centers
+  left outside the hexagon, and contacts that did not change the velocity.
+
+The reference projects the ball center onto the region where the whole ball
+fits (the hexagon shrunk by the ball radius) and reflects the wall-relative
+normal velocity along the push-out direction, perfectly elastically.
+
+The unit timed is each engine's whole-polygon routine, as called from step():
+process_collisions (3o-mini), Deepseek.collide, ball_collision (gemini),
+Kimi.collide, O1.collide (collide_and_reflect per edge) and
+resolve_collisions (o3_Mini_High's check_collision passes). Every kernel
+runs with lossless coefficients (restitution 1, no wall friction) on the
+same geometry, so any energy change is the kernel's own error. Kernels in
+per-frame units get velocities and spin divided by FPS, and their results
+are converted back to px/s.
+
+Usage:
+    python kernel_bench.py --cases 20000
+    python kernel_bench.py --max-depth 1.5 --omega 3 --json kernels.json
+"""
+import argparse
+import gc
+import json
+import math
+import random
+import time
+import tracemalloc
+
+from ball_state import BallState
+from engines import FPS, HEIGHT, WIDTH, Deepseek, Gemini, Kimi, O1, O3MiniHigh, ThreeOMini
+from vec2 import Vector2
+
+CENTER = (WIDTH // 2, HEIGHT // 2)
+HEX_RADIUS = 200.0
+BALL_RADIUS = 15.0
+APOTHEM = HEX_RADIUS * math.cos(math.pi / 6)
+
+
+def hexagon_vertices(angle):
+    cx, cy = CENTER
+    return [(cx + HEX_RADIUS * math.cos(angle + i * math.pi / 3),
+             cy + HEX_RADIUS * math.sin(angle + i * math.pi / 3)) for i in range(6)]
+
+
+def make_cases(count, seed=0, contact_fraction=0.8, max_depth=1.0, max_speed=1500.0):
+    """Random (x, y, vx, vy, angle) contact problems, in px, px/s and radians.
+
+    A `contact_fraction` of the balls overlap a random point of a random edge
+    by up to `max_depth` ball radii (more than 1 puts the center past the
+    wall line, as after a fast step); the rest lie clear of every wall.
+    """
+    rng = random.Random(seed)
+    cx, cy = CENTER
+    cases = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        if rng.random() < contact_fraction:
+            vertices = hexagon_vertices(angle)
+            i = rng.randrange(6)
+            (ax, ay), (bx, by) = vertices[i], vertices[(i + 1) % 6]
+            t = rng.random()
+            mid = angle + (i + 0.5) * math.pi / 3
+            inset = BALL_RADIUS - rng.uniform(0, max_depth * BALL_RADIUS)
+            x = ax + t * (bx - ax) - math.cos(mid) * inset
+            y = ay + t * (by - ay) - math.sin(mid) * inset
+        else:
+            reach = (APOTHEM - BALL_RADIUS) * math.sqrt(rng.random())
+            direction = rng.uniform(0, 2 * math.pi)
+            x = cx + reach * math.cos(direction)
+            y = cy + reach * math.sin(direction)
+        speed = rng.uniform(30.0, max_speed)
+        heading = rng.uniform(0, 2 * math.pi)
+        cases.append((x, y, speed * math.cos(heading), speed * math.sin(heading), angle))
+    return cases
+
+
+def wall_distances(x, y, angle):
+    """Distance of (x, y) from each edge line, positive inside the hexagon."""
+    dx = x - CENTER[0]
+    dy = y - CENTER[1]
+    return [APOTHEM - dx * math.cos(angle + (i + 0.5) * math.pi / 3)
+            - dy * math.sin(angle + (i + 0.5) * math.pi / 3) for i in range(6)]
+
+
+def reference_resolve(x, y, vx, vy, angle, omega):
+    """Exact push-out and elastic reflection; returns (x, y, vx, vy, wall_vx, wall_vy)."""
+    if min(wall_distances(x, y, angle)) >= BALL_RADIUS:
+        return x, y, vx, vy, 0.0, 0.0
+
+    # Closest point of the shrunk hexagon's boundary.
+    cx, cy = CENTER
+    shrunk = HEX_RADIUS - BALL_RADIUS / math.cos(math.pi / 6)
+    points = [(cx + shrunk * math.cos(angle + i * math.pi / 3),
+               cy + shrunk * math.sin(angle + i * math.pi / 3)) for i in range(6)]
+    best = None
+    for i in range(6):
+        (ax, ay), (bx, by) = points[i], points[(i + 1) % 6]
+        abx, aby = bx - ax, by - ay
+        t = max(0.0, min(1.0, ((x - ax) * abx + (y - ay) * aby) / (abx * abx + aby * aby)))
+        px, py = ax + t * abx, ay + t * aby
+        d2 = (x - px) ** 2 + (y - py) ** 2
+        if best is None or d2 < best[0]:
+            best = (d2, px, py)
+    _, px, py = best
+    push = math.sqrt(best[0])
+    if push == 0:
+        return px, py, vx, vy, 0.0, 0.0
+    nx, ny = (px - x) / push, (py - y) / push
+
+    contact_x = px - nx * BALL_RADIUS
+    contact_y = py - ny * BALL_RADIUS
+    wall_vx = -omega * (contact_y - cy)
+    wall_vy = omega * (contact_x - cx)
+    vn = (vx - wall_vx) * nx + (vy - wall_vy) * ny
+    if vn < 0:
+        vx -= 2 * vn * nx
+        vy -= 2 * vn * ny
+    return px, py, vx, vy, wall_vx, wall_vy
+
+
+# ---------------------------
+# Kernel adapters
+# ---------------------------
+# Each returns (call, prepare, read): prepare(case) builds the kernel's
+# native arguments (outside the timing, fresh per call since some kernels
+# update their inputs in place), and read(args, result) gives back
+# (x, y, vx, vy) in px and px/s.
+
+def reference_kernel(omega):
+    def prepare(case):
+        return case + (omega,)
+
+    def read(args, result):
+        return result[:4]
+    return reference_resolve, prepare, read
+
+
+def three_o_mini_kernel(omega):
+    engine = ThreeOMini(restitution=1.0, wall_friction=1.0, hex_angular_velocity=omega,
+                        ball_radius=BALL_RADIUS, hex_radius=HEX_RADIUS)
+
+    def prepare(case):
+        x, y, vx, vy, angle = case
+        return Vector2(x, y), Vector2(vx, vy), [Vector2(v) for v in hexagon_vertices(angle)]
+
+    def read(args, result):
+        pos, vel = result
+        return pos.x, pos.y, vel.x, vel.y
+    return engine.process_collisions, prepare, read
+
+
+def deepseek_kernel(omega):
+    engine = Deepseek(restitution=1.0, friction=0.0, angular_velocity=omega,
+                      ball_radius=BALL_RADIUS, hex_radius=HEX_RADIUS)
+
+    def prepare(case):
+        x, y, vx, vy, angle = case
+        return BallState(x, y, vx, vy, BALL_RADIUS), hexagon_vertices(angle)
+
+    def read(args, result):
+        ball = args[0]
+        return ball.x, ball.y, ball.vx, ball.vy
+    return engine.collide, prepare, read
+
+
+def gemini_kernel(omega):
+    engine = Gemini(friction=1.0, ball_radius=BALL_RADIUS, hexagon_radius=HEX_RADIUS)
+
+    def prepare(case):
+        x, y, vx, vy, angle = case
+        return x, y, vx / FPS, vy / FPS, CENTER, HEX_RADIUS, math.degrees(angle)
+
+    def read(args, result):
+        x, y, vx, vy = result
+        return x, y, vx * FPS, vy * FPS
+    return engine.ball_collision, prepare, read
+
+
+def kimi_kernel(omega):
+    engine = Kimi(restitution=1.0, ball_radius=BALL_RADIUS, hex_size=HEX_RADIUS)
+
+    def prepare(case):
+        x, y, vx, vy, angle = case
+        return BallState(x, y, vx / FPS, vy / FPS, BALL_RADIUS), hexagon_vertices(angle)
+
+    def read(args, result):
+        ball = args[0]
+        return ball.x, ball.y, ball.vx * FPS, ball.vy * FPS
+    return engine.collide, prepare, read
+
+
+def o1_kernel(omega):
+    engine = O1(bounce_friction=1.0, hex_radius=HEX_RADIUS, ball_radius=BALL_RADIUS)
+
+    def prepare(case):
+        x, y, vx, vy, angle = case
+        return x, y, vx / FPS, vy / FPS, hexagon_vertices(angle)
+
+    def read(args, result):
+        x, y, vx, vy = result
+        return x, y, vx * FPS, vy * FPS
+    return engine.collide, prepare, read
+
+
+def o3_mini_high_kernel(omega):
+    engine = O3MiniHigh(restitution=1.0, friction_coeff=0.0, hex_ang_vel=omega / FPS,
+                        ball_radius=BALL_RADIUS, hex_radius=HEX_RADIUS)
+
+    def prepare(case):
+        x, y, vx, vy, angle = case
+        return (Vector2(x, y), Vector2(vx, vy) / FPS,
+                [Vector2(v) for v in hexagon_vertices(angle)])
+
+    def read(args, result):
+        pos, vel = result
+        return pos.x, pos.y, vel.x * FPS, vel.y * FPS
+    return engine.resolve_collisions, prepare, read
+
+
+KERNELS = {
+    "reference": reference_kernel,
+    "3o-mini": three_o_mini_kernel,
+    "deepseek": deepseek_kernel,
+    "gemini": gemini_kernel,
+    "kimi": kimi_kernel,
+    "o1": o1_kernel,
+    "o3_Mini_High": o3_mini_high_kernel,
+}
+
+
+def _noop(*args):
+    pass
+
+
+def time_calls(call, prepare, cases, repeats):
+    """Best-of-`repeats` ns per call over all cases."""
+    best = math.inf
+    for _ in range(repeats):
+        prepared = [prepare(case) for case in cases]
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            for args in prepared:
+                call(*args)
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed / len(cases))
+    return best
+
+
+def allocated_per_call(call, prepare, cases):
+    """Mean tracemalloc peak (bytes) above the starting point, per call."""
+    prepared = [prepare(case) for case in cases]
+    total = 0
+    tracemalloc.start()
+    try:
+        for args in prepared:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            call(*args)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / len(cases)
+
+
+def accuracy(call, prepare, read, cases, references):
+    """Energy, velocity and penetration errors against the reference results."""
+    energy = []
+    velocity = []
+    penetration = []
+    outside = missed = contacts = 0
+    for case, ref in zip(cases, references):
+        args = prepare(case)
+        x, y, vx, vy = read(args, call(*args))
+        x0, y0, vx0, vy0, angle = case
+        _, _, rvx, rvy, wvx, wvy = ref
+
+        before = (vx0 - wvx) ** 2 + (vy0 - wvy) ** 2
+        after = (vx - wvx) ** 2 + (vy - wvy) ** 2
+        energy.append((after - before) / before)
+        velocity.append(math.hypot(vx - rvx, vy - rvy) / math.hypot(rvx, rvy))
+
+        nearest = min(wall_distances(x, y, angle))
+        penetration.append(max(0.0, BALL_RADIUS - nearest))
+        if nearest < 0:
+            outside += 1
+        if (rvx, rvy) != (vx0, vy0):
+            contacts += 1
+            if (vx, vy) == (vx0, vy0):
+                missed += 1
+
+    n = len(cases)
+    return {
+        "energy_mean_abs": sum(abs(e) for e in energy) / n,
+        "energy_mean": sum(energy) / n,
+        "energy_max_abs": max(abs(e) for e in energy),
+        "velocity_error_mean": sum(velocity) / n,
+        "penetration_mean_px": sum(penetration) / n,
+        "penetration_max_px": max(penetration),
+        "outside_fraction": outside / n,
+        "missed_fraction": missed / contacts if contacts else 0.0,
+    }
+
+
+def bench_kernel(name, cases, references, omega, repeats=5, alloc_cases=2000):
+    call, prepare, read = KERNELS[name](omega)
+    ns = time_calls(call, prepare, cases, repeats) - time_calls(_noop, prepare, cases, repeats)
+    sample = cases[:alloc_cases]
+    allocated = allocated_per_call(call, prepare, sample) - allocated_per_call(_noop, prepare,
+                                                                              sample)
+    result = {"kernel": name, "ns_per_call": ns, "alloc_bytes_per_call": allocated}
+    result.update(accuracy(call, prepare, read, cases, references))
+    return result
+
+
+def format_table(results):
+    header = ("kernel", "ns/call", "alloc B", "|dE| mean", "dE mean", "|dE| max", "dv err",
+              "pen px", "pen max", "outside", "missed")
+    rows = [header]
+    for r in results:
+        rows.append((
+            r["kernel"],
+            f"{r['ns_per_call']:,.0f}",
+            f"{r['alloc_bytes_per_call']:,.0f}",
+            f"{r['energy_mean_abs']:.2%}",
+            f"{r['energy_mean']:+.2%}",
+            f"{r['energy_max_abs']:.1%}",
+            f"{r['velocity_error_mean']:.2%}",
+            f"{r['penetration_mean_px']:.2f}",
+            f"{r['penetration_max_px']:.1f}",
+            f"{r['outside_fraction']:.1%}",
+            f"{r['missed_fraction']:.1%}",
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = []
+    for n, row in enumerate(rows):
+        cells = [row[0].ljust(widths[0])] + [c.rjust(w) for c, w in zip(row[1:], widths[1:])]
+        lines.append("  ".join(cells))
+        if n == 0:
+            lines.append("  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the models' collision kernels")
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--omega", type=float, default=1.0, help="wall spin, rad/s")
+    parser.add_argument("--contact-fraction", type=float, default=0.8)
+    parser.add_argument("--max-depth", type=float, default=1.0,
+                        help="deepest overlap, in ball radii")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--alloc-cases", type=int, default=2000,
+                        help="cases traced with tracemalloc for the alloc column")
+    parser.add_argument("--kernels", nargs="+", default=list(KERNELS), choices=list(KERNELS))
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    cases = make_cases(args.cases, args.seed, args.contact_fraction, args.max_depth)
+    references = [reference_resolve(*case, args.omega) for case in cases]
+    print(f"{len(cases):,d} cases, omega {args.omega:g} rad/s, "
+          f"overlap up to {args.max_depth:g} ball radii")
+    results = [bench_kernel(name, cases, references, args.omega, args.repeats,
+                            args.alloc_cases) for name in args.kernels]
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
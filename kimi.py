@@ -2,12 +2,18 @@ import pygame
 import math
 import sys
 
+from ball_state import BallState
+from fixed_step import lerp
+from frame_budget import FULL, SKIP, FrameScheduler
+from phase_timer import from_env as phase_timer
+from renderer import DirtyRectRenderer, init_video
+from telemetry import from_env as telemetry
+
 # Initialize Pygame
-pygame.init()
+init_video()
 width, height = 800, 600
 screen = pygame.display.set_mode((width, height))
 pygame.display.set_caption("Bouncing Ball in Spinning Hexagon")
-clock = pygame.time.Clock()
 
 # Constants
 center = (width//2, height//2)
@@ -18,18 +24,18 @@ friction = 0.98
 restitution = 0.8
 angular_speed = 0.5
 
+# The constants above are per frame (1/60 s); physics runs at its own fixed
+# rate and scales them to the step length.
+physics_hz = 240
+frames_per_step = 60 / physics_hz
+
 # Colors
 hex_color = (0, 255, 0)
 ball_color = (255, 0, 0)
 bg_color = (0, 0, 0)
 
 # Initialize ball
-ball = {
-    'x': center[0],
-    'y': center[1] - 150,
-    'vx': 0,
-    'vy': 0
-}
+ball = BallState(center[0], center[1] - 150, 0, 0, ball_radius)
 
 # Original hexagon vertices
 original_vertices = []
@@ -46,84 +52,125 @@ def rotate_point(point, angle):
     y_rot = x * math.sin(theta) + y * math.cos(theta)
     return (x_rot, y_rot)
 
+# Cached ball and hexagon sprites; only the regions that change are redrawn
+renderer = DirtyRectRenderer(screen, center, hex_size, ball_radius, hex_color, ball_color, bg_color)
+
+# Per-phase timing, enabled with PHASE_TIMING (see phase_timer.py)
+timer = phase_timer("kimi")
+# Live overlay, enabled with TELEMETRY (see telemetry.py)
+hud = telemetry("kimi", gravity * 60 * 60, velocity_scale=60, step_hz=physics_hz,
+                floor_y=height, velocity=(ball.vx, ball.vy))
+
 # Main loop
 angle = 0
+# Physics never drops steps; under load, frames are degraded or skipped
+# instead (see frame_budget.py)
+frames = FrameScheduler(physics_hz, 60)
+loop = frames.loop
+prev_ball = (ball.x, ball.y)
+prev_angle = angle
 running = True
+timer.start()
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.VIDEOEXPOSE:
+            renderer.invalidate()
+    timer.lap("events")
+
+    # Run as many fixed physics steps as the elapsed time covers
+    for _ in range(loop.advance()):
+        prev_ball = (ball.x, ball.y)
+        prev_angle = angle
 
-    # Update hexagon rotation
-    angle += angular_speed
-    angle %= 360
-
-    # Apply physics
-    ball['vy'] += gravity
-    ball['vx'] *= friction
-    ball['vy'] *= friction
-    ball['x'] += ball['vx']
-    ball['y'] += ball['vy']
-
-    # Generate rotated hexagon vertices
-    current_vertices = [rotate_point(v, angle) for v in original_vertices]
-    hex_points = [(center[0] + x, center[1] + y) for (x, y) in current_vertices]
-
-    # Collision detection
-    for i in range(6):
-        a = hex_points[i]
-        b = hex_points[(i+1)%6]
+        # Update hexagon rotation
+        angle += angular_speed * frames_per_step
+        angle %= 360
+
+        # Apply physics
+        ball.vy += gravity * frames_per_step
+        ball.vx *= friction ** frames_per_step
+        ball.vy *= friction ** frames_per_step
+        ball.x += ball.vx * frames_per_step
+        ball.y += ball.vy * frames_per_step
+        timer.lap("integrate")
+
+        # Generate rotated hexagon vertices
+        current_vertices = [rotate_point(v, angle) for v in original_vertices]
+        hex_points = [(center[0] + x, center[1] + y) for (x, y) in current_vertices]
+
+        # Collision detection
+        for i in range(6):
+            a = hex_points[i]
+            b = hex_points[(i+1)%6]
         
-        ax, ay = a
-        bx, by = b
-        dx = bx - ax
-        dy = by - ay
+            ax, ay = a
+            bx, by = b
+            dx = bx - ax
+            dy = by - ay
         
-        if dx == 0 and dy == 0:
-            continue
+            if dx == 0 and dy == 0:
+                continue
         
-        # Ball position
-        cx = ball['x']
-        cy = ball['y']
+            # Ball position
+            cx = ball.x
+            cy = ball.y
         
-        # Closest point on edge
-        apx = cx - ax
-        apy = cy - ay
-        dot = apx * dx + apy * dy
-        len_sq = dx*dx + dy*dy
+            # Closest point on edge
+            apx = cx - ax
+            apy = cy - ay
+            dot = apx * dx + apy * dy
+            len_sq = dx*dx + dy*dy
         
-        closest_x = ax
-        closest_y = ay
-        if dot > 0:
-            t = min(dot / len_sq, 1)
-            closest_x = ax + dx * t
-            closest_y = ay + dy * t
+            closest_x = ax
+            closest_y = ay
+            if dot > 0:
+                t = min(dot / len_sq, 1)
+                closest_x = ax + dx * t
+                closest_y = ay + dy * t
         
-        dist_x = cx - closest_x
-        dist_y = cy - closest_y
-        distance = math.hypot(dist_x, dist_y)
+            dist_x = cx - closest_x
+            dist_y = cy - closest_y
+            distance = math.hypot(dist_x, dist_y)
         
-        if distance < ball_radius:
-            # Collision response
-            normal_x = -dy / math.sqrt(len_sq)
-            normal_y = dx / math.sqrt(len_sq)
+            if distance < ball_radius:
+                # Collision response
+                normal_x = -dy / math.sqrt(len_sq)
+                normal_y = dx / math.sqrt(len_sq)
             
-            # Reflect velocity with energy loss
-            dot_product = ball['vx'] * normal_x + ball['vy'] * normal_y
-            ball['vx'] -= 2 * dot_product * normal_x * restitution
-            ball['vy'] -= 2 * dot_product * normal_y * restitution
+                # Reflect velocity with energy loss
+                dot_product = ball.vx * normal_x + ball.vy * normal_y
+                ball.vx -= 2 * dot_product * normal_x * restitution
+                ball.vy -= 2 * dot_product * normal_y * restitution
             
-            # Resolve collision penetration
-            penetration = ball_radius - distance
-            ball['x'] += normal_x * penetration
-            ball['y'] += normal_y * penetration
-
-    # Draw everything
-    screen.fill(bg_color)
-    pygame.draw.polygon(screen, hex_color, hex_points, 2)
-    pygame.draw.circle(screen, ball_color, (int(ball['x']), int(ball['y'])), ball_radius)
-    pygame.display.flip()
-    clock.tick(60)
+                # Resolve collision penetration
+                penetration = ball_radius - distance
+                ball.x += normal_x * penetration
+                ball.y += normal_y * penetration
+        timer.lap("collide")
+        hud.step(ball.x, ball.y, ball.vx, ball.vy)
+
+    quality = frames.plan()
+    if quality != SKIP:
+        # Draw everything, interpolated between the last two physics states
+        alpha = loop.alpha
+        # The angle wraps at 360, so interpolate across the wrap the short way
+        draw_angle = prev_angle + ((angle - prev_angle + 180) % 360 - 180) * alpha
+        draw_x = lerp(prev_ball[0], ball.x, alpha)
+        draw_y = lerp(prev_ball[1], ball.y, alpha)
+        dirty = renderer.draw(math.radians(draw_angle), draw_x, draw_y, outline=quality == FULL)
+        if quality == FULL:
+            dirty += hud.draw(screen)
+        timer.lap("draw")
+        pygame.display.update(dirty)
+        timer.lap("display")
+    hud.frame()
+    frames.wait()
+    timer.lap("wait")
 
+timer.report()
+hud.report()
+frames.report("kimi")
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,626 @@
+"""
+Many balls in one spinning hexagon: o3_Mini_High's wall model plus ball-ball
+collisions found through a spatial hash.
+
+Walls use `check_collision` from o3_Mini_High.py, batched over all balls:
+inward edge normal away from the corners, vertex-to-ball normal near them,
+restitution on the normal part of the velocity relative to the moving wall,
+(1 - friction_coeff) on the tangential part, and up to
+`collision_iterations` passes that each resolve the first touching edge.
+One addition for crowds: a ball whose center has been pushed past a wall is
+pushed back along the edge normal by its radius plus that depth, so it cannot escape.
+
+Balls collide with each other under the same model (equal masses):
+restitution on the normal relative velocity, friction_coeff on the tangential
+relative velocity. Pairs closer than `separation_reach` diameters come from
+spatial_hash.SpatialHash and are split into batches in which no ball appears
+twice (color_batches). Before the balls move, the batches are solved one
+after another for `velocity_passes` passes, so every pair sees the
+velocities its neighbours left (Gauss-Seidel); each impulse is applied
+whole, equal and opposite, keeping momentum, and accumulated per pair,
+clamped to pushing and warm started from the last step as in
+contact_solver. A pair still apart may close its gap but not overlap, and
+balls resting on a wall take part against it as a static body, so the floor
+carries the pile. Restitution is one more pass at the end, followed by the
+same passes again so a bounce cannot drive balls into their neighbours.
+After the move and the walls, `separation_passes` passes remove what
+overlap is left, moving positions only, so piles hold up without gaining
+energy.
+
+A step is split into enough substeps (up to MAX_SUBSTEPS) that no pair
+closes in by more than the reach within one. max_overlap() measures what is
+left; `--check` fails if it reaches a ball radius over 1200 steps of piles a
+few balls deep. Balls falling faster than the substeps follow, or piles
+deeper than the passes carry (a couple of thousand balls of radius 3 here),
+still overlap.
+
+Units are seconds; o3_Mini_High's per-frame constants are converted with
+FPS = 60 (gravity 0.5 px/frame^2, spin 0.02 rad/frame).
+
+Usage:
+    python multiball.py --balls 500 1000 2000
+    python multiball.py --check
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from ball_state import BallArray
+from engines import DT, FPS, HEIGHT, WIDTH
+from spatial_hash import SpatialHash
+
+# Cap on substeps per step, however fast the balls move.
+MAX_SUBSTEPS = 16
+# (balls, radius) runs for `--check`: piles a few balls deep.
+CHECK_CASES = ((200, 12.0), (500, 6.0))
+
+
+def color_batches(a, b, bodies):
+    """
+    Split contacts (a[c], b[c]) into batches in which no body appears twice;
+    returns the contact order and the batch boundaries in it. A contact whose
+    second body is static should pass b[c] == a[c].
+    """
+    remaining = np.arange(len(a))
+    first = np.empty(bodies, dtype=np.intp)
+    batches = []
+    while remaining.size:
+        ra = a[remaining]
+        rb = b[remaining]
+        first[ra] = len(a)
+        first[rb] = len(a)
+        # Each round takes every contact that is the lowest-numbered remaining
+        # contact of both its bodies, so at least one per round.
+        np.minimum.at(first, ra, remaining)
+        np.minimum.at(first, rb, remaining)
+        take = (first[ra] == remaining) & (first[rb] == remaining)
+        batches.append(remaining[take])
+        remaining = remaining[~take]
+    bounds = np.cumsum([0] + [batch.size for batch in batches])
+    return (np.concatenate(batches) if batches else remaining), bounds
+
+
+class MultiBallWorld:
+    """N equal balls inside one rotating hexagon."""
+
+    def __init__(self, n, restitution=0.9, friction_coeff=0.1, hex_ang_vel=0.02 * FPS,
+                 gravity=0.5 * FPS * FPS, air_friction=0.999, ball_radius=12,
+                 hex_radius=250, num_sides=6, hex_center=(WIDTH / 2, HEIGHT / 2),
+                 collision_iterations=5, ball_collisions=True, velocity_passes=4,
+                 separation_passes=8, separation_reach=1.5):
+        self.n = n
+        self.restitution = restitution
+        self.friction_coeff = friction_coeff
+        self.hex_ang_vel = hex_ang_vel
+        self.gravity = gravity
+        self.air_friction = air_friction
+        self.ball_radius = ball_radius
+        self.hex_radius = hex_radius
+        self.num_sides = num_sides
+        self.hex_center = (float(hex_center[0]), float(hex_center[1]))
+        self.collision_iterations = collision_iterations
+        self.ball_collisions = ball_collisions
+        self.velocity_passes = velocity_passes
+        self.separation_passes = separation_passes
+        self.separation_reach = separation_reach
+        self.hex_rotation = 0.0
+        self.substeps = 1
+
+        apothem = hex_radius * math.cos(math.pi / num_sides)
+        self._inner_sq = max(0.0, apothem - ball_radius) ** 2
+
+        self.balls = BallArray(n)
+        self.buffer = self.balls.data
+        self.x, self.y, self.vx, self.vy = self.buffer
+
+        cx, cy = self.hex_center
+        pad = 2 * ball_radius
+        # Cells as wide as the pair reach, so every pair within it is a candidate.
+        self.grid = SpatialHash(2 * ball_radius * separation_reach,
+                                (cx - hex_radius - pad, cy - hex_radius - pad,
+                                 cx + hex_radius + pad, cy + hex_radius + pad))
+        self.contacts = 0
+        self._pair_keys = np.zeros(0, dtype=np.int64)
+        self._pair_impulses = np.zeros(0)
+
+    def reset(self, pos, vel):
+        pos = np.broadcast_to(np.asarray(pos, dtype=np.float64), (self.n, 2))
+        vel = np.broadcast_to(np.asarray(vel, dtype=np.float64), (self.n, 2))
+        self.x[:] = pos[:, 0]
+        self.y[:] = pos[:, 1]
+        self.vx[:] = vel[:, 0]
+        self.vy[:] = vel[:, 1]
+        self.hex_rotation = 0.0
+        self._pair_keys = np.zeros(0, dtype=np.int64)
+
+    def positions(self):
+        return self.balls.positions
+
+    def get_hexagon_vertices(self):
+        cx, cy = self.hex_center
+        vertices = []
+        for i in range(self.num_sides):
+            angle = self.hex_rotation + i * (2 * math.pi / self.num_sides)
+            vertices.append((cx + self.hex_radius * math.cos(angle),
+                             cy + self.hex_radius * math.sin(angle)))
+        return vertices
+
+    def step(self, dt=DT):
+        # Enough substeps that no two balls close in by more than the slack
+        # between touching and `separation_reach` within one, so every pair is
+        # in the list before it can overlap (as in contact_solver).
+        self.substeps = 1
+        if self.ball_collisions:
+            speed = (math.sqrt(float(np.max(self.vx * self.vx + self.vy * self.vy)))
+                     + self.gravity * dt)
+            slack = (self.separation_reach - 1) * 2 * self.ball_radius
+            self.substeps = min(MAX_SUBSTEPS, max(1, math.ceil(2 * speed * dt / slack)))
+        h = dt / self.substeps
+        for _ in range(self.substeps):
+            self.substep(h)
+
+    def substep(self, dt):
+        self.hex_rotation += self.hex_ang_vel * dt
+
+        self.vy += self.gravity * dt
+        damping = self.air_friction ** (dt * FPS)
+        self.vx *= damping
+        self.vy *= damping
+        # Ball contacts are solved on the velocities before they move the
+        # balls, so a pile does not sink into itself every step; the walls
+        # keep o3_Mini_High's order (move, then push back and bounce).
+        if self.ball_collisions:
+            self.ball_ball_collisions(dt)
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.wall_collisions()
+        if self.ball_collisions:
+            self.separate_balls()
+
+    # ---------------------------
+    # Ball-ball
+    # ---------------------------
+    def candidate_pairs(self):
+        """Pairs of balls that may touch this step."""
+        return self.grid.candidate_pairs(self.x, self.y)
+
+    def ball_ball_collisions(self, dt=DT):
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        diameter = 2 * self.ball_radius
+        reach = self.separation_reach * diameter
+        i, j, spans = self.near_pairs(reach)
+        nx, ny, dist = self.pair_normals(i, j)
+        gap = dist - diameter
+        self.contacts = int(np.count_nonzero(gap < 0))
+        if i.size == 0:
+            return
+
+        # Relative velocity of j with respect to i.
+        rel_vx = vx[j] - vx[i]
+        rel_vy = vy[j] - vy[i]
+        vn0 = rel_vx * nx + rel_vy * ny
+        # Friction once, on touching pairs that approach: friction_coeff of the
+        # tangential relative velocity, each ball taking half.
+        ft = np.where((gap < 0) & (vn0 < 0), -self.friction_coeff * 0.5, 0.0)
+        fx = ft * (rel_vx - vn0 * nx)
+        fy = ft * (rel_vy - vn0 * ny)
+        np.subtract.at(vx, i, fx)
+        np.subtract.at(vy, i, fy)
+        np.add.at(vx, j, fx)
+        np.add.at(vy, j, fy)
+
+        # Normal: the velocity passes keep every pair from overlapping after
+        # this step's move (a pair still apart may close its gap), keeping the
+        # impulse accumulated per pair pushing only: Gauss-Seidel with clamped
+        # impulses, warm started from the last step, as in contact_solver.
+        # Balls resting on a wall (approaching it slower than gravity adds in
+        # a couple of steps) take part against it as a static body, so the
+        # floor carries the pile; faster ones are left to wall_collisions and
+        # bounce off it after the move. Restitution follows in one last pass,
+        # for the pairs that were pushed apart after approaching that fast;
+        # asking for it in every pass lets pairs that share a ball push each
+        # other apart faster than they met.
+        resting = 2 * self.gravity * dt
+        stop = np.where(gap > 0, -gap / dt, 0.0)
+        bounce = vn0 < -resting
+        wb, wnx, wny, wall_gap, wall_vx, wall_vy = self.touching_walls(reach - self.ball_radius)
+        slow = (vx[wb] - wall_vx) * wnx + (vy[wb] - wall_vy) * wny > -resting
+        total = self.warm_start(i, j, nx, ny)
+        order, bounds = color_batches(wb[slow], wb[slow], self.n)
+        wb, wnx, wny, wall_gap, wall_vx, wall_vy = (
+            a[slow][order] for a in (wb, wnx, wny, wall_gap, wall_vx, wall_vy))
+        wall_stop = np.where(wall_gap > 0, -wall_gap / dt, 0.0)
+        wall_spans = [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        wall_total = np.zeros(wb.size)
+
+        def walls():
+            for s in wall_spans:
+                b = wb[s]
+                vn = (vx[b] - wall_vx[s]) * wnx[s] + (vy[b] - wall_vy[s]) * wny[s]
+                new = np.maximum(wall_total[s] + wall_stop[s] - vn, 0.0)
+                p = new - wall_total[s]
+                wall_total[s] = new
+                vx[b] += p * wnx[s]
+                vy[b] += p * wny[s]
+
+        def passes(accumulated):
+            for _ in range(self.velocity_passes):
+                walls()
+                for s in spans:
+                    self.pair_impulses(i[s], j[s], nx[s], ny[s], stop[s], accumulated, s)
+                walls()
+
+        passes(total)
+        # Warm starting leaves the bounce out, or every step would repeat it.
+        order = np.argsort(self._pair_keys)
+        self._pair_keys = self._pair_keys[order]
+        self._pair_impulses = total[order]
+        target = np.where(bounce & (total > 0), -self.restitution * vn0, stop)
+        for s in spans:
+            self.pair_impulses(i[s], j[s], nx[s], ny[s], target[s], total, s)
+        # A bounce drives balls into neighbours they were not touching; the
+        # same passes again, from zero and so pushing only, keep those pairs
+        # apart without taking the bounce back.
+        passes(np.zeros(i.size))
+
+    def separate_balls(self):
+        """
+        Remove the overlap left after the move, moving positions only: each
+        pass pushes every overlapping pair apart by its full depth, batch by
+        batch, then puts balls pushed into the walls back inside, so the
+        walls cannot push them back into their neighbours afterwards.
+        """
+        x, y = self.x, self.y
+        diameter = 2 * self.ball_radius
+        reach = self.separation_reach * diameter
+        # A pair missing from the list was at least `reach` apart when it was
+        # made; once some ball has moved half the slack since, such a pair may
+        # touch, so the list is made again.
+        i, j, spans, gathered = self._near
+        slack_sq = ((reach - diameter) / 2) ** 2
+        for _ in range(self.separation_passes):
+            if np.max((x - gathered[0]) ** 2 + (y - gathered[1]) ** 2) > slack_sq:
+                i, j, spans = self.near_pairs(reach)
+                i, j, spans, gathered = self._near
+            deepest = 0.0
+            for s in spans:
+                bi, bj = i[s], j[s]
+                nx, ny, dist = self.pair_normals(bi, bj)
+                depth = np.maximum(diameter - dist, 0.0)
+                deepest = max(deepest, float(depth.max()))
+                push = depth * 0.5
+                x[bi] -= push * nx
+                y[bi] -= push * ny
+                x[bj] += push * nx
+                y[bj] += push * ny
+            self.keep_inside()
+            if deepest < 0.01 * self.ball_radius:
+                break
+
+    def warm_start(self, i, j, nx, ny):
+        """
+        Apply last step's accumulated impulse of every pair that is still in
+        the list and return the impulses, so a resting pile starts from the
+        last step's answer instead of from zero (as in contact_solver).
+        """
+        keys = np.minimum(i, j) * self.n + np.maximum(i, j)
+        total = np.zeros(i.size)
+        if self._pair_keys.size:
+            slot = np.searchsorted(self._pair_keys, keys)
+            np.clip(slot, 0, self._pair_keys.size - 1, out=slot)
+            known = self._pair_keys[slot] == keys
+            total[known] = self._pair_impulses[slot[known]]
+            px = total * nx
+            py = total * ny
+            self.vx += np.bincount(j, px, self.n) - np.bincount(i, px, self.n)
+            self.vy += np.bincount(j, py, self.n) - np.bincount(i, py, self.n)
+        self._pair_keys = keys
+        return total
+
+    def pair_impulses(self, i, j, nx, ny, target, total, s):
+        """
+        Move pairs (i, j) toward separating at `target` along (nx, ny),
+        keeping their accumulated impulses total[s] >= 0.
+        """
+        vx, vy = self.vx, self.vy
+        vn = (vx[j] - vx[i]) * nx + (vy[j] - vy[i]) * ny
+        # Equal masses: an impulse p per unit mass changes vn by 2p.
+        new = np.maximum(total[s] + (target - vn) * 0.5, 0.0)
+        p = new - total[s]
+        total[s] = new
+        vx[i] -= p * nx
+        vy[i] -= p * ny
+        vx[j] += p * nx
+        vy[j] += p * ny
+
+    def near_pairs(self, reach):
+        """
+        Pairs of balls closer than `reach`, as (i, j, spans): reordered by
+        color_batches, with one slice per batch. Also kept, with the positions
+        they were found at, for separate_balls.
+        """
+        ci, cj = self.candidate_pairs()
+        dx = self.x[cj] - self.x[ci]
+        dy = self.y[cj] - self.y[ci]
+        near = np.flatnonzero(dx * dx + dy * dy < reach * reach)
+        # Within a batch no ball appears twice, so a batch is a few array
+        # operations and the same as solving its pairs one by one.
+        order, bounds = color_batches(ci[near], cj[near], self.n)
+        spans = [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        i, j = ci[near][order], cj[near][order]
+        self._near = i, j, spans, (self.x.copy(), self.y.copy())
+        return i, j, spans
+
+    def pair_normals(self, i, j):
+        """Unit normals from ball i to ball j, and the center distances."""
+        dx = self.x[j] - self.x[i]
+        dy = self.y[j] - self.y[i]
+        dist = np.sqrt(dx * dx + dy * dy)
+        # Coincident centers: pick an arbitrary separating direction.
+        apart = dist > 0
+        safe = np.where(apart, dist, 1.0)
+        return np.where(apart, dx / safe, 1.0), np.where(apart, dy / safe, 0.0), dist
+
+    # ---------------------------
+    # Walls (o3_Mini_High check_collision)
+    # ---------------------------
+    def touching_walls(self, margin):
+        """
+        Balls less than `margin` from touching an edge, as (ball, nx, ny, gap,
+        wall_vx, wall_vy): inward edge normal, distance left to touching
+        (negative when overlapping) and the wall's velocity at the contact.
+        """
+        cx, cy = self.hex_center
+        reach = self.ball_radius + margin
+        apothem = self.hex_radius * math.cos(math.pi / self.num_sides)
+        inner_sq = max(0.0, apothem - reach) ** 2
+        idx = np.flatnonzero((self.x - cx) ** 2 + (self.y - cy) ** 2 > inner_sq)
+        px = self.x[idx]
+        py = self.y[idx]
+        omega = self.hex_ang_vel
+        vertices = self.get_hexagon_vertices()
+        found = []
+        for k in range(len(vertices)):
+            ax, ay = vertices[k]
+            bx, by = vertices[(k + 1) % len(vertices)]
+            mx = cx - (ax + bx) / 2
+            my = cy - (ay + by) / 2
+            m_len = math.hypot(mx, my)
+            mx /= m_len
+            my /= m_len
+            signed = (px - ax) * mx + (py - ay) * my
+            near = np.flatnonzero(signed < reach)
+            # Contact point: the foot of the center on the edge's line.
+            qx = px[near] - signed[near] * mx
+            qy = py[near] - signed[near] * my
+            found.append((idx[near], np.full(near.size, mx), np.full(near.size, my),
+                          signed[near] - self.ball_radius, omega * -(qy - cy),
+                          omega * (qx - cx)))
+        return tuple(np.concatenate(column) for column in zip(*found))
+
+    def keep_inside(self):
+        """Move centers (positions only) to at least a radius inside every edge."""
+        cx, cy = self.hex_center
+        x, y = self.x, self.y
+        idx = np.flatnonzero((x - cx) ** 2 + (y - cy) ** 2 > self._inner_sq)
+        if idx.size == 0:
+            return
+        px = x[idx]
+        py = y[idx]
+        vertices = self.get_hexagon_vertices()
+        for k in range(len(vertices)):
+            ax, ay = vertices[k]
+            bx, by = vertices[(k + 1) % len(vertices)]
+            mx = cx - (ax + bx) / 2
+            my = cy - (ay + by) / 2
+            m_len = math.hypot(mx, my)
+            mx /= m_len
+            my /= m_len
+            push = np.maximum(self.ball_radius - ((px - ax) * mx + (py - ay) * my), 0.0)
+            px += push * mx
+            py += push * my
+        x[idx] = px
+        y[idx] = py
+
+    def wall_collisions(self):
+        cx, cy = self.hex_center
+        dx = self.x - cx
+        dy = self.y - cy
+        idx = np.flatnonzero(dx * dx + dy * dy > self._inner_sq)
+        if idx.size == 0:
+            return
+
+        px = self.x[idx]
+        py = self.y[idx]
+        vx = self.vx[idx]
+        vy = self.vy[idx]
+        radius = self.ball_radius
+        omega = self.hex_ang_vel
+        vertices = self.get_hexagon_vertices()
+        n_sides = len(vertices)
+
+        active = np.arange(idx.size)
+        for _ in range(self.collision_iterations):
+            pending = np.ones(active.size, dtype=bool)
+            for k in range(n_sides):
+                ax, ay = vertices[k]
+                bx, by = vertices[(k + 1) % n_sides]
+                abx = bx - ax
+                aby = by - ay
+                # Inward edge normal (from the edge midpoint toward the center).
+                mx = cx - (ax + bx) / 2
+                my = cy - (ay + by) / 2
+                m_len = math.hypot(mx, my)
+                mx /= m_len
+                my /= m_len
+
+                sel = active[pending]
+                bpx = px[sel]
+                bpy = py[sel]
+                t = np.clip(((bpx - ax) * abx + (bpy - ay) * aby) / (abx * abx + aby * aby), 0, 1)
+                qx = ax + abx * t
+                qy = ay + aby * t
+                dist = np.sqrt((bpx - qx) ** 2 + (bpy - qy) ** 2)
+                # A crowd can push a ball's center past the wall, where the
+                # unsigned distance alone would let it escape.
+                signed = (bpx - ax) * mx + (bpy - ay) * my
+                outside = signed < 0
+                hit = (dist < radius) | outside
+                if not hit.any():
+                    continue
+
+                sel = sel[hit]
+                t = t[hit]
+                qx = qx[hit]
+                qy = qy[hit]
+                bpx = bpx[hit]
+                bpy = bpy[hit]
+                outside = outside[hit]
+                penetration = np.where(outside, radius - signed[hit], radius - dist[hit])
+
+                # Inward edge normal away from the corners ...
+                nx = np.full(sel.size, mx)
+                ny = np.full(sel.size, my)
+                # ... vertex-to-ball normal near them.
+                corner = ~((0.01 < t) & (t < 0.99)) & ~outside
+                if corner.any():
+                    da = np.hypot(bpx - ax, bpy - ay)
+                    db = np.hypot(bpx - bx, bpy - by)
+                    use_a = da < db
+                    vxv = np.where(use_a, bpx - ax, bpx - bx)
+                    vyv = np.where(use_a, bpy - ay, bpy - by)
+                    vlen = np.where(use_a, da, db)
+                    ok = corner & (vlen > 0)
+                    safe = np.where(vlen > 0, vlen, 1.0)
+                    nx = np.where(ok, vxv / safe, np.where(corner, 1.0, nx))
+                    ny = np.where(ok, vyv / safe, np.where(corner, 0.0, ny))
+
+                px[sel] = bpx + nx * penetration
+                py[sel] = bpy + ny * penetration
+
+                wall_vx = omega * -(qy - cy)
+                wall_vy = omega * (qx - cx)
+                rel_vx = vx[sel] - wall_vx
+                rel_vy = vy[sel] - wall_vy
+                rn = rel_vx * nx + rel_vy * ny
+                tx = rel_vx - rn * nx
+                ty = rel_vy - rn * ny
+                keep = 1 - self.friction_coeff
+                vx[sel] = wall_vx - self.restitution * rn * nx + keep * tx
+                vy[sel] = wall_vy - self.restitution * rn * ny + keep * ty
+
+                # Resolved this pass; re-check all walls on the next pass.
+                pending[np.flatnonzero(pending)[hit]] = False
+
+            collided = ~pending
+            if not collided.any():
+                break
+            active = active[collided]
+
+        self.x[idx] = px
+        self.y[idx] = py
+        self.vx[idx] = vx
+        self.vy[idx] = vy
+
+
+def container_radius_for(n, ball_radius, fill=0.3):
+    """Hexagon radius giving `fill` area fraction for n balls."""
+    area = n * math.pi * ball_radius ** 2 / fill
+    return math.sqrt(area / (1.5 * math.sqrt(3)))
+
+
+def lattice_balls(n, ball_radius, hex_radius, center=(WIDTH / 2, HEIGHT / 2), speed=100.0,
+                  seed=0, clear=()):
+    """
+    n non-overlapping positions inside the inscribed circle, random
+    velocities. None overlaps the circles (x, y, radius) in `clear`.
+    """
+    rng = np.random.default_rng(seed)
+    spacing = 2.1 * ball_radius
+    limit = hex_radius * math.cos(math.pi / 6) - ball_radius
+    ticks = np.arange(-limit, limit + spacing, spacing)
+    gx, gy = np.meshgrid(ticks, ticks)
+    inside = gx * gx + gy * gy <= limit * limit
+    for x, y, radius in clear:
+        reach = radius + ball_radius
+        inside &= (center[0] + gx - x) ** 2 + (center[1] + gy - y) ** 2 >= reach * reach
+    gx, gy = gx[inside], gy[inside]
+    if len(gx) < n:
+        raise ValueError(f"only {len(gx)} balls fit, asked for {n}")
+    pick = rng.choice(len(gx), n, replace=False)
+    pos = np.column_stack((center[0] + gx[pick], center[1] + gy[pick]))
+    vel = rng.normal(0.0, speed, size=(n, 2))
+    return pos, vel
+
+
+def max_overlap(world):
+    """Deepest ball-ball or ball-wall overlap in a MultiBallWorld, px."""
+    radius = world.ball_radius
+    _, _, _, _, dist_sq = world.grid.pairs_within(world.x, world.y, 2 * radius)
+    worst = 2 * radius - np.sqrt(dist_sq.min()) if dist_sq.size else 0.0
+    apothem = world.hex_radius * math.cos(math.pi / world.num_sides)
+    px = world.x - world.hex_center[0]
+    py = world.y - world.hex_center[1]
+    sector = 2 * math.pi / world.num_sides
+    for k in range(world.num_sides):
+        angle = world.hex_rotation + (k + 0.5) * sector
+        distance = apothem - px * math.cos(angle) - py * math.sin(angle)
+        worst = max(worst, radius - distance.min())
+    return max(worst, 0.0)
+
+
+def check_overlap(cases=CHECK_CASES, steps=1200, every=10):
+    """
+    Run each (balls, radius) case in the default hexagon and return the
+    deepest overlap seen every `every` steps, as a fraction of a radius.
+    """
+    worst = 0.0
+    for n, radius in cases:
+        world = MultiBallWorld(n, ball_radius=radius)
+        world.reset(*lattice_balls(n, radius, world.hex_radius))
+        for k in range(1, steps + 1):
+            world.step()
+            if k % every == 0:
+                worst = max(worst, max_overlap(world) / radius)
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-ball scaling benchmark")
+    parser.add_argument("--balls", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--radius", type=float, default=3.0, help="ball radius, px")
+    parser.add_argument("--check", action="store_true",
+                        help="fail unless overlap stays under a ball radius over 1200 steps "
+                             "of 200 balls of radius 12 and 500 of radius 6")
+    args = parser.parse_args()
+
+    if args.check:
+        worst = check_overlap()
+        print(f"deepest overlap: {worst:.2f} of a ball radius")
+        if worst >= 1.0:
+            parser.exit(1, "overlap check failed\n")
+        return
+
+    print(f"{'balls':>8}  {'ms/step':>8}  {'us/ball':>8}  {'substeps':>8}  {'contacts':>9}  "
+          f"{'overlap':>8}")
+    for n in args.balls:
+        hex_radius = container_radius_for(n, args.radius)
+        world = MultiBallWorld(n, ball_radius=args.radius, hex_radius=hex_radius)
+        world.reset(*lattice_balls(n, args.radius, hex_radius))
+        for _ in range(20):
+            world.step()
+        start = time.perf_counter()
+        substeps = 0
+        for _ in range(args.steps):
+            world.step()
+            substeps += world.substeps
+        per_step = (time.perf_counter() - start) / args.steps
+        print(f"{n:8,d}  {per_step * 1000:8.2f}  {per_step / n * 1e6:8.3f}  "
+              f"{substeps / args.steps:8.1f}  {world.contacts:9,d}  {max_overlap(world):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Regular N-gon containers with O(1) edge lookup.
+
+rotating_frame.py already solves collisions in the container's frame, but it
+still visits every edge each step: a 1000-sided container costs 1000
+half-plane tests per ball per step. For a regular polygon, the ball's polar
+angle in the container frame says which edge to test:
+
+- edge i runs from vertex i to vertex i + 1, at polar angles i * 2pi/N and
+  (i + 1) * 2pi/N, so the edge in the ball's sector is
+  floor(atan2(y, x) / (2pi/N)) mod N. Inside the polygon that edge's line is
+  also the nearest one, so it carries the deepest contact. Its two
+  neighbours are tested as well, for balls sitting in a corner;
+- no wall line is closer to the center than the apothem R cos(pi/N), so a
+  ball within apothem - radius of the center touches nothing and no edge is
+  tested at all.
+
+A step therefore costs the same from N = 3 to N = 10,000. Candidate edges
+are visited in index order, so on a hexagon the trajectory is the same as
+RotatingFrameEngine's. On finer polygons, where a ball can overlap many tiny
+edges, the nearest edge is resolved rather than the lowest-numbered one.
+
+Usage:
+    python ngon.py --sides 3 6 12 100 1000 10000
+"""
+import argparse
+import math
+import random
+import time
+
+from engines import DT, INITIAL_POS, INITIAL_VEL
+from rotating_frame import RotatingFrameEngine
+
+
+class RegularPolygon:
+    """Edge data and sector lookup for a regular N-gon centered on the origin."""
+
+    def __init__(self, num_sides, radius):
+        self.num_sides = num_sides
+        self.radius = radius
+        self.sector = 2 * math.pi / num_sides
+        self.apothem = radius * math.cos(math.pi / num_sides)
+
+        # Same layout as RotatingFrameEngine.edges:
+        # (ax, ay, ux, uy, length, nx, ny, offset), n pointing inward.
+        vertices = []
+        for i in range(num_sides):
+            angle = 2 * math.pi * i / num_sides
+            vertices.append((radius * math.cos(angle), radius * math.sin(angle)))
+        self.edges = []
+        for i in range(num_sides):
+            ax, ay = vertices[i]
+            bx, by = vertices[(i + 1) % num_sides]
+            length = math.hypot(bx - ax, by - ay)
+            ux, uy = (bx - ax) / length, (by - ay) / length
+            nx, ny = -uy, ux
+            if nx * ax + ny * ay > 0:
+                nx, ny = -nx, -ny
+            self.edges.append((ax, ay, ux, uy, length, nx, ny, nx * ax + ny * ay))
+
+        # Edge neighbourhoods in index order, precomputed per sector.
+        self.neighbourhoods = []
+        for i in range(num_sides):
+            indices = sorted({(i - 1) % num_sides, i, (i + 1) % num_sides})
+            self.neighbourhoods.append([self.edges[k] for k in indices])
+
+    def edge_index(self, px, py):
+        """Index of the edge whose sector contains the point's polar angle."""
+        return int(math.atan2(py, px) // self.sector) % self.num_sides
+
+    def candidates(self, px, py, reach):
+        """Edges that may be within `reach` of (px, py): none, or the sector edge and its neighbours."""
+        inner = self.apothem - reach
+        if inner > 0 and px * px + py * py < inner * inner:
+            return ()
+        return self.neighbourhoods[self.edge_index(px, py)]
+
+    def distance(self, px, py):
+        """Signed distance from the nearest edge line, positive inside."""
+        _, _, _, _, _, nx, ny, offset = self.edges[self.edge_index(px, py)]
+        return nx * px + ny * py - offset
+
+
+class NGonEngine(RotatingFrameEngine):
+    """3o-mini physics in a regular N-gon, testing O(1) edges per step."""
+
+    name = "3o-mini (n-gon sectors)"
+
+    def __init__(self, *args, num_sides=6, hex_radius=250, **kwargs):
+        self.polygon = RegularPolygon(num_sides, hex_radius)
+        super().__init__(*args, num_sides=num_sides, hex_radius=hex_radius, **kwargs)
+
+    def _candidate_edges(self, px, py, reach):
+        return self.polygon.candidates(px, py, reach)
+
+    def outside(self):
+        px, py, _, _ = self.to_local()
+        return self.polygon.distance(px, py) < 0
+
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+def time_engine(engine, steps, dt=DT, repeats=3):
+    """Best steps per second over `repeats` runs, and whether the ball ended outside."""
+    best = 0.0
+    for _ in range(repeats):
+        engine.reset(INITIAL_POS, INITIAL_VEL)
+        step = engine.step
+        start = time.perf_counter()
+        for _ in range(steps):
+            step(dt)
+        best = max(best, steps / (time.perf_counter() - start))
+    return best, engine.outside()
+
+
+def time_contacts(engine, count=2000, seed=0):
+    """
+    Microseconds per collision pass for a ball pressed into the wall at random
+    polar angles, so every pass resolves a contact whatever the trajectory does.
+    """
+    rng = random.Random(seed)
+    apothem = engine.hex_radius * math.cos(math.pi / len(engine.edges))
+    depth = apothem - 0.5 * engine.ball_radius
+    states = []
+    for _ in range(count):
+        theta = rng.uniform(0, 2 * math.pi)
+        states.append((engine.hex_cx + depth * math.cos(theta),
+                       engine.hex_cy + depth * math.sin(theta),
+                       300 * math.cos(theta), 300 * math.sin(theta)))
+    engine.reset(INITIAL_POS, INITIAL_VEL)
+    collide = engine._collide
+    start = time.perf_counter()
+    for engine.x, engine.y, engine.vx, engine.vy in states:
+        collide()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def max_difference(a, b, steps, dt=DT):
+    """Largest position difference between two engines stepped side by side."""
+    a.reset(INITIAL_POS, INITIAL_VEL)
+    b.reset(INITIAL_POS, INITIAL_VEL)
+    worst = 0.0
+    for _ in range(steps):
+        a.step(dt)
+        b.step(dt)
+        sa, sb = a.state(), b.state()
+        worst = max(worst, abs(sa[0] - sb[0]), abs(sa[1] - sb[1]))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-step cost of N-gon containers")
+    parser.add_argument("--sides", type=int, nargs="+", default=[3, 6, 12, 100, 1000, 10000])
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--check-steps", type=int, default=20000,
+                        help="hexagon steps compared against RotatingFrameEngine")
+    parser.add_argument("--all-edges-max", type=int, default=10000,
+                        help="largest N also timed with the all-edges solver")
+    args = parser.parse_args()
+
+    diff = max_difference(RotatingFrameEngine(), NGonEngine(), args.check_steps)
+    print(f"hexagon, {args.check_steps} steps: max difference from all-edges solver "
+          f"{diff:.2e} px")
+    print("steps/s over the default trajectory; us per collision pass with the ball in contact")
+    print(f"{'sides':>6s} {'all edges':>12s} {'sectors':>12s} {'speedup':>8s} "
+          f"{'all edges':>10s} {'sectors':>10s}")
+    for n in args.sides:
+        engine = NGonEngine(num_sides=n)
+        fast, escaped = time_engine(engine, args.steps)
+        fast_contact = time_contacts(engine)
+        flag = "  (ball escaped)" if escaped else ""
+        if n <= args.all_edges_max:
+            engine = RotatingFrameEngine(num_sides=n)
+            slow, _ = time_engine(engine, args.steps)
+            slow_contact = time_contacts(engine)
+            print(f"{n:6d} {slow:12,.0f} {fast:12,.0f} {fast / slow:7.1f}x "
+                  f"{slow_contact:8.2f}us {fast_contact:8.2f}us{flag}")
+        else:
+            print(f"{n:6d} {'':12s} {fast:12,.0f} {'':8s} {'':10s} {fast_contact:8.2f}us{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,12 @@ import pygame
 import math
 import sys
 
+from fixed_step import lerp
+from frame_budget import FULL, SKIP, FrameScheduler
+from phase_timer import from_env as phase_timer
+from renderer import DirtyRectRenderer, init_video
+from telemetry import from_env as telemetry
+
 # Window size
 WIDTH, HEIGHT = 800, 600
 
@@ -15,10 +21,11 @@ HEX_RADIUS = 200      # "Radius" of the hexagon (center to vertex)
 BALL_RADIUS = 15
 INITIAL_BALL_POS = (WIDTH//2, HEIGHT//2 - 100)
 INITIAL_BALL_VEL = (2.0, 0.0)
+PHYSICS_HZ = 240      # Fixed physics rate; the per-frame values above are scaled to it
+FRAMES_PER_STEP = FPS / PHYSICS_HZ
 
-pygame.init()
+init_video()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
-clock = pygame.time.Clock()
 
 # Define a function to get hexagon vertices in local (unrotated) coordinates
 def get_hexagon_vertices(radius):
@@ -154,76 +161,112 @@ def main():
 
     rotation_angle = 0.0
 
+    # Cached ball and hexagon sprites; only the regions that change are redrawn
+    # (the local vertices start at -30 degrees, so a vertex is at the top)
+    renderer = DirtyRectRenderer(screen, hex_center, HEX_RADIUS, BALL_RADIUS,
+                                 (0, 200, 255), (255, 50, 50), (30, 30, 30),
+                                 phase=math.radians(-30))
+
+    # Per-phase timing, enabled with PHASE_TIMING (see phase_timer.py)
+    timer = phase_timer("o1")
+    # Live overlay, enabled with TELEMETRY (see telemetry.py)
+    hud = telemetry("o1", GRAVITY * FPS * FPS, velocity_scale=FPS, step_hz=PHYSICS_HZ,
+                    floor_y=HEIGHT, velocity=(ball_vx, ball_vy))
+
+    # Physics never drops steps; under load, frames are degraded or skipped
+    # instead (see frame_budget.py)
+    frames = FrameScheduler(PHYSICS_HZ, FPS)
+    loop = frames.loop
+    prev_ball = (ball_x, ball_y)
+    prev_angle = rotation_angle
+
     running = True
+    timer.start()
     while running:
-        dt = clock.tick(FPS) / 1000.0  # delta time in seconds, if desired
-
         # ========== Event handling ==========
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
-        # ========== Update Physics ==========
-
-        # 1) Apply gravity
-        ball_vy += GRAVITY
-
-        # 2) Apply air friction
-        ball_vx *= AIR_FRICTION
-        ball_vy *= AIR_FRICTION
-
-        # 3) Update ball position
-        ball_x += ball_vx
-        ball_y += ball_vy
-
-        # 4) Rotate hexagon
-        rotation_angle += ROTATION_SPEED
-        if rotation_angle >= 360:
-            rotation_angle -= 360
-
-        # 5) Construct rotated hexagon vertices
-        rotated_vertices = []
-        for vx, vy in hex_local_vertices:
-            rx, ry = rotate_point(vx + hex_center[0],
-                                  vy + hex_center[1],
-                                  hex_center[0],
-                                  hex_center[1],
-                                  rotation_angle)
-            rotated_vertices.append((rx, ry))
-
-        # 6) Check collision with each hexagon edge
-        #    The hex has 6 sides, connect consecutive vertices
-        for i in range(len(rotated_vertices)):
-            p1 = rotated_vertices[i]
-            p2 = rotated_vertices[(i+1) % len(rotated_vertices)]
-
-            (new_pos, new_vel, collided) = collide_and_reflect(
-                (ball_x, ball_y), (ball_vx, ball_vy), p1, p2
-            )
-            ball_x, ball_y = new_pos
-            ball_vx, ball_vy = new_vel
-
-            if collided:
-                # If you want to apply additional friction on bounce, do so here
-                # e.g. ball_vx *= 0.95; ball_vy *= 0.95
-                pass
+            elif event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+        timer.lap("events")
+
+        # Run as many fixed physics steps as the elapsed time covers
+        for _ in range(loop.advance()):
+            prev_ball = (ball_x, ball_y)
+            prev_angle = rotation_angle
+
+            # ========== Update Physics ==========
+
+            # 1) Apply gravity
+            ball_vy += GRAVITY * FRAMES_PER_STEP
+
+            # 2) Apply air friction
+            ball_vx *= AIR_FRICTION ** FRAMES_PER_STEP
+            ball_vy *= AIR_FRICTION ** FRAMES_PER_STEP
+
+            # 3) Update ball position
+            ball_x += ball_vx * FRAMES_PER_STEP
+            ball_y += ball_vy * FRAMES_PER_STEP
+
+            # 4) Rotate hexagon
+            rotation_angle += ROTATION_SPEED * FRAMES_PER_STEP
+            if rotation_angle >= 360:
+                rotation_angle -= 360
+            timer.lap("integrate")
+
+            # 5) Construct rotated hexagon vertices
+            rotated_vertices = []
+            for vx, vy in hex_local_vertices:
+                rx, ry = rotate_point(vx + hex_center[0],
+                                      vy + hex_center[1],
+                                      hex_center[0],
+                                      hex_center[1],
+                                      rotation_angle)
+                rotated_vertices.append((rx, ry))
+
+            # 6) Check collision with each hexagon edge
+            #    The hex has 6 sides, connect consecutive vertices
+            for i in range(len(rotated_vertices)):
+                p1 = rotated_vertices[i]
+                p2 = rotated_vertices[(i+1) % len(rotated_vertices)]
+
+                (new_pos, new_vel, collided) = collide_and_reflect(
+                    (ball_x, ball_y), (ball_vx, ball_vy), p1, p2
+                )
+                ball_x, ball_y = new_pos
+                ball_vx, ball_vy = new_vel
+
+                if collided:
+                    # If you want to apply additional friction on bounce, do so here
+                    # e.g. ball_vx *= 0.95; ball_vy *= 0.95
+                    pass
+            timer.lap("collide")
+            hud.step(ball_x, ball_y, ball_vx, ball_vy)
 
         # ========== Draw ==========
-        screen.fill((30, 30, 30))
-
-        # Draw hexagon edges
-        COLOR_HEX = (0, 200, 255)
-        for i in range(len(rotated_vertices)):
-            p1 = rotated_vertices[i]
-            p2 = rotated_vertices[(i+1) % len(rotated_vertices)]
-            pygame.draw.line(screen, COLOR_HEX, p1, p2, 2)
-
-        # Draw ball
-        COLOR_BALL = (255, 50, 50)
-        pygame.draw.circle(screen, COLOR_BALL, (int(ball_x), int(ball_y)), BALL_RADIUS)
-
-        pygame.display.flip()
-
+        quality = frames.plan()
+        if quality != SKIP:
+            # Interpolate between the last two physics states (the angle wraps at 360)
+            alpha = loop.alpha
+            draw_angle = prev_angle + ((rotation_angle - prev_angle + 180) % 360 - 180) * alpha
+            draw_x = lerp(prev_ball[0], ball_x, alpha)
+            draw_y = lerp(prev_ball[1], ball_y, alpha)
+
+            # Draw hexagon and ball, updating only the regions that changed
+            dirty = renderer.draw(math.radians(draw_angle), draw_x, draw_y, outline=quality == FULL)
+            if quality == FULL:
+                dirty += hud.draw(screen)
+            timer.lap("draw")
+            pygame.display.update(dirty)
+            timer.lap("display")
+        hud.frame()
+        frames.wait()
+        timer.lap("wait")
+
+    timer.report()
+    hud.report()
+    frames.report("o1")
     pygame.quit()
     sys.exit()
 
@@ -3,11 +3,20 @@ import sys
 import pygame
 from pygame.math import Vector2
 
+from frame_budget import FULL, SKIP, FrameScheduler
+from phase_timer import from_env as phase_timer
+from renderer import DirtyRectRenderer, init_video
+from telemetry import from_env as telemetry
+
 # -------------------- Configuration --------------------
 
 # Window dimensions and frame rate
 WIDTH, HEIGHT = 800, 600
 FPS = 60
+# Physics runs at its own fixed rate; the per-frame values below are per 1/FPS s
+# and are scaled to the step length.
+PHYSICS_HZ = 240
+FRAMES_PER_STEP = FPS / PHYSICS_HZ
 
 # Ball properties
 BALL_RADIUS = 12
@@ -126,64 +135,101 @@ def check_collision(ball_pos, ball_vel, ball_radius, A, B, hex_center, hex_ang_v
 # -------------------- Main Loop --------------------
 
 def main():
-    pygame.init()
+    init_video()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Bouncing Ball in a Spinning Hexagon")
-    clock = pygame.time.Clock()
 
     global ball_pos, ball_vel, hex_rotation
 
+    # Cached ball and hexagon sprites; only the regions that change are redrawn.
+    renderer = DirtyRectRenderer(screen, HEX_CENTER, HEX_RADIUS, BALL_RADIUS, (50, 200, 50),
+                                 BALL_COLOR, (30, 30, 30), hex_width=4)
+
+    # Per-phase timing, enabled with PHASE_TIMING (see phase_timer.py).
+    timer = phase_timer("o3_Mini_High")
+    # Live overlay, enabled with TELEMETRY (see telemetry.py).
+    hud = telemetry("o3_Mini_High", GRAVITY.y * FPS * FPS, velocity_scale=FPS,
+                    step_hz=PHYSICS_HZ, floor_y=HEIGHT, velocity=ball_vel)
+
+    # Physics never drops steps; under load, frames are degraded or skipped
+    # instead (see frame_budget.py)
+    frames = FrameScheduler(PHYSICS_HZ, FPS)
+    loop = frames.loop
+    prev_ball_pos = Vector2(ball_pos)
+    prev_rotation = hex_rotation
+
     running = True
+    timer.start()
     while running:
         # --- Event Handling ---
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
-        # --- Update the Simulation ---
-
-        # Update the hexagon’s rotation.
-        hex_rotation += HEX_ANG_VEL
-        vertices = get_hexagon_vertices(HEX_CENTER, HEX_RADIUS, hex_rotation)
-
-        # Update the ball’s velocity and position.
-        ball_vel += GRAVITY
-        ball_vel *= AIR_FRICTION
-        ball_pos += ball_vel
-
-        # --- Collision Detection & Response ---
-        # Check for penetration against each hexagon edge.
-        # We use several iterations to “unstick” the ball if it overlaps more than one wall.
-        for _ in range(COLLISION_ITERATIONS):
-            collision_happened = False
-            for i in range(len(vertices)):
-                A = vertices[i]
-                B = vertices[(i + 1) % len(vertices)]
-                collided, new_pos, new_vel = check_collision(ball_pos, ball_vel, BALL_RADIUS,
-                                                               A, B, HEX_CENTER, HEX_ANG_VEL)
-                if collided:
-                    ball_pos = new_pos
-                    ball_vel = new_vel
-                    collision_happened = True
-                    # Break out of this inner loop so that we re‐check all walls after resolution.
+            elif event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+        timer.lap("events")
+
+        # Run as many fixed physics steps as the elapsed time covers.
+        for _ in range(loop.advance()):
+            prev_ball_pos = Vector2(ball_pos)
+            prev_rotation = hex_rotation
+
+            # --- Update the Simulation ---
+
+            # Update the hexagon’s rotation.
+            hex_rotation += HEX_ANG_VEL * FRAMES_PER_STEP
+            vertices = get_hexagon_vertices(HEX_CENTER, HEX_RADIUS, hex_rotation)
+
+            # Update the ball’s velocity and position.
+            ball_vel += GRAVITY * FRAMES_PER_STEP
+            ball_vel *= AIR_FRICTION ** FRAMES_PER_STEP
+            ball_pos += ball_vel * FRAMES_PER_STEP
+            timer.lap("integrate")
+
+            # --- Collision Detection & Response ---
+            # Check for penetration against each hexagon edge.
+            # We use several iterations to “unstick” the ball if it overlaps more than one wall.
+            for _ in range(COLLISION_ITERATIONS):
+                collision_happened = False
+                for i in range(len(vertices)):
+                    A = vertices[i]
+                    B = vertices[(i + 1) % len(vertices)]
+                    collided, new_pos, new_vel = check_collision(ball_pos, ball_vel, BALL_RADIUS,
+                                                                   A, B, HEX_CENTER, HEX_ANG_VEL)
+                    if collided:
+                        ball_pos = new_pos
+                        ball_vel = new_vel
+                        collision_happened = True
+                        # Break out of this inner loop so that we re‐check all walls after resolution.
+                        break
+                if not collision_happened:
                     break
-            if not collision_happened:
-                break
-
-        # --- Drawing ---
-        screen.fill((30, 30, 30))  # dark gray background
-
-        # Draw the rotating hexagon.
-        # Convert the list of Vector2 vertices to a list of (x,y) tuples.
-        hex_points = [(int(v.x), int(v.y)) for v in vertices]
-        pygame.draw.polygon(screen, (50, 200, 50), hex_points, 4)  # green outline, 4 pixels thick
-
-        # Draw the ball.
-        pygame.draw.circle(screen, BALL_COLOR, (int(ball_pos.x), int(ball_pos.y)), BALL_RADIUS)
-
-        pygame.display.flip()
-        clock.tick(FPS)
-
+            timer.lap("collide")
+            hud.step(ball_pos.x, ball_pos.y, ball_vel.x, ball_vel.y)
+
+        quality = frames.plan()
+        if quality != SKIP:
+            # --- Drawing ---
+            # Interpolate between the last two physics states.
+            alpha = loop.alpha
+            draw_pos = prev_ball_pos.lerp(ball_pos, alpha)
+            draw_rotation = prev_rotation + (hex_rotation - prev_rotation) * alpha
+
+            # Draw the rotating hexagon (green outline, 4 pixels thick) on a dark gray
+            # background, and the ball; only the regions that changed are updated.
+            dirty = renderer.draw(draw_rotation, draw_pos.x, draw_pos.y, outline=quality == FULL)
+            if quality == FULL:
+                dirty += hud.draw(screen)
+            timer.lap("draw")
+            pygame.display.update(dirty)
+            timer.lap("display")
+        hud.frame()
+        frames.wait()
+        timer.lap("wait")
+
+    timer.report()
+    hud.report()
+    frames.report("o3_Mini_High")
     pygame.quit()
     sys.exit()
 
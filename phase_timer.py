@@ -0,0 +1,169 @@
+"""
+Per-phase timing for the scripts' main loops.
+
+Each loop marks the end of a phase with `timer.lap(name)`; the time since the
+previous mark (a monotonic perf_counter_ns reading) goes into that phase's
+fixed-size histogram. Nothing grows with run length: a histogram is 512
+integer buckets, 8 per power of two of nanoseconds (within 12.5%), indexed
+with integer bit operations only.
+
+Timing is off unless PHASE_TIMING is set in the environment, and then
+`timer` is a NullTimer whose methods do nothing, so the cost in a normal run
+is one empty method call per mark.
+
+    PHASE_TIMING=1 python o1.py            # print p50/p95/p99 per phase at exit
+    PHASE_TIMING=o1.json python o1.py      # ... and write them to o1.json
+
+Compare dumps from different models or runs:
+
+    python phase_timer.py o1.json kimi.json
+"""
+import argparse
+import json
+import os
+import time
+
+SUB_BUCKETS = 8          # per power of two
+SUB_BITS = 3
+NUM_BUCKETS = 64 * SUB_BUCKETS
+
+
+def bucket_index(ns):
+    """Histogram bucket of a duration in nanoseconds."""
+    if ns < SUB_BUCKETS:
+        return max(ns, 0)
+    bits = ns.bit_length()
+    return (bits - SUB_BITS) * SUB_BUCKETS + ((ns >> (bits - SUB_BITS - 1)) & (SUB_BUCKETS - 1))
+
+
+def bucket_value(index):
+    """Representative duration (ns) of a bucket: the middle of its range."""
+    if index < SUB_BUCKETS:
+        return float(index)
+    shift, sub = divmod(index, SUB_BUCKETS)
+    low = (SUB_BUCKETS + sub) << (shift - 1)
+    return low + (1 << (shift - 1)) / 2
+
+
+class Histogram:
+    """Fixed-size log-scale histogram of durations in nanoseconds."""
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.total = 0
+        self.count = 0
+        self.max = 0
+
+    def add(self, ns):
+        self.counts[bucket_index(ns)] += 1
+        self.total += ns
+        self.count += 1
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q / 100 * self.count))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bucket_value(index), float(self.max))
+        return float(self.max)
+
+    def summary(self):
+        return {"count": self.count,
+                "mean_us": self.total / self.count / 1e3 if self.count else 0.0,
+                "p50_us": self.percentile(50) / 1e3,
+                "p95_us": self.percentile(95) / 1e3,
+                "p99_us": self.percentile(99) / 1e3,
+                "max_us": self.max / 1e3,
+                "total_s": self.total / 1e9}
+
+
+class PhaseTimer:
+    """Lap timer: each lap(name) records the time since the previous mark."""
+
+    def __init__(self, name="", output=None):
+        self.name = name
+        self.output = output
+        self.phases = {}
+        self.clock = time.perf_counter_ns
+        self.last = self.clock()
+
+    def start(self):
+        """Reset the mark without recording anything (e.g. at loop entry)."""
+        self.last = self.clock()
+
+    def lap(self, phase):
+        now = self.clock()
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = Histogram()
+        histogram.add(now - self.last)
+        self.last = now
+
+    def summary(self):
+        return {"name": self.name,
+                "phases": {phase: h.summary() for phase, h in self.phases.items()}}
+
+    def report(self):
+        """Print the per-phase table and, if an output path was given, dump JSON."""
+        summary = self.summary()
+        print(format_summaries([summary]))
+        if self.output:
+            data = dict(summary)
+            data["histograms"] = {phase: {str(i): n for i, n in enumerate(h.counts) if n}
+                                  for phase, h in self.phases.items()}
+            with open(self.output, "w") as f:
+                json.dump(data, f, indent=2)
+
+
+class NullTimer:
+    """Stand-in used when timing is off: every method is a no-op."""
+
+    def start(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def report(self):
+        pass
+
+
+def from_env(name):
+    """PhaseTimer if PHASE_TIMING is set (a JSON path, or 1 for print only), else NullTimer."""
+    setting = os.environ.get("PHASE_TIMING", "")
+    if not setting or setting == "0":
+        return NullTimer()
+    return PhaseTimer(name, None if setting == "1" else setting)
+
+
+def format_summaries(summaries):
+    lines = [f"{'run':14s} {'phase':10s} {'count':>8s} {'p50 us':>9s} {'p95 us':>9s} "
+             f"{'p99 us':>9s} {'max us':>9s} {'share':>6s}"]
+    for summary in summaries:
+        phases = summary["phases"]
+        total = sum(p["total_s"] for p in phases.values()) or 1.0
+        for phase, p in phases.items():
+            lines.append(f"{summary['name']:14s} {phase:10s} {p['count']:8d} {p['p50_us']:9.1f} "
+                         f"{p['p95_us']:9.1f} {p['p99_us']:9.1f} {p['max_us']:9.1f} "
+                         f"{p['total_s'] / total:6.1%}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare phase timing dumps")
+    parser.add_argument("paths", nargs="+", help="JSON files written with PHASE_TIMING=<path>")
+    args = parser.parse_args()
+    summaries = []
+    for path in args.paths:
+        with open(path) as f:
+            summaries.append(json.load(f))
+    print(format_summaries(summaries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Many-ball mode for gpt_4o's pymunk simulation.
+
+gpt_4o.py drops one ball into a kinematic hexagon body and leaves every
+solver setting at its default. This builds the same world with thousands of
+pymunk.Circle bodies and exposes the knobs that matter at that size:
+
+- threaded / threads: `pymunk.Space(threaded=True)` runs the solver on
+  `threads` worker threads (Chipmunk supports 1 or 2; not on Windows);
+- spatial hash: `space.use_spatial_hash(dim, count)` replaces the default
+  bounding-box tree with a grid sized to the balls, which suits many
+  equal-sized shapes;
+- iterations: solver iterations per step (pymunk default 10);
+- collision_slop: allowed overlap in px before the solver pushes shapes
+  apart (pymunk default 0.1); a little more slop keeps big piles stable
+  with fewer iterations.
+
+The benchmark steps each configuration headless and reports ms/step against
+the single-threaded default Space (default iterations and slop too), so the
+speedup on the current machine (and how many cores it actually has) is
+measured, not assumed.
+
+gpt_4o.py switches to this mode when GPT4O_BALLS is set:
+
+    GPT4O_BALLS=2000 GPT4O_THREADS=2 python gpt_4o.py
+
+Usage:
+    python pymunk_multiball.py --balls 1000 4000 --steps 200
+"""
+import argparse
+import math
+import os
+import time
+
+import pymunk
+
+from engines import DT, FPS, HEIGHT, WIDTH
+from multiball import lattice_balls
+
+
+def ball_radius_for(n, hex_radius, fill=0.3):
+    """Ball radius at which n balls cover `fill` of the hexagon's area."""
+    area = 1.5 * math.sqrt(3) * hex_radius ** 2
+    return math.sqrt(fill * area / (n * math.pi))
+
+
+def make_space(threaded=False, threads=2, iterations=10, collision_slop=0.1, gravity=980):
+    """A pymunk Space with the solver settings exposed."""
+    space = pymunk.Space(threaded=threaded)
+    if threaded:
+        space.threads = threads
+    space.iterations = iterations
+    space.collision_slop = collision_slop
+    space.gravity = (0, gravity)
+    return space
+
+
+def add_hexagon(space, center=(WIDTH // 2, HEIGHT // 2), radius=200, elasticity=0.9,
+                friction=0.5, thickness=5):
+    """gpt_4o's kinematic hexagon: six segments on one body."""
+    body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
+    body.position = center
+    space.add(body)
+    for i in range(6):
+        angle1 = math.radians(60 * i)
+        angle2 = math.radians(60 * (i + 1))
+        p1 = (math.cos(angle1) * radius, math.sin(angle1) * radius)
+        p2 = (math.cos(angle2) * radius, math.sin(angle2) * radius)
+        shape = pymunk.Segment(body, p1, p2, thickness)
+        shape.elasticity = elasticity
+        shape.friction = friction
+        space.add(shape)
+    return body
+
+
+def add_balls(space, n, ball_radius, hex_radius, center=(WIDTH // 2, HEIGHT // 2),
+              spatial_hash=True, elasticity=0.8, friction=0.4, speed=100.0, seed=0,
+              clear=()):
+    """
+    n non-overlapping balls inside the hexagon, clear of the circles (x, y,
+    radius) in `clear` (balls already in the space); returns their bodies.
+    """
+    if spatial_hash:
+        # Cell size about one ball; the docs suggest ~10 cells per shape.
+        space.use_spatial_hash(2 * ball_radius, 10 * n)
+    positions, velocities = lattice_balls(n, ball_radius, hex_radius, center, speed, seed,
+                                          clear)
+    moment = pymunk.moment_for_circle(1, 0, ball_radius)
+    bodies = []
+    for (x, y), (vx, vy) in zip(positions, velocities):
+        body = pymunk.Body(1, moment)
+        body.position = (float(x), float(y))
+        body.velocity = (float(vx), float(vy))
+        shape = pymunk.Circle(body, ball_radius)
+        shape.elasticity = elasticity
+        shape.friction = friction
+        space.add(body, shape)
+        bodies.append(body)
+    return bodies
+
+
+def settings_from_env():
+    """Many-ball settings for gpt_4o.py from GPT4O_* variables (balls 0 = off)."""
+    return {"balls": int(os.environ.get("GPT4O_BALLS", "0")),
+            "threads": int(os.environ.get("GPT4O_THREADS", "2")),
+            "spatial_hash": os.environ.get("GPT4O_SPATIAL_HASH", "1") != "0",
+            "iterations": int(os.environ.get("GPT4O_ITERATIONS", "10")),
+            "collision_slop": float(os.environ.get("GPT4O_SLOP", "0.1"))}
+
+
+CONFIGURATIONS = {
+    "default": dict(threaded=False, spatial_hash=False),
+    "spatial hash": dict(threaded=False, spatial_hash=True),
+    "threaded": dict(threaded=True, spatial_hash=False),
+    "threaded + hash": dict(threaded=True, spatial_hash=True),
+}
+
+
+def time_configuration(n, steps, threaded, spatial_hash, threads=2, iterations=10,
+                       collision_slop=0.1, hex_radius=200, rotation_speed=0.05, warmup=20,
+                       dt=DT):
+    """Seconds per step for one configuration, after `warmup` steps."""
+    space = make_space(threaded, threads, iterations, collision_slop)
+    hexagon = add_hexagon(space, radius=hex_radius)
+    add_balls(space, n, ball_radius_for(n, hex_radius), hex_radius,
+              spatial_hash=spatial_hash)
+
+    def step():
+        hexagon.angle += rotation_speed * FPS * dt
+        space.step(dt)
+
+    for _ in range(warmup):
+        step()
+    start = time.perf_counter()
+    for _ in range(steps):
+        step()
+    return (time.perf_counter() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pymunk many-ball throughput")
+    parser.add_argument("--balls", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--slop", type=float, default=0.1, help="collision slop, px")
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGURATIONS),
+                        choices=list(CONFIGURATIONS))
+    args = parser.parse_args()
+
+    print(f"cpus: {os.cpu_count()}, threads {args.threads}, iterations {args.iterations}, "
+          f"slop {args.slop:g}")
+    print(f"{'balls':>6}  {'configuration':16s} {'ms/step':>8}  {'balls*steps/s':>13}  "
+          f"{'vs default':>10}")
+    # The default Space is always timed first: it is the baseline.
+    names = ["default"] + [name for name in args.configs if name != "default"]
+    for n in args.balls:
+        baseline = None
+        for name in names:
+            settings = dict(threads=args.threads, iterations=args.iterations,
+                            collision_slop=args.slop)
+            if name == "default":
+                settings.update(iterations=10, collision_slop=0.1)
+            settings.update(CONFIGURATIONS[name])
+            per_step = time_configuration(n, args.steps, **settings)
+            if baseline is None:
+                baseline = per_step
+            print(f"{n:6,d}  {name:16s} {per_step * 1000:8.2f}  {n / per_step:13,.0f}  "
+                  f"{baseline / per_step:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
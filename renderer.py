@@ -0,0 +1,259 @@
+"""
+Dirty-rectangle renderer for one ball in one rotating polygon.
+
+The scripts clear and redraw the whole 800x600 window every frame and then
+flip all of it. This renderer touches only what changed:
+
+- the ball is a pre-rendered sprite, blitted instead of rasterized, and is
+  erased by filling its old rectangle with the background;
+- the container outline is a pre-rendered, run-length encoded sprite per
+  quantized angle. A regular n-gon looks the same every 2*pi/n, so the key
+  is the angle modulo that period, and one period of keys fits in a small
+  LRU cache, rendered when the renderer is made so no frame pays for a
+  miss. RLE sprites blit only their outline pixels, so drawing (and
+  erasing, with a background-colored twin) costs a fraction of a polygon
+  rasterization, and the encoded outline takes little memory;
+- `pygame.display.update(rects)` pushes only the old and new ball
+  rectangles, plus the outline's bounding box on frames where the
+  quantized angle changed.
+
+Usage:
+    python renderer.py --frames 2000
+"""
+import argparse
+import math
+import time
+from collections import OrderedDict
+
+import pygame
+
+WIDTH, HEIGHT = 800, 600
+
+
+def init_video():
+    """
+    Initialize the pygame modules a window needs: display (with events) and
+    font. pygame.init() would also open an audio device for the mixer, which
+    nothing here plays sound through.
+    """
+    pygame.display.init()
+    pygame.font.init()
+
+
+def ball_sprite(radius, color, background):
+    """A solid ball on a color-keyed square, ready to blit."""
+    size = 2 * radius + 1
+    # Any color that is neither the ball nor the background works as the key.
+    key = (255, 0, 255) if color != (255, 0, 255) and background != (255, 0, 255) else (0, 255, 0)
+    sprite = pygame.Surface((size, size)).convert()
+    sprite.fill(key)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    sprite.set_colorkey(key, pygame.RLEACCEL)
+    return sprite
+
+
+class HexagonCache:
+    """LRU cache of pre-rotated polygon outlines keyed by quantized angle."""
+
+    def __init__(self, radius, color, background, width=2, num_sides=6, phase=0.0,
+                 angle_step=math.radians(0.5), maxsize=256):
+        self.radius = radius
+        self.color = color
+        self.background = background
+        self.width = width
+        self.num_sides = num_sides
+        self.phase = phase
+        self.period = 2 * math.pi / num_sides
+        self.keys_per_period = max(1, round(self.period / angle_step))
+        self.angle_step = self.period / self.keys_per_period
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.size = int(math.ceil(2 * radius + 2 * width + 4))
+
+    def key(self, angle):
+        return round((angle % self.period) / self.angle_step) % self.keys_per_period
+
+    def warm(self):
+        """Render the outlines of one period of keys (as many as fit) ahead of use."""
+        for key in range(min(self.keys_per_period, self.maxsize)):
+            if key not in self.entries:
+                self.entries[key] = (key,) + self._render(key * self.angle_step)
+
+    def get(self, angle):
+        """(key, outline, eraser, bounds) for `angle`; bounds are sprite-relative."""
+        key = self.key(angle)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = (key,) + self._render(key * self.angle_step)
+        self.entries[key] = entry
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return entry
+
+    def _render(self, angle):
+        half = self.size / 2
+        start = angle + self.phase
+        points = [(half + self.radius * math.cos(start + self.period * i),
+                   half + self.radius * math.sin(start + self.period * i))
+                  for i in range(self.num_sides)]
+        sprites = []
+        for color in (self.color, self.background):
+            key = (255, 0, 255) if color != (255, 0, 255) else (0, 255, 0)
+            sprite = pygame.Surface((self.size, self.size)).convert()
+            sprite.fill(key)
+            pygame.draw.polygon(sprite, color, points, self.width)
+            if not sprites:
+                bounds = sprite.get_bounding_rect()
+            sprite.set_colorkey(key, pygame.RLEACCEL)
+            sprites.append(sprite)
+        return sprites[0], sprites[1], bounds
+
+
+class DirtyRectRenderer:
+    """Draws a ball in a rotating polygon and updates only the changed regions."""
+
+    def __init__(self, screen, center, hex_radius, ball_radius, hex_color, ball_color,
+                 background, hex_width=2, num_sides=6, phase=0.0,
+                 angle_step=math.radians(0.5), cache_size=256, prewarm=True, outlines=None):
+        self.screen = screen
+        self.center = center
+        self.ball_radius = int(ball_radius)
+        self.background = background
+        self.ball = ball_sprite(self.ball_radius, ball_color, background)
+        # Renderers of the same container (see export.py) can share one cache.
+        self.outlines = outlines or HexagonCache(hex_radius, hex_color, background, hex_width,
+                                                 num_sides, phase, angle_step, cache_size)
+        # A miss rasterizes two outlines mid-frame; pay for all of them up front.
+        if prewarm:
+            self.outlines.warm()
+        self.origin = (int(round(center[0] - self.outlines.size / 2)),
+                       int(round(center[1] - self.outlines.size / 2)))
+        self.ball_rect = None
+        self.outline = None
+        self.updated_pixels = 0
+
+    def invalidate(self):
+        """Redraw the whole window on the next frame (e.g. after it was exposed)."""
+        self.ball_rect = None
+        self.outline = None
+
+    def draw(self, angle, ball_x, ball_y, outline=True):
+        """
+        Draw one frame; returns the rectangles to pass to pygame.display.update.
+        With outline=False the container keeps its previous angle (a cheaper,
+        degraded frame, see frame_budget.py).
+        """
+        screen = self.screen
+        if outline or self.outline is None:
+            outline = self.outlines.get(angle)
+        else:
+            outline = self.outline
+        ball_rect = self.ball.get_rect(center=(int(ball_x), int(ball_y)))
+
+        if self.outline is None:
+            screen.fill(self.background)
+            dirty = [screen.get_rect()]
+        else:
+            screen.fill(self.background, self.ball_rect)
+            if self.ball_rect.colliderect(ball_rect):
+                dirty = [self.ball_rect.union(ball_rect)]
+            else:
+                dirty = [self.ball_rect, ball_rect]
+            if outline[0] != self.outline[0]:
+                screen.blit(self.outline[2], self.origin)
+                dirty.append(self.outline[3].union(outline[3]).move(self.origin))
+
+        # Always blit the outline: it is cheap, and it restores the pixels
+        # that erasing the ball may have cleared.
+        screen.blit(outline[1], self.origin)
+        screen.blit(self.ball, ball_rect)
+
+        self.outline = outline
+        self.ball_rect = ball_rect
+        area = screen.get_rect()
+        self.updated_pixels = sum(r.clip(area).width * r.clip(area).height for r in dirty)
+        return dirty
+
+
+def full_redraw(screen, center, hex_radius, ball_radius, angle, ball_x, ball_y,
+                hex_color, ball_color, background, hex_width=2, num_sides=6, phase=0.0):
+    """What the scripts do every frame: clear, rasterize, flip."""
+    screen.fill(background)
+    start = angle + phase
+    points = [(center[0] + hex_radius * math.cos(start + 2 * math.pi * i / num_sides),
+               center[1] + hex_radius * math.sin(start + 2 * math.pi * i / num_sides))
+              for i in range(num_sides)]
+    pygame.draw.polygon(screen, hex_color, points, hex_width)
+    pygame.draw.circle(screen, ball_color, (int(ball_x), int(ball_y)), ball_radius)
+    pygame.display.flip()
+
+
+def main():
+    from benchmark import percentile
+    from engines import ENGINES, make_engine
+    from trajectory import engine_geometry
+
+    parser = argparse.ArgumentParser(description="Compare full redraws with dirty rectangles")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--models", nargs="+", default=sorted(set(ENGINES) - {"gpt_4o"}))
+    parser.add_argument("--cold", action="store_true",
+                        help="do not pre-render the outlines; misses are paid mid-frame")
+    args = parser.parse_args()
+
+    init_video()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    colors = {"hex_color": (0, 200, 255), "ball_color": (255, 50, 50),
+              "background": (30, 30, 30)}
+    print(f"video driver: {pygame.display.get_driver()}")
+    print(f"{'model':14s} {'full p50':>9s} {'p95':>7s} {'p99':>7s}   {'dirty p50':>9s} "
+          f"{'p95':>7s} {'p99':>7s}   {'pixels':>7s}  {'cache hit':>9s}  {'warm-up':>8s}")
+
+    for name in args.models:
+        engine = make_engine(name)
+        geometry = engine_geometry(engine)
+        states = []
+        for _ in range(args.frames):
+            engine.step()
+            states.append(engine.state())
+        shape = dict(center=geometry["center"], hex_radius=geometry["hex_radius"],
+                     ball_radius=int(geometry["ball_radius"]),
+                     num_sides=geometry["num_sides"], phase=geometry["phase"], **colors)
+
+        full = []
+        for x, y, _, _, angle in states:
+            t0 = time.perf_counter_ns()
+            full_redraw(screen, angle=angle, ball_x=x, ball_y=y, **shape)
+            full.append(time.perf_counter_ns() - t0)
+
+        t0 = time.perf_counter()
+        renderer = DirtyRectRenderer(screen, prewarm=not args.cold, **shape)
+        warm_up = time.perf_counter() - t0
+        dirty = []
+        pixels = 0
+        for x, y, _, _, angle in states:
+            t0 = time.perf_counter_ns()
+            pygame.display.update(renderer.draw(angle, x, y))
+            dirty.append(time.perf_counter_ns() - t0)
+            pixels += renderer.updated_pixels
+
+        full.sort()
+        dirty.sort()
+        cache = renderer.outlines
+        print(f"{name:14s} {percentile(full, 50) / 1e3:7.0f}us {percentile(full, 95) / 1e3:5.0f}us"
+              f" {percentile(full, 99) / 1e3:5.0f}us"
+              f"   {percentile(dirty, 50) / 1e3:7.0f}us {percentile(dirty, 95) / 1e3:5.0f}us"
+              f" {percentile(dirty, 99) / 1e3:5.0f}us"
+              f"   {pixels / len(states) / (WIDTH * HEIGHT):6.1%}"
+              f"  {cache.hits / max(1, cache.hits + cache.misses):8.1%}"
+              f"  {warm_up * 1e3:6.1f}ms")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
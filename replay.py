@@ -0,0 +1,157 @@
+"""
+Seekable replay of a trajectory recorded with trajectory.py.
+
+Nothing is re-simulated: every frame reads the two recorded steps around the
+playback time from the memory-mapped file and draws the state between them,
+so seeking anywhere is O(1) and playback works at any speed, backwards too.
+
+Keys:
+    space           pause / resume
+    left / right    back / forward 1 s (1 step while paused; shift: 10 s)
+    up / down       double / halve the playback speed
+    r               reverse direction
+    [ / ]           previous / next wall contact (keyframe)
+    home / end      first / last step
+    mouse click     seek on the timeline
+    escape          quit
+
+Usage:
+    python replay.py run.traj --speed 0.25
+"""
+import argparse
+import math
+import sys
+
+import pygame
+
+from fixed_step import lerp
+from renderer import init_video
+from trajectory import FLAG_CONTACT, FLAG_OUTSIDE, Trajectory
+
+WIDTH, HEIGHT = 800, 600
+FPS = 60
+BACKGROUND = (20, 20, 20)
+HEX_COLOR = (0, 200, 255)
+BALL_COLOR = (255, 50, 50)
+CONTACT_COLOR = (255, 220, 60)
+OUTSIDE_COLOR = (160, 60, 255)
+TEXT_COLOR = (200, 200, 200)
+TIMELINE_Y = HEIGHT - 12
+
+
+def hexagon_points(geometry, angle):
+    cx, cy = geometry["center"]
+    radius = geometry["hex_radius"]
+    n = geometry["num_sides"]
+    start = angle + geometry["phase"]
+    return [(cx + radius * math.cos(start + 2 * math.pi * i / n),
+             cy + radius * math.sin(start + 2 * math.pi * i / n)) for i in range(n)]
+
+
+def interpolated_state(trajectory, position):
+    """Ball position, container angle and flags at a fractional step index."""
+    k = int(position)
+    x0, y0, _, _, a0, flags = trajectory.state(k)
+    if k + 1 >= len(trajectory):
+        return x0, y0, a0, flags
+    x1, y1, _, _, a1, _ = trajectory.state(k + 1)
+    alpha = position - k
+    # Engines that wrap their angle jump by a full turn; don't sweep across it.
+    if abs(a1 - a0) > math.pi:
+        a1 = a0
+    return lerp(x0, x1, alpha), lerp(y0, y1, alpha), lerp(a0, a1, alpha), flags
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded trajectory")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed, x real time")
+    parser.add_argument("--start", type=float, default=0.0, help="start time, simulated seconds")
+    args = parser.parse_args()
+
+    trajectory = Trajectory(args.path)
+    if len(trajectory) == 0:
+        sys.exit(f"{args.path} holds no steps")
+    last = len(trajectory) - 1
+    dt = trajectory.dt
+    geometry = trajectory.geometry
+    ball_radius = max(1, int(round(geometry["ball_radius"])))
+
+    init_video()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Replay: {trajectory.engine} ({args.path})")
+    font = pygame.font.SysFont(None, 22)
+    clock = pygame.time.Clock()
+
+    position = float(trajectory.step_at(args.start))
+    speed = args.speed
+    paused = False
+
+    running = True
+    while running:
+        frame_seconds = clock.tick(FPS) / 1000
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                jump = 10 if event.mod & pygame.KMOD_SHIFT else 1
+                jump_steps = 1 if paused else jump / dt
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    position += jump_steps
+                elif event.key == pygame.K_LEFT:
+                    position -= jump_steps
+                elif event.key == pygame.K_UP:
+                    speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    speed /= 2
+                elif event.key == pygame.K_r:
+                    speed = -speed
+                elif event.key == pygame.K_RIGHTBRACKET:
+                    k = trajectory.next_keyframe(int(position))
+                    if k is not None:
+                        position = float(k)
+                elif event.key == pygame.K_LEFTBRACKET:
+                    k = trajectory.previous_keyframe(int(position))
+                    if k is not None:
+                        position = float(k)
+                elif event.key == pygame.K_HOME:
+                    position = 0.0
+                elif event.key == pygame.K_END:
+                    position = float(last)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= TIMELINE_Y - 8:
+                position = event.pos[0] / WIDTH * last
+
+        if not paused:
+            position += speed * frame_seconds / dt
+        position = min(max(position, 0.0), float(last))
+
+        x, y, angle, flags = interpolated_state(trajectory, position)
+
+        screen.fill(BACKGROUND)
+        pygame.draw.polygon(screen, HEX_COLOR, hexagon_points(geometry, angle), 2)
+        color = BALL_COLOR
+        if flags & FLAG_OUTSIDE:
+            color = OUTSIDE_COLOR
+        elif flags & FLAG_CONTACT:
+            color = CONTACT_COLOR
+        pygame.draw.circle(screen, color, (int(x), int(y)), ball_radius)
+
+        pygame.draw.line(screen, TEXT_COLOR, (0, TIMELINE_Y), (WIDTH, TIMELINE_Y), 1)
+        marker = int(position / max(last, 1) * WIDTH)
+        pygame.draw.line(screen, BALL_COLOR, (marker, TIMELINE_Y - 6), (marker, TIMELINE_Y + 6), 3)
+        status = "paused" if paused else f"{speed:g}x"
+        text = (f"{trajectory.engine}  step {int(position):,d}/{last:,d}  "
+                f"t {position * dt:8.2f} s  {status}")
+        screen.blit(font.render(text, True, TEXT_COLOR), (10, 10))
+
+        pygame.display.flip()
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Rotating-frame collision solver for 3o-mini's physics.
+
+Instead of rebuilding the rotated polygon in world space every step, the
+ball is moved into the container's frame, where the edges never move:
+
+- edge directions, inward normals and half-plane offsets are computed once;
+- the rotation (cos, sin) is advanced by multiplying with a cached per-step
+  increment, so a step needs no trig calls and allocates no vectors;
+- an edge is only examined when the ball's signed distance to its line
+  (one dot product) is below the ball radius;
+- the wall's own motion enters through the contact velocity omega x r,
+  exactly as in the world-frame version, so no centrifugal or Coriolis
+  terms are needed for the free flight, which stays in world coordinates.
+
+The results match engines.ThreeOMini to rounding error; over long runs the
+two drift apart only as fast as the chaotic bouncing amplifies that error.
+
+Usage:
+    python rotating_frame.py --steps 20000
+"""
+import argparse
+import math
+
+from engines import DT, FPS, HEIGHT, INITIAL_POS, INITIAL_VEL, WIDTH, ThreeOMini
+
+# Re-normalize the incrementally rotated (cos, sin) pair this often.
+RENORMALIZE_EVERY = 1024
+
+
+class RotatingFrameEngine:
+    """3o-mini physics with collisions solved in the container's frame."""
+
+    name = "3o-mini (rotating frame)"
+
+    def __init__(self, restitution=0.9, wall_friction=0.98, hex_angular_velocity=0.5,
+                 gravity=500, air_friction=0.999, ball_radius=15, hex_radius=250,
+                 num_sides=6):
+        self.restitution = restitution
+        self.wall_friction = wall_friction
+        self.hex_angular_velocity = hex_angular_velocity
+        self.gravity = gravity
+        self.air_friction = air_friction
+        self.ball_radius = ball_radius
+        self.hex_radius = hex_radius
+        self.hex_cx, self.hex_cy = WIDTH // 2, HEIGHT // 2
+
+        # Static edge data in the container frame:
+        # (ax, ay, ux, uy, length, nx, ny, offset) with u the unit edge
+        # direction, n the inward normal and offset = n . a, so that
+        # n . p - offset is the distance of p from the edge line (positive inside).
+        vertices = []
+        for i in range(num_sides):
+            angle = 2 * math.pi * i / num_sides
+            vertices.append((hex_radius * math.cos(angle), hex_radius * math.sin(angle)))
+        self.edges = []
+        for i in range(num_sides):
+            ax, ay = vertices[i]
+            bx, by = vertices[(i + 1) % num_sides]
+            length = math.hypot(bx - ax, by - ay)
+            ux, uy = (bx - ax) / length, (by - ay) / length
+            nx, ny = -uy, ux
+            if nx * ax + ny * ay > 0:  # make the normal point at the center
+                nx, ny = -nx, -ny
+            self.edges.append((ax, ay, ux, uy, length, nx, ny, nx * ax + ny * ay))
+
+        self.reset((WIDTH // 2, HEIGHT // 2 - 100), (150, -50))
+
+    def reset(self, pos, vel):
+        self.x, self.y = float(pos[0]), float(pos[1])
+        self.vx, self.vy = float(vel[0]), float(vel[1])
+        self.hex_angle = 0.0
+        self.cos_a, self.sin_a = 1.0, 0.0
+        self._step_dt = None
+        self._steps = 0
+
+    def _advance_rotation(self, dt):
+        if dt != self._step_dt:
+            self._step_dt = dt
+            self._cos_d = math.cos(self.hex_angular_velocity * dt)
+            self._sin_d = math.sin(self.hex_angular_velocity * dt)
+            self._damping = self.air_friction ** (dt * FPS)
+        c, s = self.cos_a, self.sin_a
+        c, s = c * self._cos_d - s * self._sin_d, s * self._cos_d + c * self._sin_d
+        self._steps += 1
+        if self._steps % RENORMALIZE_EVERY == 0:
+            norm = math.sqrt(c * c + s * s)
+            c, s = c / norm, s / norm
+        self.cos_a, self.sin_a = c, s
+        self.hex_angle += self.hex_angular_velocity * dt
+
+    def step(self, dt=DT):
+        self._advance_rotation(dt)
+        self._free_flight(dt)
+        self._collide()
+
+    def _free_flight(self, dt):
+        """Gravity, air friction and motion in world coordinates, as in 3o-mini."""
+        self.vy += self.gravity * dt
+        self.vx *= self._damping
+        self.vy *= self._damping
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+
+    def to_local(self):
+        """Ball position and velocity in the container frame (rotated by -angle)."""
+        c, s = self.cos_a, self.sin_a
+        dx = self.x - self.hex_cx
+        dy = self.y - self.hex_cy
+        return (c * dx + s * dy, -s * dx + c * dy,
+                c * self.vx + s * self.vy, -s * self.vx + c * self.vy)
+
+    def outside(self):
+        """True if the ball's center has left the container."""
+        px, py, _, _ = self.to_local()
+        return any(nx * px + ny * py - offset < 0 for _, _, _, _, _, nx, ny, offset in self.edges)
+
+    def _candidate_edges(self, px, py, reach):
+        """Edges that may be within `reach` of the local point (px, py): all of them."""
+        return self.edges
+
+    def _collide(self, slop=0.0):
+        """
+        Resolve wall contacts in the container frame; True if anything was hit.
+        `slop` also counts a ball within that distance of a wall as touching.
+        """
+        c, s = self.cos_a, self.sin_a
+        px, py, vx, vy = self.to_local()
+
+        radius = self.ball_radius
+        reach = radius + slop
+        omega = self.hex_angular_velocity
+        hit = False
+        for ax, ay, ux, uy, length, nx, ny, offset in self._candidate_edges(px, py, reach):
+            # Half-plane test: far enough from this edge's line, nothing to do.
+            if nx * px + ny * py - offset >= reach:
+                continue
+
+            t = (px - ax) * ux + (py - ay) * uy
+            if t < 0:
+                t = 0.0
+            elif t > length:
+                t = length
+            qx = ax + t * ux
+            qy = ay + t * uy
+            diff_x = px - qx
+            diff_y = py - qy
+            dist = math.sqrt(diff_x * diff_x + diff_y * diff_y)
+            if dist >= reach:
+                continue
+            if dist != 0:
+                cnx, cny = diff_x / dist, diff_y / dist
+            else:
+                cnx, cny = nx, ny
+
+            # Wall velocity at the contact point: omega x r.
+            wall_vx = -omega * qy
+            wall_vy = omega * qx
+            rel_vx = vx - wall_vx
+            rel_vy = vy - wall_vy
+            dot = rel_vx * cnx + rel_vy * cny
+            if dot < 0:
+                vn_x = cnx * dot
+                vn_y = cny * dot
+                vx = -self.restitution * vn_x + (rel_vx - vn_x) * self.wall_friction + wall_vx
+                vy = -self.restitution * vn_y + (rel_vy - vn_y) * self.wall_friction + wall_vy
+                penetration = radius - dist
+                if penetration > 0:
+                    px += cnx * penetration
+                    py += cny * penetration
+                hit = True
+
+        if hit:
+            # Back to world coordinates (rotate by +angle).
+            self.x = c * px - s * py + self.hex_cx
+            self.y = s * px + c * py + self.hex_cy
+            self.vx = c * vx - s * vy
+            self.vy = s * vx + c * vy
+        return hit
+
+    def state(self):
+        return (self.x, self.y, self.vx, self.vy, self.hex_angle)
+
+
+def compare_with_world_frame(steps, dt=DT):
+    """Largest position and velocity difference against engines.ThreeOMini."""
+    world = ThreeOMini()
+    world.reset(INITIAL_POS, INITIAL_VEL)
+    local = RotatingFrameEngine()
+    local.reset(INITIAL_POS, INITIAL_VEL)
+    worst_pos = worst_vel = 0.0
+    for _ in range(steps):
+        world.step(dt)
+        local.step(dt)
+        a, b = world.state(), local.state()
+        worst_pos = max(worst_pos, abs(a[0] - b[0]), abs(a[1] - b[1]))
+        worst_vel = max(worst_vel, abs(a[2] - b[2]), abs(a[3] - b[3]))
+    return worst_pos, worst_vel
+
+
+def main():
+    from benchmark import percentile, time_steps
+
+    parser = argparse.ArgumentParser(description="Compare world-frame and rotating-frame solvers")
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--check-steps", type=int, default=600,
+                        help="steps over which the two solvers are compared")
+    args = parser.parse_args()
+
+    pos_err, vel_err = compare_with_world_frame(args.check_steps)
+    print(f"max difference over {args.check_steps} steps: "
+          f"{pos_err:.2e} px, {vel_err:.2e} px/s")
+
+    for engine in (ThreeOMini(), RotatingFrameEngine()):
+        engine.reset(INITIAL_POS, INITIAL_VEL)
+        timings = sorted(time_steps(engine, args.steps))
+        total = sum(timings) / 1e9
+        print(f"{engine.name:26s} {args.steps / total:10,.0f} steps/s  "
+              f"p50 {percentile(timings, 50) / 1000:6.2f} us  "
+              f"p99 {percentile(timings, 99) / 1000:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Batch runner: scenarios from a file, fanned out over a process pool.
+
+Instead of starting each script and watching it, list the runs in a
+scenario file (JSON) and let every core step them headless:
+
+    {
+      "defaults": {"steps": 72000, "rate": 240},
+      "scenarios": [
+        {"model": "o1"},
+        {"name": "bouncy", "model": "3o-mini", "params": {"restitution": 0.95},
+         "pos": [400, 150], "vel": [0, 0], "steps": 240000}
+      ]
+    }
+
+Keys per scenario (a bare list of scenarios works too):
+
+    model    one of engines.ENGINES (required)
+    name     label in the results, default <model>-<index>
+    pos/vel  initial conditions in px and px/s, default engines.INITIAL_POS/VEL
+    params   engine constructor arguments, in the script's own units
+    steps    physics steps to run
+    rate     physics steps per second, default 240 as in the scripts
+
+The file is checked before anything runs (a missing scenario list, unknown
+keys, models or engine arguments are reported with the scenario's index). Scenarios then go to a
+ProcessPoolExecutor with one worker per available core, longest first, so
+the pool drains evenly; workers import only engines.py (see startup.py), so
+starting them is cheap. As in record_engine, a worker collects state() per
+step in a list and reduces it one chunk at a time with NumPy, into:
+
+    x, y, vx, vy, angle        final state
+    bounces                    wall contacts, inferred from the velocity
+                               changes by trajectory.ContactDetector, seeded
+                               with the initial state as record_engine does
+    energy_start/end/min/max   mechanical energy per unit mass (px^2/s^2,
+                               height measured from the bottom of the screen)
+    energy_curve               its mean over CURVE_POINTS equal slices of the run
+    seconds, cpu_seconds       wall and CPU time of the scenario
+    worker                     pid of the process that ran it
+
+Results are written to one .npz file, one array per column in scenario
+file order (energy_curve is scenarios x CURVE_POINTS). Progress is printed
+to stderr as scenarios finish, and at the end a table per worker shows its
+busy and CPU time, with the pool's utilization (CPU time over workers x
+wall time) and its speedup over running the scenarios one after another
+(CPU time over wall time; busy time would count a worker waiting for a
+core as working).
+
+Usage:
+    python scenario_runner.py --example scenarios.json
+    python scenario_runner.py scenarios.json --out results.npz
+    python scenario_runner.py scenarios.json --scaling
+"""
+import argparse
+import inspect
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from engines import ENGINES, HEIGHT, INITIAL_POS, INITIAL_VEL, make_engine
+from trajectory import ContactDetector, engine_gravity, free_flight_dv
+
+PHYSICS_HZ = 240
+CURVE_POINTS = 32
+CHUNK = 4096
+FIELDS = {"name", "model", "pos", "vel", "params", "steps", "rate"}
+
+EXAMPLE = {
+    "defaults": {"steps": 60 * PHYSICS_HZ, "rate": PHYSICS_HZ},
+    "scenarios": [{"model": name} for name in ENGINES] + [
+        {"name": "3o-mini-bouncy", "model": "3o-mini", "params": {"restitution": 0.98}},
+        {"name": "o1-dropped", "model": "o1", "pos": [400, 300], "vel": [0, 0]},
+        {"name": "kimi-long", "model": "kimi", "steps": 600 * PHYSICS_HZ},
+    ],
+}
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def load_scenarios(path):
+    """Read and check a scenario file; returns a list of complete scenario dicts."""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"scenarios": data}
+    if not isinstance(data, dict) or not isinstance(data.get("scenarios"), list):
+        raise ValueError(f"{path}: expected a list of scenarios, or an object with a "
+                         '"scenarios" list')
+    defaults = data.get("defaults", {})
+    scenarios = []
+    for i, entry in enumerate(data["scenarios"]):
+        if not isinstance(entry, dict):
+            raise ValueError(f"scenario {i}: expected an object, got {entry!r}")
+        spec = {"pos": INITIAL_POS, "vel": INITIAL_VEL, "params": {},
+                "steps": 60 * PHYSICS_HZ, "rate": PHYSICS_HZ, **defaults, **entry}
+        unknown = set(spec) - FIELDS
+        if unknown:
+            raise ValueError(f"scenario {i}: unknown keys {sorted(unknown)}")
+        model = spec.get("model")
+        if model not in ENGINES:
+            raise ValueError(f"scenario {i}: model {model!r} is not one of {sorted(ENGINES)}")
+        try:
+            inspect.signature(ENGINES[model]).bind(**spec["params"])
+        except TypeError as e:
+            raise ValueError(f"scenario {i} ({model}): {e}") from None
+        spec.setdefault("name", f"{model}-{i}")
+        spec["steps"] = int(spec["steps"])
+        spec["pos"] = tuple(spec["pos"])
+        spec["vel"] = tuple(spec["vel"])
+        scenarios.append(spec)
+    return scenarios
+
+
+# ---------------------------
+# Worker
+# ---------------------------
+def run_scenario(spec, contact_threshold=1.0):
+    """Run one scenario to the end; returns its result row as a dict."""
+    started = time.time()
+    cpu = time.process_time()
+    engine = make_engine(spec["model"], spec["pos"], spec["vel"], **spec["params"])
+    step = engine.step
+    state = engine.state
+    dt = 1 / spec["rate"]
+    steps = spec["steps"]
+    gravity = engine_gravity(engine)
+
+    def energy(y, vx, vy):
+        return 0.5 * (vx * vx + vy * vy) + gravity * (HEIGHT - y)
+
+    _, y, vx, vy, _ = state()
+    e_start = e_min = e_max = energy(y, vx, vy)
+    curve = np.zeros(CURVE_POINTS)
+    bounces = 0
+    contacts = ContactDetector(contact_threshold)
+    contacts.seed((vx, vy), free_flight_dv(engine, vx, vy, dt))
+    for begin in range(0, steps, CHUNK):
+        m = min(CHUNK, steps - begin)
+        pending = []
+        for _ in range(m):
+            step(dt)
+            pending.append(state())
+        states = np.fromiter(itertools.chain.from_iterable(pending), np.float64,
+                             5 * m).reshape(m, 5)
+
+        e = energy(states[:, 1], states[:, 2], states[:, 3])
+        e_min = min(e_min, e.min())
+        e_max = max(e_max, e.max())
+        slices = np.arange(begin, begin + m) * CURVE_POINTS // steps
+        curve += np.bincount(slices, weights=e, minlength=CURVE_POINTS)
+
+        _, begins = contacts.update(states[:, 2:4])
+        bounces += int(np.count_nonzero(begins))
+
+    # Steps per slice; slices are empty only when steps < CURVE_POINTS.
+    edges = -(-np.arange(CURVE_POINTS + 1) * steps // CURVE_POINTS)
+    counts = np.diff(edges)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curve /= counts
+
+    x, y, vx, vy, angle = state()
+    return {
+        "name": spec["name"], "model": spec["model"], "steps": steps,
+        "x": x, "y": y, "vx": vx, "vy": vy, "angle": angle,
+        "bounces": bounces,
+        "energy_start": e_start, "energy_end": energy(y, vx, vy),
+        "energy_min": e_min, "energy_max": e_max, "energy_curve": curve,
+        "seconds": time.time() - started, "cpu_seconds": time.process_time() - cpu,
+        "worker": os.getpid(),
+    }
+
+
+# ---------------------------
+# Pool
+# ---------------------------
+def run_scenarios(scenarios, workers=None, log=sys.stderr):
+    """
+    Run every scenario on a pool of `workers` processes (default: one per
+    core). Returns (result rows in scenario order, wall seconds).
+    """
+    workers = workers or available_cores()
+    results = [None] * len(scenarios)
+    # Longest first: the last tasks to start are the short ones.
+    order = sorted(range(len(scenarios)), key=lambda i: -scenarios[i]["steps"])
+    start = time.time()
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {executor.submit(run_scenario, scenarios[i]): i for i in order}
+        for done, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            results[futures[future]] = row
+            if log:
+                print(f"[{done:{len(str(len(scenarios)))}d}/{len(scenarios)}] "
+                      f"{row['name']}: {row['steps']:,d} steps in {row['seconds']:.2f} s "
+                      f"(worker {row['worker']}), {time.time() - start:.1f} s elapsed",
+                      file=log, flush=True)
+    return results, time.time() - start
+
+
+def columns(results):
+    """Result rows to one array per column."""
+    return {key: np.array([row[key] for row in results]) for key in results[0]}
+
+
+def write_results(path, results):
+    np.savez_compressed(path, **columns(results))
+
+
+def utilization(results, wall, workers):
+    """(CPU seconds per worker pid, CPU / (workers * wall), CPU / wall)."""
+    cpu = {}
+    for row in results:
+        cpu[row["worker"]] = cpu.get(row["worker"], 0.0) + row["cpu_seconds"]
+    total = sum(cpu.values())
+    return cpu, total / (workers * wall), total / wall
+
+
+def report(results, wall, workers):
+    busy = {}
+    tasks = {}
+    for row in results:
+        busy[row["worker"]] = busy.get(row["worker"], 0.0) + row["seconds"]
+        tasks[row["worker"]] = tasks.get(row["worker"], 0) + 1
+    cpu, used, speedup = utilization(results, wall, workers)
+    print(f"{'worker':>8s} {'tasks':>6s} {'busy':>8s} {'cpu':>8s}")
+    for pid in sorted(busy):
+        print(f"{pid:8d} {tasks[pid]:6d} {busy[pid]:7.2f}s {cpu[pid]:7.2f}s")
+    steps = sum(row["steps"] for row in results)
+    print(f"{len(results)} scenarios, {steps:,d} steps in {wall:.2f} s on {workers} workers: "
+          f"utilization {used:.0%}, speedup {speedup:.2f}x over one process")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a scenario file on every core")
+    parser.add_argument("scenarios", nargs="?", help="scenario file (JSON)")
+    parser.add_argument("--out", default="results.npz", help="columnar results (.npz)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--scaling", action="store_true",
+                        help="rerun with 1, 2, 4, ... workers and report the speedup")
+    parser.add_argument("--example", metavar="PATH", help="write an example scenario file")
+    args = parser.parse_args()
+
+    if args.example:
+        with open(args.example, "w") as f:
+            json.dump(EXAMPLE, f, indent=2)
+        print(f"wrote {args.example}")
+        return
+    if not args.scenarios:
+        parser.error("give a scenario file (or --example PATH to write one)")
+
+    try:
+        scenarios = load_scenarios(args.scenarios)
+    except ValueError as e:
+        parser.error(str(e))
+    workers = args.workers or available_cores()
+    print(f"{len(scenarios)} scenarios, {workers} workers ({available_cores()} cores)")
+    results, wall = run_scenarios(scenarios, workers)
+    report(results, wall, workers)
+    write_results(args.out, results)
+    print(f"wrote {args.out}")
+
+    if args.scaling:
+        counts = sorted({min(2 ** k, workers) for k in range(workers.bit_length() + 1)})
+        print(f"{'workers':>8s} {'wall':>8s} {'speedup':>8s} {'efficiency':>10s}")
+        base = None
+        for n in counts:
+            _, elapsed = run_scenarios(scenarios, n, log=None)
+            base = base or elapsed
+            print(f"{n:8d} {elapsed:7.2f}s {base / elapsed:7.2f}x {base / elapsed / n:10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+"""
+Scenes of many independently spinning containers.
+
+Every script, and multiball.py, has exactly one hexagon. A scene holds any
+number of regular polygons, each with its own center, size, side count,
+angular velocity and ball population, and containers may be nested (a small
+spinning hexagon inside a large one, with balls in both).
+
+- ContainerRegistry keeps the containers as flat arrays (center, bounding
+  circle radius, apothem, sides, angle, angular velocity) and works out which
+  ones enclose which.
+- ContainerIndex is the broad phase: a uniform grid in which every container
+  is listed in the cells its bounding circle (plus the ball radius) covers.
+  A ball looks up its own cell and tests only the containers listed there,
+  then only those whose bounding circle it actually overlaps.
+- SceneWorld steps the balls. Each ball belongs to one container and is kept
+  inside it; any other container it overlaps is solid from the outside,
+  except those enclosing its own, which it cannot reach. The edge to test
+  comes from the ball's polar angle in the container's frame, as in ngon.py,
+  so a contact costs the same for any number of sides.
+
+The wall response is multiball.py's (o3_Mini_High's restitution and
+friction relative to the moving wall), and balls collide with each other
+through multiball's solver, restricted to balls of the same container so
+that none touch through a wall. Per-step cost therefore follows the number
+of containers near each ball, not the number of containers in the scene.
+
+Usage:
+    python scene.py --containers 10 100 1000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from engines import DT, FPS
+from multiball import MultiBallWorld
+from spatial_hash import SpatialHash
+
+
+class ContainerRegistry:
+    """Regular polygons spinning about fixed centers, stored as flat arrays."""
+
+    def __init__(self):
+        self._rows = []
+        self._arrays = None
+
+    def add(self, center, radius, num_sides=6, ang_vel=0.02 * FPS, rotation=0.0):
+        """Register a container; returns its id. `radius` is the circumradius."""
+        if num_sides < 3:
+            raise ValueError("a container needs at least 3 sides")
+        self._rows.append((float(center[0]), float(center[1]), float(radius),
+                           int(num_sides), float(ang_vel), float(rotation)))
+        self._arrays = None
+        return len(self._rows) - 1
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _build(self):
+        if not self._rows:
+            raise ValueError("the registry has no containers")
+        columns = np.array(self._rows, dtype=np.float64).T
+        self.cx, self.cy, self.radius, sides, self.ang_vel, self.rotation = columns
+        self.num_sides = sides.astype(np.int64)
+        self.sector = 2 * np.pi / self.num_sides
+        self.apothem = self.radius * np.cos(np.pi / self.num_sides)
+        self.parent = self._parents()
+        self._arrays = True
+
+    def arrays(self):
+        """Build the arrays after the last add(); later calls are free."""
+        if self._arrays is None:
+            self._build()
+        return self
+
+    def _parents(self):
+        """
+        Innermost container enclosing each one (-1 for none). A encloses B
+        when B's bounding circle lies within A's inscribed circle, so no
+        rotation of either brings their walls together.
+        """
+        dx = self.cx[:, None] - self.cx[None, :]
+        dy = self.cy[:, None] - self.cy[None, :]
+        # encloses[a, b]: a encloses b.
+        encloses = np.hypot(dx, dy) + self.radius[None, :] <= self.apothem[:, None]
+        np.fill_diagonal(encloses, False)
+        size = np.where(encloses, self.radius[:, None], np.inf)
+        parent = np.argmin(size, axis=0)
+        parent[~encloses.any(axis=0)] = -1
+        return parent
+
+    def encloses(self, outer, inner):
+        """Elementwise: is container `outer` an ancestor of container `inner`?"""
+        result = np.zeros(np.shape(inner), dtype=bool)
+        up = self.parent[inner]
+        while True:
+            live = up >= 0
+            if not live.any():
+                return result
+            result |= live & (up == outer)
+            up = np.where(live, self.parent[np.maximum(up, 0)], -1)
+
+    def rewind(self):
+        """Put every container back at the angle it was added with."""
+        self.arrays().rotation[:] = [row[5] for row in self._rows]
+
+    def advance(self, dt):
+        self.rotation += self.ang_vel * dt
+
+    def vertices(self, k):
+        """World-space vertices of container k, for drawing."""
+        cx, cy, radius = self.cx[k], self.cy[k], self.radius[k]
+        n = int(self.num_sides[k])
+        return [(cx + radius * math.cos(self.rotation[k] + i * 2 * math.pi / n),
+                 cy + radius * math.sin(self.rotation[k] + i * 2 * math.pi / n))
+                for i in range(n)]
+
+    def bounds(self, pad=0.0):
+        """Box (x0, y0, x1, y1) around every bounding circle, grown by pad."""
+        reach = self.radius + pad
+        return (float((self.cx - reach).min()), float((self.cy - reach).min()),
+                float((self.cx + reach).max()), float((self.cy + reach).max()))
+
+
+class ContainerIndex:
+    """
+    Uniform grid over the containers' bounding circles. A container is listed
+    in every cell its circle, grown by `pad`, can touch; the cells are kept
+    in one flat array (start/end offsets per cell).
+    """
+
+    def __init__(self, registry, pad=0.0, cell_size=None):
+        reg = registry.arrays()
+        self.pad = float(pad)
+        if cell_size is None:
+            # About one container per cell in a packed scene.
+            cell_size = 2 * float(np.median(reg.radius)) + 2 * self.pad
+        self.grid = SpatialHash(cell_size, reg.bounds(self.pad))
+        grid = self.grid
+
+        reach = reg.radius + self.pad
+        c0 = np.floor((reg.cx - reach - grid.x0) / grid.cell_size).astype(np.int64)
+        c1 = np.floor((reg.cx + reach - grid.x0) / grid.cell_size).astype(np.int64)
+        r0 = np.floor((reg.cy - reach - grid.y0) / grid.cell_size).astype(np.int64)
+        r1 = np.floor((reg.cy + reach - grid.y0) / grid.cell_size).astype(np.int64)
+        np.clip(c0, 0, grid.cols - 1, out=c0)
+        np.clip(c1, 0, grid.cols - 1, out=c1)
+        np.clip(r0, 0, grid.rows - 1, out=r0)
+        np.clip(r1, 0, grid.rows - 1, out=r1)
+
+        keys, owners = [], []
+        for k in range(len(reg)):
+            cols = np.arange(c0[k], c1[k] + 1)
+            rows = np.arange(r0[k], r1[k] + 1)
+            cells = (rows[:, None] * grid.cols + cols[None, :]).ravel()
+            keys.append(cells)
+            owners.append(np.full(cells.size, k))
+        keys = np.concatenate(keys)
+        owners = np.concatenate(owners)
+        order = np.argsort(keys, kind="stable")
+        self.items = owners[order]
+        cells = np.arange(grid.cols * grid.rows)
+        self.cell_start = np.searchsorted(keys[order], cells, side="left")
+        self.cell_end = np.searchsorted(keys[order], cells, side="right")
+        self.registry = reg
+
+    def candidates(self, x, y):
+        """
+        (ball, container) index pairs whose bounding circle, grown by pad,
+        contains the ball's center.
+        """
+        keys = self.grid.cell_keys(x, y)
+        start = self.cell_start[keys]
+        counts = self.cell_end[keys] - start
+        ball = np.repeat(np.arange(len(keys)), counts)
+        run_start = np.repeat(np.cumsum(counts) - counts, counts)
+        slot = np.arange(ball.size) - run_start + np.repeat(start, counts)
+        return overlapping(self.registry, x, y, ball, self.items[slot], self.pad)
+
+
+def deepest_per_ball(ball, depth):
+    """Indices of the deepest contact of each ball among (ball[k], depth[k])."""
+    order = np.lexsort((-depth, ball))
+    first = np.ones(order.size, dtype=bool)
+    first[1:] = ball[order][1:] != ball[order][:-1]
+    return order[first]
+
+
+def overlapping(reg, x, y, ball, container, pad):
+    """The (ball, container) pairs where the ball is within radius + pad of the center."""
+    dx = x[ball] - reg.cx[container]
+    dy = y[ball] - reg.cy[container]
+    reach = reg.radius[container] + pad
+    near = dx * dx + dy * dy < reach * reach
+    return ball[near], container[near]
+
+
+class SceneWorld(MultiBallWorld):
+    """Equal balls in a registry of spinning containers; ball i lives in homes[i]."""
+
+    def __init__(self, registry, homes, cull=True, **kwargs):
+        homes = np.asarray(homes, dtype=np.int64)
+        self.registry = registry.arrays()
+        if homes.size and (homes.min() < 0 or homes.max() >= len(self.registry)):
+            raise ValueError("every ball needs a home container")
+        kwargs.setdefault("hex_ang_vel", 0.0)
+        super().__init__(len(homes), **kwargs)
+        self.homes = homes
+        self.cull = cull
+        reg = self.registry
+        self.index = ContainerIndex(reg, pad=self.ball_radius)
+        self.grid = SpatialHash(2 * self.ball_radius * self.separation_reach,
+                                reg.bounds(2 * self.ball_radius))
+        # Balls closer than this to their home's center touch none of its walls.
+        self._home_inner_sq = np.maximum(reg.apothem - self.ball_radius, 0.0) ** 2
+        self.tested = 0
+
+    def reset(self, pos, vel):
+        super().reset(pos, vel)
+        self.registry.rewind()
+
+    def substep(self, dt):
+        self.registry.advance(dt)
+
+        self.vy += self.gravity * dt
+        damping = self.air_friction ** (dt * FPS)
+        self.vx *= damping
+        self.vy *= damping
+        # Same order as MultiBallWorld.substep.
+        if self.ball_collisions:
+            self.ball_ball_collisions(dt)
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.wall_collisions()
+        if self.ball_collisions:
+            self.separate_balls()
+
+    def candidate_pairs(self):
+        ci, cj = super().candidate_pairs()
+        same = self.homes[ci] == self.homes[cj]
+        return ci[same], cj[same]
+
+    # ---------------------------
+    # Walls
+    # ---------------------------
+    def wall_pairs(self, margin=0.0):
+        """(ball, container) pairs that can be within `margin` of touching this step."""
+        reg = self.registry
+        if self.cull:
+            ball, container = self.index.candidates(self.x, self.y)
+        else:
+            ball = np.repeat(np.arange(self.n), len(reg))
+            container = np.tile(np.arange(len(reg)), self.n)
+            ball, container = overlapping(reg, self.x, self.y, ball, container,
+                                          self.ball_radius)
+        # Other containers, except those enclosing the home, which are out of reach.
+        home = self.homes[ball]
+        other = (container != home) & ~reg.encloses(container, home)
+        ball, container = ball[other], container[other]
+        # The home container is always tested, so a ball the crowd has pushed
+        # out of its bounding circle is still brought back; only balls deep
+        # inside it are skipped.
+        homes = self.homes
+        dx = self.x - reg.cx[homes]
+        dy = self.y - reg.cy[homes]
+        inner_sq = self._home_inner_sq[homes]
+        if margin:
+            inner_sq = np.maximum(np.sqrt(inner_sq) - margin, 0.0) ** 2
+        near = np.flatnonzero(dx * dx + dy * dy > inner_sq)
+        self.tested = ball.size + self.n
+        return np.concatenate((near, ball)), np.concatenate((homes[near], container))
+
+    def wall_collisions(self):
+        ball, container = self.wall_pairs()
+        if ball.size == 0:
+            return
+        inside = container == self.homes[ball]
+        for _ in range(self.collision_iterations):
+            hit, depth, nx, ny, qx, qy = self.wall_contacts(ball, container, inside)
+            if hit.size == 0:
+                break
+            pick = deepest_per_ball(ball[hit], depth)
+            self.resolve(ball[hit][pick], container[hit][pick], depth[pick],
+                         nx[pick], ny[pick], qx[pick], qy[pick])
+            # Only balls that collided this pass can collide on the next.
+            again = np.isin(ball, ball[hit][pick])
+            ball, container, inside = ball[again], container[again], inside[again]
+
+    def touching_walls(self, margin):
+        """
+        As MultiBallWorld.touching_walls: the deepest contact of each (ball,
+        container) pair less than `margin` from touching, as (ball, nx, ny,
+        gap, wall_vx, wall_vy).
+        """
+        tested = self.tested
+        ball, container = self.wall_pairs(margin)
+        self.tested = tested
+        hit, depth, nx, ny, qx, qy = self.wall_contacts(ball, container,
+                                                        container == self.homes[ball], margin)
+        omega = self.registry.ang_vel[container[hit]]
+        return ball[hit], nx, ny, -depth, -omega * qy, omega * qx
+
+    def keep_inside(self):
+        """Move each ball (positions only) out of its deepest wall contact."""
+        tested = self.tested
+        ball, container = self.wall_pairs()
+        self.tested = tested
+        if ball.size == 0:
+            return
+        hit, depth, nx, ny, _, _ = self.wall_contacts(ball, container,
+                                                      container == self.homes[ball])
+        pick = deepest_per_ball(ball[hit], depth)
+        ball = ball[hit][pick]
+        self.x[ball] += nx[pick] * depth[pick]
+        self.y[ball] += ny[pick] * depth[pick]
+
+    def wall_contacts(self, ball, container, inside, margin=0.0):
+        """
+        Contacts of each (ball, container) pair, solved in the container's
+        frame. Returns (hit, depth, nx, ny, qx, qy): indices of the pairs
+        touching (or less than `margin` from it), their penetration, world
+        normal pushing the ball free, and the contact point relative to the
+        container center.
+        """
+        reg = self.registry
+        radius = self.ball_radius
+        cos = np.cos(reg.rotation[container])
+        sin = np.sin(reg.rotation[container])
+        dx = self.x[ball] - reg.cx[container]
+        dy = self.y[ball] - reg.cy[container]
+        lx = cos * dx + sin * dy
+        ly = cos * dy - sin * dx
+        sides = reg.num_sides[container]
+        sector = reg.sector[container]
+        apothem = reg.apothem[container]
+        edge = np.floor(np.arctan2(ly, lx) / sector).astype(np.int64) % sides
+
+        # Kept inside: the sector edge and its neighbours, as half-planes.
+        depth = np.full(ball.size, -np.inf)
+        nx = np.zeros(ball.size)
+        ny = np.zeros(ball.size)
+        for offset in (-1, 0, 1):
+            angle = ((edge + offset) % sides + 0.5) * sector
+            ux = np.cos(angle)
+            uy = np.sin(angle)
+            d = radius - (apothem - (lx * ux + ly * uy))
+            deeper = inside & (d > depth)
+            depth = np.where(deeper, d, depth)
+            nx = np.where(deeper, -ux, nx)
+            ny = np.where(deeper, -uy, ny)
+
+        # Kept outside: the closest point of the sector edge, whose endpoints
+        # cover the corners.
+        out = ~inside
+        if out.any():
+            angle = (edge[out] + 0.5) * sector[out]
+            ux, uy = np.cos(angle), np.sin(angle)
+            ox, oy = lx[out], ly[out]
+            a = edge[out] * sector[out]
+            circum = reg.radius[container[out]]
+            ax, ay = circum * np.cos(a), circum * np.sin(a)
+            ex = circum * np.cos(a + sector[out]) - ax
+            ey = circum * np.sin(a + sector[out]) - ay
+            t = np.clip(((ox - ax) * ex + (oy - ay) * ey) / (ex * ex + ey * ey), 0.0, 1.0)
+            gx = ox - (ax + t * ex)
+            gy = oy - (ay + t * ey)
+            dist = np.hypot(gx, gy)
+            within = ox * ux + oy * uy < apothem[out]
+            safe = np.where(dist > 0, dist, 1.0)
+            depth[out] = np.where(within, radius + apothem[out] - (ox * ux + oy * uy),
+                                  radius - dist)
+            nx[out] = np.where(within, ux, gx / safe)
+            ny[out] = np.where(within, uy, gy / safe)
+
+        hit = np.flatnonzero(depth > -margin)
+        depth = depth[hit]
+        lnx, lny = nx[hit], ny[hit]
+        # Contact point: the ball's center moved back to its surface, then out by depth.
+        qlx = lx[hit] - lnx * (radius - depth)
+        qly = ly[hit] - lny * (radius - depth)
+        cos, sin = cos[hit], sin[hit]
+        return (hit, depth, cos * lnx - sin * lny, sin * lnx + cos * lny,
+                cos * qlx - sin * qly, sin * qlx + cos * qly)
+
+    def resolve(self, ball, container, depth, nx, ny, qx, qy):
+        """Push each ball out along n and bounce it off the moving wall."""
+        omega = self.registry.ang_vel[container]
+        self.x[ball] += nx * depth
+        self.y[ball] += ny * depth
+        wall_vx = -omega * qy
+        wall_vy = omega * qx
+        rel_vx = self.vx[ball] - wall_vx
+        rel_vy = self.vy[ball] - wall_vy
+        rn = rel_vx * nx + rel_vy * ny
+        approaching = rn < 0
+        tx = rel_vx - rn * nx
+        ty = rel_vy - rn * ny
+        keep = 1 - self.friction_coeff
+        self.vx[ball] = np.where(approaching, wall_vx - self.restitution * rn * nx + keep * tx,
+                                 self.vx[ball])
+        self.vy[ball] = np.where(approaching, wall_vy - self.restitution * rn * ny + keep * ty,
+                                 self.vy[ball])
+
+    def escaped(self):
+        """Number of balls whose center is outside their home container."""
+        reg = self.registry
+        home = self.homes
+        cos, sin = np.cos(reg.rotation[home]), np.sin(reg.rotation[home])
+        dx = self.x - reg.cx[home]
+        dy = self.y - reg.cy[home]
+        lx = cos * dx + sin * dy
+        ly = cos * dy - sin * dx
+        sector = reg.sector[home]
+        edge = np.floor(np.arctan2(ly, lx) / sector)
+        angle = (edge + 0.5) * sector
+        return int(np.count_nonzero(lx * np.cos(angle) + ly * np.sin(angle) > reg.apothem[home]))
+
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+def grid_scene(count, balls_per, ball_radius=4.0, container_radius=60.0, seed=0):
+    """
+    `count` containers on a square grid, with random side counts and spins;
+    every other one has a smaller container nested at its center. Balls are
+    spread over the free space of each container.
+    """
+    rng = np.random.default_rng(seed)
+    registry = ContainerRegistry()
+    spacing = 2.2 * container_radius
+    columns = math.ceil(math.sqrt(count))
+    placed = []
+    for k in range(count):
+        center = ((k % columns + 0.5) * spacing, (k // columns + 0.5) * spacing)
+        outer = registry.add(center, container_radius, int(rng.integers(3, 9)),
+                             rng.uniform(-2.0, 2.0), rng.uniform(0, 2 * math.pi))
+        if k % 2:
+            inner_radius = 0.35 * container_radius
+            inner = registry.add(center, inner_radius, int(rng.integers(3, 9)),
+                                 rng.uniform(-4.0, 4.0))
+            placed.append((outer, center, inner_radius, container_radius, balls_per))
+            placed.append((inner, center, 0.0, inner_radius, balls_per // 4))
+        else:
+            placed.append((outer, center, 0.0, container_radius, balls_per))
+
+    reg = registry.arrays()
+    homes, positions = [], []
+    spacing = 2.1 * ball_radius
+    for k, center, hole, circum, n in placed:
+        # Lattice points inside the inscribed circle and clear of a nested container.
+        limit = circum * math.cos(math.pi / reg.num_sides[k]) - ball_radius
+        ticks = np.arange(-limit, limit + spacing, spacing)
+        gx, gy = np.meshgrid(ticks, ticks)
+        dist_sq = gx * gx + gy * gy
+        free = (dist_sq <= limit * limit) & (dist_sq >= (hole + 2 * ball_radius) ** 2)
+        gx, gy = gx[free], gy[free]
+        pick = rng.choice(len(gx), min(n, len(gx)), replace=False)
+        positions.append(np.column_stack((center[0] + gx[pick], center[1] + gy[pick])))
+        homes.append(np.full(pick.size, k))
+    positions = np.concatenate(positions)
+    velocities = rng.normal(0.0, 100.0, size=positions.shape)
+    return registry, np.concatenate(homes), positions, velocities
+
+
+def time_scene(world, pos, vel, steps, warmup=20):
+    world.reset(pos, vel)
+    for _ in range(warmup):
+        world.step()
+    start = time.perf_counter()
+    for _ in range(steps):
+        world.step()
+    return (time.perf_counter() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-step cost of scenes with many containers")
+    parser.add_argument("--containers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--balls-per", type=int, default=40, help="balls per outer container")
+    parser.add_argument("--radius", type=float, default=4.0, help="ball radius, px")
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--brute-max", type=int, default=300,
+                        help="largest count also timed testing every container")
+    args = parser.parse_args()
+
+    print("culled: containers from the grid index; all: every container tested per ball")
+    print(f"{'containers':>10s} {'balls':>7s} {'culled':>10s} {'us/ball':>8s} {'all':>10s} "
+          f"{'speedup':>8s} {'tested/ball':>11s} {'escaped':>8s}")
+    for count in args.containers:
+        registry, homes, pos, vel = grid_scene(count, args.balls_per, args.radius)
+        world = SceneWorld(registry, homes, ball_radius=args.radius)
+        culled = time_scene(world, pos, vel, args.steps)
+        tested = world.tested / world.n
+        escaped = world.escaped()
+        line = (f"{len(registry):10,d} {world.n:7,d} {culled * 1000:8.2f}ms "
+                f"{culled / world.n * 1e6:8.2f}")
+        if count <= args.brute_max:
+            brute = SceneWorld(registry, homes, cull=False, ball_radius=args.radius)
+            every = time_scene(brute, pos, vel, args.steps)
+            line += f" {every * 1000:8.2f}ms {every / culled:7.1f}x"
+        else:
+            line += f" {'':10s} {'':8s}"
+        print(f"{line} {tested:11.2f} {escaped:8d}")
+
+
+if __name__ == "__main__":
+    main()
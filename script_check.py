@@ -0,0 +1,154 @@
+"""
+Check that each script's physics step matches its port in engines.py.
+
+The scripts keep their own physics (it is the model's code) and engines.py
+keeps a headless copy of it for the batch tools, so the two can drift. This
+tool runs every script for real, in a child process with the dummy video
+driver, and records the ball state at each physics step through the
+telemetry hook the scripts already call (telemetry.from_env is replaced by
+a recorder, nothing else is patched). The engine of the same name is then
+stepped from the script's initial conditions with the script's step size,
+and the two trajectories are compared step by step. The bounces column
+counts the wall contacts in the run (as trajectory.py infers them), so a
+match is known to cover the collision code and not only free flight.
+
+The scripts pace themselves with the wall clock, so recording --steps steps
+takes steps / 240 seconds; the scripts run in parallel. A script matches
+when its largest position and velocity differences stay below --tolerance
+(px and px/s); the exit status is 1 if any script does not.
+
+Usage:
+    python script_check.py
+    python script_check.py --models o1 kimi --steps 2400
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from engines import ENGINES, HEIGHT, WIDTH, make_engine
+from trajectory import ContactDetector, free_flight_dv
+
+# Initial conditions of each script: ball position in px, velocity in px/s.
+SCRIPTS = {
+    "3o-mini": ((WIDTH // 2, HEIGHT // 2 - 100), (150.0, -50.0)),
+    "deepseek": ((WIDTH // 2, HEIGHT // 2), (100.0, 0.0)),
+    "gemini": ((WIDTH // 2, HEIGHT // 4), (300.0, 0.0)),
+    "gpt_4o": ((WIDTH // 2, HEIGHT // 4), (0.0, 0.0)),
+    "kimi": ((WIDTH // 2, HEIGHT // 2 - 150), (0.0, 0.0)),
+    "o1": ((WIDTH // 2, HEIGHT // 2 - 100), (120.0, 0.0)),
+    "o3_Mini_High": ((WIDTH / 2, HEIGHT / 2), (240.0, -420.0)),
+}
+
+CHILD = """
+import json, runpy, sys
+import telemetry
+
+path, steps = sys.argv[1], int(sys.argv[2])
+states = []
+config = {}
+
+
+class Recorded(BaseException):
+    pass
+
+
+class Recorder(telemetry.NullTelemetry):
+    def __init__(self, velocity_scale=1.0, step_hz=240, **kwargs):
+        self.scale = velocity_scale
+        config["step_hz"] = step_hz
+
+    def step(self, x, y, vx, vy):
+        states.append((x, y, vx * self.scale, vy * self.scale))
+        if len(states) == steps:
+            raise Recorded
+
+
+telemetry.from_env = lambda name, gravity, **kwargs: Recorder(**kwargs)
+try:
+    runpy.run_path(path, run_name="__main__")
+except Recorded:
+    pass
+print(json.dumps({"step_hz": config.get("step_hz"), "states": states}))
+"""
+
+
+def start_script(name, steps):
+    """Launch the script `name` under the recorder; returns the child process."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    env.pop("TELEMETRY", None)
+    env.pop("PHASE_TIMING", None)
+    return subprocess.Popen([sys.executable, "-c", CHILD, f"{name}.py", str(steps)], cwd=here,
+                            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def script_states(process):
+    """(step_hz, states as an (n, 4) array) from a finished child."""
+    out, err = process.communicate()
+    if process.returncode:
+        raise RuntimeError(err.strip().splitlines()[-1] if err.strip() else "script failed")
+    result = json.loads(out.strip().splitlines()[-1])
+    return result["step_hz"], np.array(result["states"], dtype=np.float64).reshape(-1, 4)
+
+
+def engine_states(name, steps, dt):
+    """
+    The engine's (x, y, vx, vy) after each of `steps` steps from the
+    script's start, and the number of wall contacts among them.
+    """
+    pos, vel = SCRIPTS[name]
+    engine = make_engine(name, pos, vel)
+    contacts = ContactDetector()
+    _, _, vx, vy, _ = engine.state()
+    contacts.seed((vx, vy), free_flight_dv(engine, vx, vy, dt))
+    states = np.empty((steps, 4))
+    for i in range(steps):
+        engine.step(dt)
+        states[i] = engine.state()[:4]
+    _, begins = contacts.update(states[:, 2:])
+    return states, int(np.count_nonzero(begins))
+
+
+def compare(script, engine, tolerance):
+    """(largest position difference, largest velocity difference, first step off or None)."""
+    position = np.hypot(*(script[:, :2] - engine[:, :2]).T)
+    velocity = np.hypot(*(script[:, 2:] - engine[:, 2:]).T)
+    off = np.flatnonzero((position > tolerance) | (velocity > tolerance))
+    return position.max(), velocity.max(), int(off[0]) + 1 if off.size else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the scripts against engines.py")
+    parser.add_argument("--models", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES))
+    parser.add_argument("--steps", type=int, default=720, help="physics steps per script")
+    parser.add_argument("--tolerance", type=float, default=1e-6,
+                        help="largest difference allowed, px and px/s")
+    args = parser.parse_args()
+
+    children = {name: start_script(name, args.steps) for name in args.models}
+    print(f"{'model':14s} {'steps':>6s} {'rate':>5s} {'bounces':>8s} {'max |dx| px':>12s} "
+          f"{'max |dv| px/s':>14s}  result")
+    failed = False
+    for name, child in children.items():
+        try:
+            rate, recorded = script_states(child)
+        except RuntimeError as e:
+            print(f"{name:14s} script did not run: {e}")
+            failed = True
+            continue
+        expected, bounces = engine_states(name, len(recorded), 1 / rate)
+        dx, dv, first = compare(recorded, expected, args.tolerance)
+        result = "match" if first is None else f"differs from step {first}"
+        failed |= first is not None or len(recorded) < args.steps
+        print(f"{name:14s} {len(recorded):6d} {rate:5d} {bounces:8d} {dx:12.3g} {dv:14.3g}  "
+              f"{result}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
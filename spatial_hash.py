@@ -0,0 +1,90 @@
+"""
+Uniform-grid spatial hash for finding nearby balls without testing all pairs.
+
+Balls are bucketed by the grid cell holding their center; two balls can only
+touch if their cells are neighbours, so the candidate pairs come from each
+cell and four of its neighbours (right, lower-left, below, lower-right; the
+other four are covered from the opposite side). Cost is proportional to the
+number of balls times the local density, not to N^2.
+
+The bucket order is kept between steps: balls rarely change cell from one
+step to the next, so re-sorting the previous order is close to linear.
+"""
+import numpy as np
+
+
+class SpatialHash:
+    """Grid of `cell_size` cells covering the box (x0, y0)-(x1, y1)."""
+
+    def __init__(self, cell_size, bounds):
+        x0, y0, x1, y1 = bounds
+        self.cell_size = float(cell_size)
+        self.x0, self.y0 = float(x0), float(y0)
+        self.cols = max(1, int(np.ceil((x1 - x0) / cell_size)))
+        self.rows = max(1, int(np.ceil((y1 - y0) / cell_size)))
+        # Key offsets of the half neighbourhood: same cell is handled separately.
+        self.neighbour_offsets = (1, self.cols - 1, self.cols, self.cols + 1)
+        self.order = None
+
+    def cell_keys(self, x, y):
+        """Linear cell index of every ball (balls outside the box use the border cells)."""
+        cx = ((x - self.x0) / self.cell_size).astype(np.int64)
+        cy = ((y - self.y0) / self.cell_size).astype(np.int64)
+        np.clip(cx, 0, self.cols - 1, out=cx)
+        np.clip(cy, 0, self.rows - 1, out=cy)
+        return cy * self.cols + cx
+
+    def rebuild(self, x, y):
+        """Re-bucket the balls; returns (order, sorted_keys)."""
+        keys = self.cell_keys(x, y)
+        if self.order is None or len(self.order) != len(keys):
+            self.order = np.argsort(keys, kind="stable")
+        else:
+            # Previous order is almost sorted already.
+            self.order = self.order[np.argsort(keys[self.order], kind="stable")]
+        return self.order, keys[self.order]
+
+    def candidate_pairs(self, x, y):
+        """Index arrays (i, j) of every pair of balls in the same or adjacent cells."""
+        order, sorted_keys = self.rebuild(x, y)
+        positions = np.arange(len(order))
+        cell_end = np.searchsorted(sorted_keys, sorted_keys, side="right")
+
+        first = [_expand(positions + 1, cell_end, positions)]
+        for offset in self.neighbour_offsets:
+            target = sorted_keys + offset
+            start = np.searchsorted(sorted_keys, target, side="left")
+            end = np.searchsorted(sorted_keys, target, side="right")
+            first.append(_expand(start, end, positions))
+
+        a = np.concatenate([p[0] for p in first])
+        b = np.concatenate([p[1] for p in first])
+        return order[a], order[b]
+
+    def pairs_within(self, x, y, distance):
+        """
+        Pairs closer than `distance`, as (i, j, dx, dy, dist_sq) with
+        (dx, dy) pointing from ball i to ball j.
+        """
+        i, j = self.candidate_pairs(x, y)
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        dist_sq = dx * dx + dy * dy
+        close = np.flatnonzero(dist_sq < distance * distance)
+        return i[close], j[close], dx[close], dy[close], dist_sq[close]
+
+
+def _expand(starts, ends, owners):
+    """
+    For every owner k, list the positions starts[k] .. ends[k]-1.
+    Returns (owner_positions, member_positions), both flat.
+    """
+    counts = np.maximum(ends - starts, 0)
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    owner = np.repeat(owners, counts)
+    run_start = np.repeat(np.cumsum(counts) - counts, counts)
+    member = np.arange(total) - run_start + np.repeat(starts, counts)
+    return owner, member
@@ -0,0 +1,106 @@
+"""
+Startup time and memory of a process that steps the physics.
+
+engines.py is the physics core: it imports neither pygame nor pymunk (the
+Vector2 arithmetic of 3o-mini and o3_Mini_High comes from vec2.py, gpt_4o
+imports pymunk when its engine is built) and opens no window, so a batch
+worker pays only for what it steps. The window is a separate, later cost:
+renderer.init_video() initializes the display and font modules, and never
+the audio device that pygame.init() opens. The scripts still open their
+window when they start and keep their own copy of the physics;
+script_check.py checks that each one steps exactly like its engine.
+
+Each variant below runs in a fresh interpreter. The child times its own
+imports and setup and reports its peak RSS; the parent times the whole
+process from launch to exit, which is what a worker pool pays per worker.
+Medians over --runs, after one warm-up run per variant so bytecode is cached.
+
+Usage:
+    python startup.py
+    python startup.py --runs 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = """
+import resource, sys, time
+t0 = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t0
+loaded = [m for m in ("numpy", "pygame", "pymunk") if m in sys.modules]
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ",".join(loaded) or "-")
+"""
+
+VARIANTS = {
+    "interpreter only": "pass",
+    "core, 3o-mini": (
+        "import engines\n"
+        "engines.make_engine('3o-mini').step()"),
+    "core, gpt_4o (pymunk)": (
+        "import engines\n"
+        "engines.make_engine('gpt_4o').step()"),
+    "core + pygame.math (before)": (
+        "import pygame.math\n"
+        "import engines\n"
+        "engines.make_engine('3o-mini').step()"),
+    "core + renderer": (
+        "import engines, pygame\n"
+        "from renderer import DirtyRectRenderer, init_video\n"
+        "engine = engines.make_engine('3o-mini')\n"
+        "engine.step()\n"
+        "init_video()\n"
+        "screen = pygame.display.set_mode((engines.WIDTH, engines.HEIGHT))\n"
+        "renderer = DirtyRectRenderer(screen, (400, 300), 250, 15, (0, 200, 255),\n"
+        "                             (255, 50, 50), (30, 30, 30))\n"
+        "x, y, _, _, angle = engine.state()\n"
+        "pygame.display.update(renderer.draw(angle, x, y))"),
+}
+
+
+def child_env():
+    env = dict(os.environ)
+    # Measure with cached bytecode, as an installed copy would run.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    return env
+
+
+def measure(code, runs, env):
+    """Medians of (process seconds, in-process import + setup seconds) and peak RSS in KiB."""
+    script = CHILD.format(code=code)
+    here = os.path.dirname(os.path.abspath(__file__))
+    totals, setups, rss = [], [], []
+    loaded = "-"
+    for i in range(runs + 1):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", script], cwd=here, env=env, check=True,
+                             capture_output=True, text=True).stdout
+        total = time.perf_counter() - t0
+        setup, maxrss, loaded = out.split()
+        if i:   # the first run only warms the bytecode and page caches
+            totals.append(total)
+            setups.append(float(setup))
+            rss.append(int(maxrss))
+    return statistics.median(totals), statistics.median(setups), max(rss), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time and RSS of the physics core")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = child_env()
+    print(f"{'variant':28s} {'process':>9s} {'imports':>9s} {'RSS':>8s}  loaded")
+    for name, code in VARIANTS.items():
+        total, setup, rss, loaded = measure(code, args.runs, env)
+        print(f"{name:28s} {total * 1000:7.1f}ms {setup * 1000:7.1f}ms "
+              f"{rss / 1024:6.1f}MB  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
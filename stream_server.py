@@ -0,0 +1,356 @@
+"""
+Headless simulation host that streams ball state to remote viewers over TCP.
+
+The server steps one engine from engines.py on an asyncio event loop (at a
+fixed physics rate, paced to real time) and sends every connected client a
+small binary frame per display tick. The stream starts with one JSON header
+line (engine, container geometry, frame rate, quantization), then frames:
+
+    key frame    B type=0, I step, i x, i y, H angle          15 bytes
+    delta frame  B type=1, B dstep, h dx, h dy, h dangle       8 bytes
+
+Positions are quantized to 1/POS_SCALE px and the angle to 1/65536 turn.
+A delta frame holds the difference from the last frame *sent to that
+client*, so frames skipped for one client never corrupt its stream; a key
+frame is sent first and whenever a difference does not fit.
+
+Backpressure: the simulation never waits for a client. Before writing, the
+server looks at the client's transport buffer; if it holds more than
+`max_buffer` bytes, the frame is dropped for that client only and counted.
+
+The benchmark runs the host unthrottled against 1, 10 and 100 local
+stand-in clients that decode every frame (one of them reading slowly, as
+over a bad link), and reports frames/s, bytes per frame, drops for the fast
+and slow clients, and decode errors (a client whose stream does not end on
+exactly the server's last state).
+
+Usage:
+    python stream_server.py serve --model o1 --port 8765
+    python stream_viewer.py --host compute-box --port 8765
+    python stream_server.py bench --clients 1 10 100 --seconds 3
+"""
+import argparse
+import asyncio
+import json
+import math
+import socket
+import struct
+import time
+
+from engines import ENGINES, make_engine
+from fixed_step import FixedStepLoop
+from trajectory import engine_geometry
+
+MAGIC = "hexagon-stream"
+VERSION = 1
+POS_SCALE = 16                     # 1/16 px
+ANGLE_SCALE = 65536 / (2 * math.pi)
+KEY = struct.Struct("<BIiiH")
+DELTA = struct.Struct("<BBhhh")
+KEY_FRAME, DELTA_FRAME = 0, 1
+
+
+def quantize(state):
+    """(x, y, angle) of an engine state as integers on the wire."""
+    x, y, _, _, angle = state
+    return (int(round(x * POS_SCALE)), int(round(y * POS_SCALE)),
+            int(round(angle * ANGLE_SCALE)) & 0xFFFF)
+
+
+def _fits(value):
+    return -32768 <= value <= 32767
+
+
+class FrameEncoder:
+    """Per-client encoder: deltas against the last frame sent to that client."""
+
+    def __init__(self):
+        self.last = None
+
+    def encode(self, step, x, y, angle):
+        last = self.last
+        self.last = (step, x, y, angle)
+        if last is not None:
+            dstep = step - last[0]
+            dx = x - last[1]
+            dy = y - last[2]
+            # The angle wraps; send the shortest signed difference.
+            dangle = (angle - last[3] + 32768) % 65536 - 32768
+            if 0 < dstep < 256 and _fits(dx) and _fits(dy):
+                return DELTA.pack(DELTA_FRAME, dstep, dx, dy, dangle)
+        return KEY.pack(KEY_FRAME, step, x, y, angle)
+
+
+class FrameDecoder:
+    """Incremental decoder: feed it bytes, get back (step, x, y, angle) tuples in px/rad."""
+
+    def __init__(self, pos_scale=POS_SCALE):
+        self.pos_scale = pos_scale
+        self.buffer = b""
+        self.last = None
+        self.frames = 0
+
+    def feed(self, data):
+        buffer = self.buffer + data if self.buffer else data
+        states = []
+        offset = 0
+        end = len(buffer)
+        last = self.last
+        while offset < end:
+            kind = buffer[offset]
+            if kind == DELTA_FRAME:
+                if end - offset < DELTA.size:
+                    break
+                _, dstep, dx, dy, dangle = DELTA.unpack_from(buffer, offset)
+                offset += DELTA.size
+                last = (last[0] + dstep, last[1] + dx, last[2] + dy, (last[3] + dangle) & 0xFFFF)
+            elif kind == KEY_FRAME:
+                if end - offset < KEY.size:
+                    break
+                last = KEY.unpack_from(buffer, offset)[1:]
+                offset += KEY.size
+            else:
+                raise ValueError(f"bad frame type {kind}")
+            states.append(last)
+        self.buffer = buffer[offset:]
+        self.last = last
+        self.frames += len(states)
+        scale = self.pos_scale
+        return [(step, x / scale, y / scale, angle / ANGLE_SCALE)
+                for step, x, y, angle in states]
+
+
+class Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.transport = writer.transport
+        self.peer = writer.get_extra_info("peername")
+        self.encoder = FrameEncoder()
+        self.sent = 0
+        self.dropped = 0
+        self.bytes = 0
+
+
+class StateServer:
+    """Steps an engine and broadcasts its state to every connected client."""
+
+    def __init__(self, engine, physics_hz=240, fps=60, max_buffer=4096):
+        self.engine = engine
+        self.physics_hz = physics_hz
+        self.fps = fps
+        self.max_buffer = max_buffer
+        self.clients = set()
+        self.steps = 0
+        self.frames = 0
+        self.history = None      # step -> quantized state, kept only when checking
+        header = {"magic": MAGIC, "version": VERSION, "engine": engine.name,
+                  "geometry": engine_geometry(engine), "fps": fps, "pos_scale": POS_SCALE}
+        self.header = (json.dumps(header) + "\n").encode()
+
+    async def handle(self, reader, writer):
+        # Keep the kernel's send buffer small too, so a stalled viewer shows
+        # up in the transport buffer (and gets frames dropped) quickly
+        # instead of queueing seconds of stale frames in the socket.
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.max_buffer)
+        client = Client(writer)
+        writer.write(self.header)
+        self.clients.add(client)
+        try:
+            # Viewers send nothing; this only waits for the connection to close.
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def broadcast(self):
+        x, y, angle = quantize(self.engine.state())
+        step = self.steps
+        if self.history is not None:
+            self.history[step] = (x, y, angle)
+        max_buffer = self.max_buffer
+        for client in self.clients:
+            if client.transport.get_write_buffer_size() > max_buffer:
+                client.dropped += 1
+                continue
+            data = client.encoder.encode(step, x, y, angle)
+            client.writer.write(data)
+            client.sent += 1
+            client.bytes += len(data)
+        self.frames += 1
+
+    def advance(self, steps):
+        dt = 1 / self.physics_hz
+        step = self.engine.step
+        for _ in range(steps):
+            step(dt)
+        self.steps += steps
+
+    async def run(self, seconds=None, realtime=True):
+        """Simulate and broadcast until `seconds` of wall time have passed (or forever).
+
+        Unthrottled (realtime=False), each frame advances one display
+        frame's worth of physics as fast as the loop allows, yielding to the
+        clients in between.
+        """
+        per_frame = max(1, round(self.physics_hz / self.fps))
+        loop = FixedStepLoop(self.physics_hz)
+        start = time.perf_counter()
+        frame_time = 1 / self.fps
+        while seconds is None or time.perf_counter() - start < seconds:
+            steps = loop.advance() if realtime else per_frame
+            if steps:
+                self.advance(steps)
+                self.broadcast()
+            if realtime:
+                await asyncio.sleep(max(0.0, frame_time - (time.perf_counter() - loop.last_time)))
+            else:
+                await asyncio.sleep(0)
+
+
+async def read_header(reader):
+    header = json.loads(await reader.readline())
+    if header.get("magic") != MAGIC:
+        raise ValueError("not a hexagon state stream")
+    return header
+
+
+async def stand_in_client(host, port, ready, results, delay=0.0):
+    """Connect, decode every frame until the server closes, record what arrived.
+
+    A client with a `delay` sleeps that long after every small read, like a
+    viewer on a slow link, so the server's buffer for it fills up.
+    """
+    if delay:
+        # Small socket and stream buffers, so the backlog stays on the server side.
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (host, port))
+        reader, writer = await asyncio.open_connection(sock=sock, limit=1024)
+        chunk = 256
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+        chunk = 65536
+    name = writer.get_extra_info("sockname")
+    header = await read_header(reader)
+    ready.release()
+    decoder = FrameDecoder(header["pos_scale"])
+    while True:
+        data = await reader.read(chunk)
+        if not data:
+            break
+        decoder.feed(data)
+        if delay:
+            await asyncio.sleep(delay)
+    writer.close()
+    results[name] = (decoder, delay)
+
+
+async def bench_clients(model, clients, seconds, max_buffer, slow=0, slow_delay=0.05):
+    server = StateServer(make_engine(model), max_buffer=max_buffer)
+    server.history = {}
+    tcp = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = tcp.sockets[0].getsockname()[1]
+    ready = asyncio.Semaphore(0)
+    results = {}
+    slow = min(slow, clients - 1)   # a lone client is always a fast one
+    delays = [0.0] * (clients - slow) + [slow_delay] * slow
+    tasks = [asyncio.create_task(stand_in_client("127.0.0.1", port, ready, results, delay))
+             for delay in delays]
+    for _ in range(clients):
+        await ready.acquire()
+    while len(server.clients) < clients:
+        await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await server.run(seconds, realtime=False)
+    elapsed = time.perf_counter() - start
+    stats = list(server.clients)
+    for client in stats:
+        client.writer.close()
+    tcp.close()
+    await asyncio.gather(*tasks)
+    await tcp.wait_closed()
+
+    def drop_rate(group):
+        sent = sum(c.sent for c in group)
+        dropped = sum(c.dropped for c in group)
+        return dropped / (sent + dropped) if sent + dropped else 0.0
+
+    decoders = [results[c.peer][0] for c in stats]
+    fast = [c for c in stats if not results[c.peer][1]]
+    sent = sum(c.sent for c in stats)
+    wire = sum(c.bytes for c in stats)
+    # Every client's last decoded frame must match what the server quantized.
+    errors = sum(1 for c, d in zip(stats, decoders)
+                 if d.last is None or server.history[d.last[0]] != d.last[1:]
+                 or d.frames != c.sent)
+    return {"clients": clients, "slow": slow, "frames_per_s": server.frames / elapsed,
+            "steps_per_s": server.steps / elapsed,
+            "delivered_per_s": sum(d.frames for d in decoders) / elapsed,
+            "bytes_per_frame": wire / sent if sent else 0.0,
+            "megabytes_per_s": wire / elapsed / 1e6,
+            "dropped_fast": drop_rate(fast),
+            "dropped_slow": drop_rate([c for c in stats if c not in fast]),
+            "errors": errors}
+
+
+def bench(model, client_counts, seconds, max_buffer, slow=0):
+    print(f"{model}, unthrottled for {seconds:g} s per run, max buffer {max_buffer:,d} B, "
+          f"{slow} slow client(s) per run")
+    print(f"{'clients':>7}  {'frames/s':>9}  {'steps/s':>9}  {'delivered/s':>11}  "
+          f"{'B/frame':>7}  {'MB/s':>6}  {'drop fast':>9}  {'drop slow':>9}  {'errors':>6}")
+    for n in client_counts:
+        r = asyncio.run(bench_clients(model, n, seconds, max_buffer, slow))
+        drop_slow = f"{r['dropped_slow']:9.1%}" if r["slow"] else f"{'-':>9}"
+        print(f"{r['clients']:7d}  {r['frames_per_s']:9,.0f}  {r['steps_per_s']:9,.0f}  "
+              f"{r['delivered_per_s']:11,.0f}  {r['bytes_per_frame']:7.2f}  "
+              f"{r['megabytes_per_s']:6.2f}  {r['dropped_fast']:9.1%}  {drop_slow}  "
+              f"{r['errors']:6d}")
+
+
+async def serve(model, host, port, fps, physics_hz, max_buffer):
+    server = StateServer(make_engine(model), physics_hz, fps, max_buffer)
+    tcp = await asyncio.start_server(server.handle, host, port)
+    print(f"streaming {model} on {', '.join(str(s.getsockname()) for s in tcp.sockets)}")
+    async with tcp:
+        await server.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a headless simulation to viewers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="run the simulation host")
+    p.add_argument("--model", choices=sorted(ENGINES), default="o1")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--fps", type=int, default=60, help="frames sent per second")
+    p.add_argument("--physics-hz", type=int, default=240)
+    p.add_argument("--max-buffer", type=int, default=4096,
+                   help="per-client bytes queued before frames are dropped")
+    p = sub.add_parser("bench", help="throughput with local stand-in clients")
+    p.add_argument("--model", choices=sorted(ENGINES), default="o1")
+    p.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    p.add_argument("--seconds", type=float, default=3.0)
+    p.add_argument("--max-buffer", type=int, default=4096)
+    p.add_argument("--slow", type=int, default=1,
+                   help="clients per run that read slowly, to exercise frame dropping")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.model, args.host, args.port, args.fps, args.physics_hz,
+                              args.max_buffer))
+        except KeyboardInterrupt:
+            pass
+    else:
+        bench(args.model, args.clients, args.seconds, args.max_buffer, args.slow)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Viewer for a simulation streamed by stream_server.py.
+
+Connects over TCP, reads the JSON header for the container geometry, then
+decodes frames as they arrive and draws the latest one with the
+dirty-rectangle renderer. The socket is non-blocking and drained once per
+display frame, so a burst of frames never delays drawing; only the newest
+state is shown.
+
+Usage:
+    python stream_server.py serve --model o1
+    python stream_viewer.py --host localhost --port 8765
+"""
+import argparse
+import json
+import socket
+
+import pygame
+
+from renderer import DirtyRectRenderer, init_video
+from replay import BACKGROUND, BALL_COLOR, HEIGHT, HEX_COLOR, TEXT_COLOR, WIDTH
+from stream_server import MAGIC, FrameDecoder
+
+FPS = 60
+
+
+def connect(host, port):
+    """Open the stream and read its header; returns (socket, header, leftover bytes)."""
+    sock = socket.create_connection((host, port))
+    data = b""
+    while b"\n" not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("stream closed before its header")
+        data += chunk
+    line, _, rest = data.partition(b"\n")
+    header = json.loads(line)
+    if header.get("magic") != MAGIC:
+        raise ValueError("not a hexagon state stream")
+    sock.setblocking(False)
+    return sock, header, rest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a streamed simulation")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    sock, header, rest = connect(args.host, args.port)
+    decoder = FrameDecoder(header["pos_scale"])
+    geometry = header["geometry"]
+
+    init_video()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Stream: {header['engine']} ({args.host}:{args.port})")
+    clock = pygame.time.Clock()
+    renderer = DirtyRectRenderer(screen, geometry["center"], geometry["hex_radius"],
+                                 max(1, int(round(geometry["ball_radius"]))), HEX_COLOR,
+                                 BALL_COLOR, BACKGROUND, num_sides=geometry["num_sides"],
+                                 phase=geometry["phase"])
+    font = pygame.font.SysFont(None, 22)
+
+    latest = None
+    states = decoder.feed(rest)
+    connected = True
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+
+        # Drain whatever arrived since the last frame.
+        while connected:
+            try:
+                data = sock.recv(65536)
+            except BlockingIOError:
+                break
+            if not data:
+                connected = False
+                break
+            states = decoder.feed(data) or states
+        if states:
+            latest = states[-1]
+            states = []
+
+        if latest is not None:
+            step, x, y, angle = latest
+            dirty = renderer.draw(angle, x, y)
+            label = font.render(f"{header['engine']}  step {step:>12,d}  "
+                                f"{'' if connected else 'disconnected'}", True, TEXT_COLOR,
+                                BACKGROUND)
+            dirty.append(screen.blit(label, (10, 10)))
+            pygame.display.update(dirty)
+        clock.tick(FPS)
+
+    sock.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Batched parameter sweep over restitution, wall friction and angular velocity.
+
+Every configuration gets its own lane (one ball, one container angle) in a
+single VectorEngine, so the whole grid is simulated together instead of one
+window at a time. The collision model is 3o-mini's; the other scripts'
+parameters map onto it as follows:
+
+    deepseek.py      RESTITUTION -> restitution, 1 - FRICTION -> wall_friction,
+                     ANGULAR_VELOCITY -> hex_angular_velocity
+    o3_Mini_High.py  RESTITUTION -> restitution, 1 - FRICTION_COEFF -> wall_friction,
+                     HEX_ANG_VEL * 60 -> hex_angular_velocity (it is per frame)
+
+Per configuration the sweep reports:
+
+    bounces       wall hits faster than --rest-speed (normal component)
+    time_to_rest  time of the last such hit, NaN if the ball was still
+                  bouncing during the final --settle-window seconds
+    energy_loss   1 - E_end / E_start, with E = v^2 / 2 + g * height above
+                  the container's lowest point (per unit mass)
+
+Usage:
+    python sweep.py --restitution 0.5:1:20 --wall-friction 0.8:1:20 --omega 0:3:25
+    python sweep.py --configs configs.csv --out results.csv
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from engines import DT, INITIAL_POS, INITIAL_VEL
+from vector_engine import VectorEngine
+
+PARAMETERS = ("restitution", "wall_friction", "hex_angular_velocity")
+
+
+def grid(restitution, wall_friction, hex_angular_velocity):
+    """Cartesian product of the three value lists, as a (K, 3) array."""
+    return np.array(list(itertools.product(restitution, wall_friction, hex_angular_velocity)),
+                    dtype=np.float64).reshape(-1, 3)
+
+
+def mechanical_energy(engine):
+    """Kinetic plus potential energy per unit mass for every lane."""
+    lowest_y = engine.hex_center[1] + engine.hex_radius
+    speed_sq = engine.vx * engine.vx + engine.vy * engine.vy
+    return 0.5 * speed_sq + engine.gravity * (lowest_y - engine.y)
+
+
+def run_sweep(configs, seconds=20.0, dt=DT, rest_speed=20.0, settle_window=2.0,
+              pos=INITIAL_POS, vel=INITIAL_VEL, **engine_params):
+    """
+    Simulate every (restitution, wall_friction, hex_angular_velocity) row of
+    `configs` in one batch and return a dict of per-configuration columns.
+    """
+    configs = np.asarray(configs, dtype=np.float64).reshape(-1, 3)
+    k = len(configs)
+    engine = VectorEngine(k, restitution=configs[:, 0], wall_friction=configs[:, 1],
+                          hex_angular_velocity=configs[:, 2], **engine_params)
+    engine.reset(pos, vel)
+
+    steps = int(round(seconds / dt))
+    e_start = mechanical_energy(engine)
+    bounces = np.zeros(k, dtype=np.int64)
+    last_hit = np.full(k, -1, dtype=np.int64)
+    for n in range(steps):
+        engine.step(dt)
+        hard = engine.impact_speed > rest_speed
+        bounces += hard
+        last_hit[hard] = n
+
+    e_end = mechanical_energy(engine)
+    time_to_rest = (last_hit + 1) * dt
+    still_bouncing = last_hit >= steps - int(round(settle_window / dt))
+    time_to_rest[still_bouncing] = np.nan
+
+    return {
+        "restitution": configs[:, 0],
+        "wall_friction": configs[:, 1],
+        "hex_angular_velocity": configs[:, 2],
+        "time_to_rest": time_to_rest,
+        "bounces": bounces,
+        "energy_loss": 1 - e_end / e_start,
+    }
+
+
+def parse_values(spec):
+    """'0.5,0.8,0.9' -> listed values; '0.5:1:11' -> numpy.linspace(0.5, 1, 11)."""
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return list(np.linspace(float(start), float(stop), int(num)))
+    return [float(v) for v in spec.split(",")]
+
+
+def write_csv(path, results):
+    columns = list(results)
+    table = np.column_stack([results[c] for c in columns])
+    np.savetxt(path, table, delimiter=",", header=",".join(columns), comments="", fmt="%.6g")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched 3o-mini parameter sweep")
+    parser.add_argument("--restitution", default="0.5:1:20")
+    parser.add_argument("--wall-friction", default="0.8:1:20")
+    parser.add_argument("--omega", default="0:3:25", help="hex angular velocity, rad/s")
+    parser.add_argument("--configs", help="CSV of restitution,wall_friction,omega rows "
+                                          "(replaces the grid options)")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--rest-speed", type=float, default=20.0)
+    parser.add_argument("--settle-window", type=float, default=2.0)
+    parser.add_argument("--out", help="write per-configuration results to this CSV")
+    args = parser.parse_args()
+
+    if args.configs:
+        configs = np.loadtxt(args.configs, delimiter=",", ndmin=2)
+    else:
+        configs = grid(parse_values(args.restitution), parse_values(args.wall_friction),
+                       parse_values(args.omega))
+
+    start = time.perf_counter()
+    results = run_sweep(configs, seconds=args.seconds, rest_speed=args.rest_speed,
+                        settle_window=args.settle_window)
+    elapsed = time.perf_counter() - start
+    print(f"{len(configs):,} configurations x {args.seconds:g} s simulated in {elapsed:.2f} s")
+
+    rested = ~np.isnan(results["time_to_rest"])
+    print(f"came to rest: {rested.sum():,} / {len(configs):,}")
+    if rested.any():
+        print(f"time to rest: median {np.median(results['time_to_rest'][rested]):.2f} s")
+    print(f"bounces: median {np.median(results['bounces']):.0f}, "
+          f"max {results['bounces'].max()}")
+    print(f"energy loss: median {np.median(results['energy_loss']):.3f}")
+
+    if args.out:
+        write_csv(args.out, results)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Live telemetry overlay for the scripts' windows.
+
+Printing from the main loop costs more than the physics it reports on, so
+the scripts hand their numbers to a `Telemetry` object instead:
+
+- every physics step writes speed, kinetic and potential energy (per unit
+  mass, in px and s) and a contact flag into a fixed-size NumPy ring buffer.
+  That is a few scalar stores into preallocated arrays, with nothing appended
+  or allocated on the NumPy side. Contacts are inferred the same way
+  trajectory.py does it: the velocity change differs from the previous
+  step's by more than gravity and drag explain. The test starts from the
+  initial velocity and a free-flight velocity change, so the first step is
+  not a contact;
+- every frame, drawn, degraded or skipped, records its frame time into a
+  second ring buffer (frame()); full frames also blit the overlay (draw()),
+  a cached surface holding one sparkline per channel over the last
+  HISTORY_SECONDS;
+- that surface is only redrawn REFRESH_HZ times a second, and one row per
+  frame, so no single frame pays for the whole refresh. The ring buffers
+  are averaged down to one point per pixel column with np.add.reduceat.
+
+The overlay measures its own cost (every step(), draw() and frame() call
+in a frame), shows the running mean in its title line and prints mean, p50, p99
+and max per frame at exit.
+
+The overlay is off unless TELEMETRY is set in the environment, and then
+`hud` is a NullTelemetry whose methods do nothing, as with phase_timer.py:
+
+    TELEMETRY=1 python o1.py
+"""
+import os
+import time
+
+import numpy as np
+import pygame
+
+from phase_timer import Histogram
+
+HISTORY_SECONDS = 10
+REFRESH_HZ = 4
+GRAPH_WIDTH = 150
+ROW_HEIGHT = 20
+LABEL_WIDTH = 120
+MARGIN = 10
+
+BOX_COLOR = (20, 20, 28)
+TITLE_COLOR = (200, 200, 200)
+ROWS = (
+    # label, format, color
+    ("speed", "{:8,.0f} px/s", (120, 200, 255)),
+    ("kinetic", "{:8.2e}", (255, 170, 80)),
+    ("potential", "{:8.2e}", (140, 230, 120)),
+    ("contacts", "{:6.1f} /s", (255, 100, 100)),
+    ("frame", "{:6.2f} ms", (210, 210, 90)),
+)
+
+
+class RingBuffer:
+    """The last `capacity` samples of `channels` values, in one preallocated array."""
+
+    def __init__(self, capacity, channels=1):
+        self.capacity = capacity
+        self.data = np.zeros((channels, capacity))
+        self.index = 0      # slot written next
+        self.count = 0
+
+    def advance(self):
+        """Commit the samples written at `index`."""
+        self.index += 1
+        if self.index == self.capacity:
+            self.index = 0
+        if self.count < self.capacity:
+            self.count += 1
+
+    def history(self, channel):
+        """The channel's samples, oldest first (a copy)."""
+        if self.count < self.capacity:
+            return self.data[channel, :self.count].copy()
+        return np.concatenate((self.data[channel, self.index:], self.data[channel, :self.index]))
+
+
+def binned(values, width):
+    """Mean of `values` over at most `width` equal bins."""
+    bins = min(width, len(values))
+    edges = np.linspace(0, len(values), bins + 1).astype(np.intp)
+    return np.add.reduceat(values, edges[:-1]) / np.diff(edges)
+
+
+class Telemetry:
+    """Ring-buffered physics and frame statistics with a cached sparkline overlay."""
+
+    def __init__(self, name, gravity, velocity_scale=1.0, step_hz=240, frame_hz=60,
+                 floor_y=600, contact_threshold=1.0, history=HISTORY_SECONDS,
+                 refresh_hz=REFRESH_HZ, velocity=(0.0, 0.0)):
+        self.name = name
+        self.gravity = gravity
+        self.velocity_scale = velocity_scale
+        self.step_hz = step_hz
+        self.floor_y = floor_y
+        self.contact_threshold_sq = contact_threshold * contact_threshold
+        self.refresh_ns = int(1e9 / refresh_hz)
+
+        # speed, kinetic, potential, contact per step; frame time, own cost per frame
+        self.steps = RingBuffer(int(history * step_hz), 4)
+        self.frames = RingBuffer(int(history * frame_hz), 2)
+        self.costs = Histogram()
+
+        self.clock = time.perf_counter_ns
+        self.cost_ns = 0
+        self.last_frame = None
+        self.next_refresh = 0
+        self.pending = []       # rows still to redraw in the current refresh
+        self.surface = None
+        self.font = None
+        # Seeded with the initial velocity (script units) and one step of free
+        # fall, so the first step's velocity change is not read as a contact.
+        self._vx = velocity[0] * velocity_scale
+        self._vy = velocity[1] * velocity_scale
+        self._dvx = 0.0
+        self._dvy = gravity / step_hz
+
+    def step(self, x, y, vx, vy):
+        """Record one physics step; velocities in the script's own units."""
+        start = self.clock()
+        scale = self.velocity_scale
+        vx *= scale
+        vy *= scale
+        dvx = vx - self._vx
+        dvy = vy - self._vy
+        jx = dvx - self._dvx
+        jy = dvy - self._dvy
+        self._vx, self._vy, self._dvx, self._dvy = vx, vy, dvx, dvy
+
+        v2 = vx * vx + vy * vy
+        data = self.steps.data
+        i = self.steps.index
+        data[0, i] = v2 ** 0.5
+        data[1, i] = 0.5 * v2
+        data[2, i] = self.gravity * (self.floor_y - y)
+        data[3, i] = jx * jx + jy * jy > self.contact_threshold_sq
+        self.steps.advance()
+        self.cost_ns += self.clock() - start
+
+    def frame(self):
+        """Record the frame time; call once per frame, whether it was drawn or not."""
+        start = self.clock()
+        if self.last_frame is not None:
+            frames = self.frames
+            frames.data[0, frames.index] = (start - self.last_frame) / 1e6
+            frames.data[1, frames.index] = self.cost_ns / 1e6
+            frames.advance()
+        self.last_frame = start
+        self.cost_ns += self.clock() - start
+        self.costs.add(self.cost_ns)
+        self.cost_ns = 0
+
+    def draw(self, screen):
+        """Blit the overlay, redrawing a row if one is due; returns the dirty rectangles."""
+        start = self.clock()
+        if self.surface is None:
+            self.render()
+        elif self.pending:
+            self.render_row(self.pending.pop())
+        elif start >= self.next_refresh:
+            self.pending = list(range(len(ROWS), -1, -1))
+            self.render_row(self.pending.pop())
+            self.next_refresh = start + self.refresh_ns
+        width = screen.get_width()
+        rect = screen.blit(self.surface, (width - self.surface.get_width() - MARGIN, MARGIN))
+        self.cost_ns += self.clock() - start
+        return [rect]
+
+    def render(self):
+        """Create the overlay surface and draw every row at once."""
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 18)
+            self.surface = pygame.Surface((LABEL_WIDTH + GRAPH_WIDTH + 3 * MARGIN // 2,
+                                           (len(ROWS) + 1) * ROW_HEIGHT + MARGIN)).convert()
+            self.surface.fill(BOX_COLOR)
+        for row in range(len(ROWS) + 1):
+            self.render_row(row)
+
+    def series(self, row):
+        """Samples behind a graph row, oldest first, and how many recent ones its value averages."""
+        if row == 3:
+            return self.steps.history(3) * self.step_hz, self.step_hz
+        if row == 4:
+            return self.frames.history(0), 30
+        return self.steps.history(row), 1
+
+    def render_row(self, row):
+        """Redraw the title (row 0) or one graph row of the cached surface."""
+        surface = self.surface
+        top = row * ROW_HEIGHT + MARGIN // 2
+        surface.fill(BOX_COLOR, (0, top, surface.get_width(), ROW_HEIGHT))
+        if row == 0:
+            frame_ms = self.frames.history(0)
+            fps = 1000 / frame_ms[-60:].mean() if len(frame_ms) else 0.0
+            hud_ms = self.frames.history(1)
+            hud = hud_ms.mean() if len(hud_ms) else 0.0
+            title = f"{self.name}  {fps:5.1f} FPS  hud {hud:.3f} ms"
+            surface.blit(self.font.render(title, True, TITLE_COLOR), (MARGIN // 2, top))
+            return
+
+        label, fmt, color = ROWS[row - 1]
+        values, window = self.series(row - 1)
+        if len(values) == 0:
+            return
+        text = f"{label:9s} " + fmt.format(values[-window:].mean())
+        surface.blit(self.font.render(text, True, color), (MARGIN // 2, top + 3))
+        if len(values) < 2:
+            return
+        points = binned(values, GRAPH_WIDTH)
+        low, high = points.min(), points.max()
+        span = high - low or 1.0
+        xs = LABEL_WIDTH + MARGIN + np.linspace(0, GRAPH_WIDTH - 1, len(points))
+        ys = top + ROW_HEIGHT - 3 - (points - low) / span * (ROW_HEIGHT - 6)
+        pygame.draw.lines(surface, color, False, np.column_stack((xs, ys)).tolist())
+
+    def report(self):
+        """Print the overlay's own cost per frame."""
+        costs = self.costs
+        if costs.count:
+            print(f"{self.name} telemetry: {costs.count} frames, cost per frame "
+                  f"mean {costs.total / costs.count / 1e6:.3f} ms, "
+                  f"p50 {costs.percentile(50) / 1e6:.3f} ms, "
+                  f"p99 {costs.percentile(99) / 1e6:.3f} ms, "
+                  f"max {costs.max / 1e6:.3f} ms")
+
+
+class NullTelemetry:
+    """Stand-in used when the overlay is off: every method is a no-op."""
+
+    def step(self, x, y, vx, vy):
+        pass
+
+    def frame(self):
+        pass
+
+    def draw(self, screen):
+        return []
+
+    def report(self):
+        pass
+
+
+def from_env(name, gravity, **kwargs):
+    """Telemetry if TELEMETRY is set (and not 0), else NullTelemetry."""
+    setting = os.environ.get("TELEMETRY", "")
+    if not setting or setting == "0":
+        return NullTelemetry()
+    return Telemetry(name, gravity, **kwargs)
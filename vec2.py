@@ -0,0 +1,115 @@
+"""
+Pure-Python stand-in for pygame.math.Vector2.
+
+engines.py ports 3o-mini and o3_Mini_High with the Vector2 arithmetic of
+their scripts, which made importing the physics import pygame (and with it
+NumPy and pkg_resources, about 0.2 s). This class implements the subset of
+Vector2 those ports use with the same floating-point operations as pygame's
+C code, so the trajectories are bit-identical:
+
+- length() is sqrt(x*x + y*y) and normalize() divides each component by it;
+- dividing by a scalar multiplies by its reciprocal, as pygame does;
+- the augmented operators (+=, -=, *=) update the vector in place.
+
+Only what the ports need is here; there is no swizzling, epsilon comparison
+or rotation.
+"""
+import math
+
+
+class Vector2:
+    """A 2D vector of floats with pygame.math.Vector2's arithmetic."""
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0.0, y=None):
+        if y is None:
+            x, y = x
+        self.x = float(x)
+        self.y = float(y)
+
+    def __repr__(self):
+        return f"Vector2({self.x!r}, {self.y!r})"
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __eq__(self, other):
+        try:
+            ox, oy = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return self.x == ox and self.y == oy
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return Vector2, (self.x, self.y)
+
+    def __add__(self, other):
+        ox, oy = other
+        return Vector2(self.x + ox, self.y + oy)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        ox, oy = other
+        return Vector2(self.x - ox, self.y - oy)
+
+    def __rsub__(self, other):
+        ox, oy = other
+        return Vector2(ox - self.x, oy - self.y)
+
+    def __mul__(self, other):
+        if isinstance(other, Vector2):
+            return self.dot(other)
+        return Vector2(self.x * other, self.y * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        inverse = 1.0 / scalar
+        return Vector2(self.x * inverse, self.y * inverse)
+
+    def __neg__(self):
+        return Vector2(-self.x, -self.y)
+
+    def __iadd__(self, other):
+        ox, oy = other
+        self.x += ox
+        self.y += oy
+        return self
+
+    def __isub__(self, other):
+        ox, oy = other
+        self.x -= ox
+        self.y -= oy
+        return self
+
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def dot(self, other):
+        ox, oy = other
+        return self.x * ox + self.y * oy
+
+    def length_squared(self):
+        return self.x * self.x + self.y * self.y
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def normalize(self):
+        length = math.sqrt(self.x * self.x + self.y * self.y)
+        if length == 0:
+            raise ValueError("Can't normalize Vector of length Zero")
+        return Vector2(self.x / length, self.y / length)
@@ -0,0 +1,259 @@
+"""
+NumPy N-ball version of 3o-mini.py's physics.
+
+Ball state is held as a struct of arrays (x, y, vx, vy rows of one contiguous
+buffer) and every step runs 3o-mini's integration and `process_collisions`
+for all balls at once. Edges are still visited in order, exactly like the
+scalar loop, so a ball touching two walls sees the same sequence of
+corrections; everything inside an edge visit is batched over the balls.
+
+Balls deeper inside than the apothem minus their radius cannot touch any
+edge and are skipped before the edge loop.
+
+With N=1 the result matches engines.ThreeOMini step for step.
+
+Usage:
+    python vector_engine.py --balls 100000 --steps 200
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from ball_state import BallArray
+from engines import DT, FPS, HEIGHT, INITIAL_POS, INITIAL_VEL, WIDTH
+
+
+class VectorEngine:
+    """
+    N balls in one rotating polygon, 3o-mini collision model.
+
+    `restitution`, `wall_friction` and `hex_angular_velocity` may be scalars
+    or arrays with one value per ball; with arrays every ball effectively sits
+    in its own container (its own angle), which is what sweep.py relies on.
+    """
+
+    def __init__(self, n, restitution=0.9, wall_friction=0.98, hex_angular_velocity=0.5,
+                 gravity=500, air_friction=0.999, ball_radius=15, hex_radius=250,
+                 num_sides=6, hex_center=(WIDTH // 2, HEIGHT // 2)):
+        self.n = n
+        self.restitution = np.asarray(restitution, dtype=np.float64)
+        self.wall_friction = np.asarray(wall_friction, dtype=np.float64)
+        self.hex_angular_velocity = np.asarray(hex_angular_velocity, dtype=np.float64)
+        self.gravity = gravity
+        self.air_friction = air_friction
+        self.ball_radius = ball_radius
+        self.hex_radius = hex_radius
+        self.num_sides = num_sides
+        self.hex_center = (float(hex_center[0]), float(hex_center[1]))
+
+        angles = 2 * math.pi * np.arange(num_sides) / num_sides
+        self.local_x = [hex_radius * math.cos(a) for a in angles]
+        self.local_y = [hex_radius * math.sin(a) for a in angles]
+
+        # A ball closer to the center than this cannot reach any edge.
+        apothem = hex_radius * math.cos(math.pi / num_sides)
+        inner = max(0.0, apothem - ball_radius)
+        self._inner_sq = inner * inner
+
+        # Struct of arrays: rows are x, y, vx, vy.
+        self.balls = BallArray(n)
+        self.buffer = self.balls.data
+        self.x, self.y, self.vx, self.vy = self.buffer
+        self.hex_angle = np.zeros_like(self.hex_angular_velocity)
+        # Largest inbound normal speed of a wall hit during the last step (0 = no hit).
+        self.impact_speed = np.zeros(n)
+
+    def reset(self, pos, vel):
+        """Set positions and velocities; each may be one (x, y) pair or an (N, 2) array."""
+        pos = np.broadcast_to(np.asarray(pos, dtype=np.float64), (self.n, 2))
+        vel = np.broadcast_to(np.asarray(vel, dtype=np.float64), (self.n, 2))
+        self.x[:] = pos[:, 0]
+        self.y[:] = pos[:, 1]
+        self.vx[:] = vel[:, 0]
+        self.vy[:] = vel[:, 1]
+        self.hex_angle = np.zeros_like(self.hex_angular_velocity)
+
+    def positions(self):
+        """(N, 2) view of the ball positions (no copy)."""
+        return self.balls.positions
+
+    def step(self, dt=DT):
+        self.hex_angle = self.hex_angle + self.hex_angular_velocity * dt
+
+        self.vy += self.gravity * dt
+        damping = self.air_friction ** (dt * FPS)
+        self.vx *= damping
+        self.vy *= damping
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+
+        self.impact_speed.fill(0.0)
+        self.process_collisions()
+
+    def process_collisions(self):
+        cx, cy = self.hex_center
+        dx = self.x - cx
+        dy = self.y - cy
+        idx = np.flatnonzero(dx * dx + dy * dy > self._inner_sq)
+        if idx.size == 0:
+            return
+
+        px = self.x[idx]
+        py = self.y[idx]
+        vx = self.vx[idx]
+        vy = self.vy[idx]
+        angle = _take(self.hex_angle, idx)
+        cos_a = np.cos(angle)
+        sin_a = np.sin(angle)
+        omega = _take(self.hex_angular_velocity, idx)
+        restitution = _take(self.restitution, idx)
+        wall_friction = _take(self.wall_friction, idx)
+        radius = self.ball_radius
+        impact = np.zeros(idx.size)
+
+        # World-space vertices, same arithmetic as get_rotated_hex_vertices.
+        verts_x = [lx * cos_a - ly * sin_a + cx for lx, ly in zip(self.local_x, self.local_y)]
+        verts_y = [lx * sin_a + ly * cos_a + cy for lx, ly in zip(self.local_x, self.local_y)]
+
+        n_sides = self.num_sides
+        for i in range(n_sides):
+            ax, ay = verts_x[i], verts_y[i]
+            bx, by = verts_x[(i + 1) % n_sides], verts_y[(i + 1) % n_sides]
+            abx = bx - ax
+            aby = by - ay
+            ab_len2 = abx * abx + aby * aby
+
+            # closest_point_on_segment for every candidate ball
+            t = ((px - ax) * abx + (py - ay) * aby) / ab_len2
+            np.clip(t, 0, 1, out=t)
+            closest_x = ax + t * abx
+            closest_y = ay + t * aby
+            diff_x = px - closest_x
+            diff_y = py - closest_y
+            dist = np.sqrt(diff_x * diff_x + diff_y * diff_y)
+
+            hit = np.flatnonzero(dist < radius)
+            if hit.size == 0:
+                continue
+
+            d = dist[hit]
+            hx = px[hit]
+            hy = py[hit]
+            # Normal from the closest point; fall back to the edge midpoint.
+            nx = diff_x[hit]
+            ny = diff_y[hit]
+            on_line = d == 0
+            if on_line.any():
+                mid_x = _take(ax + bx, hit) * 0.5
+                mid_y = _take(ay + by, hit) * 0.5
+                nx = np.where(on_line, hx - mid_x, nx)
+                ny = np.where(on_line, hy - mid_y, ny)
+            length = np.where(on_line, np.sqrt(nx * nx + ny * ny), d)
+            nx = nx / length
+            ny = ny / length
+            penetration = radius - d
+
+            # Wall velocity at the contact: omega x r
+            rx = closest_x[hit] - cx
+            ry = closest_y[hit] - cy
+            w = _take(omega, hit)
+            wall_vx = w * -ry
+            wall_vy = w * rx
+
+            rel_vx = vx[hit] - wall_vx
+            rel_vy = vy[hit] - wall_vy
+            dot = rel_vx * nx + rel_vy * ny
+            moving_in = dot < 0
+            if not moving_in.any():
+                continue
+
+            sel = hit[moving_in]
+            nx = nx[moving_in]
+            ny = ny[moving_in]
+            dot = dot[moving_in]
+            vn_x = nx * dot
+            vn_y = ny * dot
+            vt_x = rel_vx[moving_in] - vn_x
+            vt_y = rel_vy[moving_in] - vn_y
+            e = _take(restitution, sel)
+            f = _take(wall_friction, sel)
+            vn_x = -e * vn_x
+            vn_y = -e * vn_y
+            vt_x = vt_x * f
+            vt_y = vt_y * f
+            vx[sel] = vn_x + vt_x + wall_vx[moving_in]
+            vy[sel] = vn_y + vt_y + wall_vy[moving_in]
+            px[sel] = hx[moving_in] + nx * penetration[moving_in]
+            py[sel] = hy[moving_in] + ny * penetration[moving_in]
+            impact[sel] = np.maximum(impact[sel], -dot)
+
+        self.impact_speed[idx] = impact
+        self.x[idx] = px
+        self.y[idx] = py
+        self.vx[idx] = vx
+        self.vy[idx] = vy
+
+    def state(self, i=0):
+        """(x, y, vx, vy, angle) of ball i, same layout as the scalar engines."""
+        angle = self.hex_angle[i] if self.hex_angle.ndim else self.hex_angle
+        return (float(self.x[i]), float(self.y[i]), float(self.vx[i]), float(self.vy[i]),
+                float(angle))
+
+
+def _take(value, idx):
+    """Index per-ball arrays, pass scalars through."""
+    return value[idx] if np.ndim(value) else value
+
+
+def random_balls(n, hex_radius=250, ball_radius=15, speed=200.0, seed=0,
+                 center=(WIDTH // 2, HEIGHT // 2)):
+    """Random positions inside the inscribed circle and random velocities."""
+    rng = np.random.default_rng(seed)
+    limit = hex_radius * math.cos(math.pi / 6) - ball_radius
+    r = limit * np.sqrt(rng.random(n))
+    theta = rng.random(n) * 2 * math.pi
+    pos = np.column_stack((center[0] + r * np.cos(theta), center[1] + r * np.sin(theta)))
+    vel = rng.normal(0.0, speed, size=(n, 2))
+    return pos, vel
+
+
+def compare_with_scalar(steps=2000):
+    """Largest difference between VectorEngine(1) and engines.ThreeOMini."""
+    from engines import ThreeOMini
+
+    scalar = ThreeOMini()
+    scalar.reset(INITIAL_POS, INITIAL_VEL)
+    vector = VectorEngine(1)
+    vector.reset(INITIAL_POS, INITIAL_VEL)
+    worst = 0.0
+    for _ in range(steps):
+        scalar.step()
+        vector.step()
+        worst = max(worst, max(abs(a - b) for a, b in zip(scalar.state(), vector.state())))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the vectorized 3o-mini engine")
+    parser.add_argument("--balls", type=int, default=100000)
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"max |vector - scalar| over 2000 steps, N=1: {compare_with_scalar():.3g}")
+
+    engine = VectorEngine(args.balls)
+    engine.reset(*random_balls(args.balls))
+    engine.step()
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        engine.step()
+    elapsed = time.perf_counter() - start
+    per_step = elapsed / args.steps
+    print(f"{args.balls:,} balls: {per_step * 1000:.2f} ms/step "
+          f"({1 / per_step:.0f} steps/s, {args.balls / per_step / 1e6:.1f} M ball-steps/s)")
+
+
+if __name__ == "__main__":
+    main()